@@ -3,6 +3,10 @@ check_directory="/root/ceremonyclient/node"
 update_needed=false
 log_file="/root/update.log"
 
+# Release server; a cluster mirror (release_fetcher.py serve) can be set in /root/release_mirror_url.txt
+release_url="https://releases.quilibrium.com"
+mirror_url=$(cat /root/release_mirror_url.txt 2>/dev/null)
+
 if [[ "$OSTYPE" == "linux-gnu"* ]]; then
     release_os="linux"
     if [[ $(uname -m) == "aarch64"* ]]; then
@@ -17,7 +21,9 @@ fi
 
 # Function to check versions for updates
 check_update_needed () {
-    local file_list=$(curl -s $1 | grep $release_os-$release_arch)
+    local file_list=$(curl -sf $1 | grep $release_os-$release_arch)
+    # An unreachable server or an empty list must not look like "up-to-date"
+    [ -z "$file_list" ] && return 1
 
     for file in $file_list; do
         version=$(echo "$file" | cut -d '-' -f 2)
@@ -31,19 +37,29 @@ check_update_needed () {
 
 run_update() {
 
-    files=$(curl -s https://releases.quilibrium.com/release | grep $release_os-$release_arch)
-    
-    for file in $files; do
-        version=$(echo "$file" | cut -d '-' -f 2)
-        if ! test -f "$check_directory/$file"; then
-            curl -s "https://releases.quilibrium.com/$file" > "$check_directory/$file"
-            echo "Downloaded and updated $file"
-            chmod +x /root/ceremonyclient/node/*-linux-amd64
-            echo "Node is executable"
-        else
-            echo "$file is already up-to-date."
+    if [ -f /root/release_fetcher.py ]; then
+        # Concurrent, resumable downloads, verified against the .dgst files and renamed into place when complete
+        if ! python3 /root/release_fetcher.py fetch --dest "$check_directory" --list release --mirror /root/release_mirror \
+                ${mirror_url:+--base-url "$mirror_url"} --base-url "$release_url"; then
+            echo "Download failed, keeping the current version."
+            echo "$(date) - Download failed" >> "$log_file"
+            return 1
         fi
-    done
+    else
+        files=$(curl -s https://releases.quilibrium.com/release | grep $release_os-$release_arch)
+    
+        for file in $files; do
+            version=$(echo "$file" | cut -d '-' -f 2)
+            if ! test -f "$check_directory/$file"; then
+                curl -s "https://releases.quilibrium.com/$file" > "$check_directory/$file"
+                echo "Downloaded and updated $file"
+                chmod +x /root/ceremonyclient/node/*-linux-amd64
+                echo "Node is executable"
+            else
+                echo "$file is already up-to-date."
+            fi
+        done
+    fi
 
     # Stop and restart services
     systemctl disable ceremonyclient
@@ -61,12 +77,17 @@ run_update() {
     # Restart the service and log success
     systemctl daemon-reload
     service para restart
+    # Drop cached node-info/qclient snapshots taken with the old binaries
+    [ -f /root/snapshot_cache.py ] && python3 /root/snapshot_cache.py invalidate
     echo "$(date) - Restart: Yes" >> "$log_file"
 }
 
 # Check if update is needed
 echo "Checking for binary release updates..."
-check_update_needed "https://releases.quilibrium.com/release"
+if ! check_update_needed "${mirror_url:-$release_url}/release" && [ -n "$mirror_url" ]; then
+    echo "Mirror $mirror_url returned no release list, asking $release_url..."
+    check_update_needed "$release_url/release"
+fi
 
 # Log the outcome of the check
 if [ "$update_needed" = true ]; then
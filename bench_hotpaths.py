@@ -0,0 +1,266 @@
+#!/usr/bin/python3
+"""
+Times the log analysis hot paths on data from log_generator.py. Every path runs
+in its own interpreter with the generated bin/journalctl first in PATH and is
+measured for wall time, peak RSS (wait4 rusage) and the processes it starts
+(strace execve count when strace is installed, journalctl calls always).
+
+  log_generator.py /tmp/bench --lines 1000000 --workers 64
+  bench_hotpaths.py /tmp/bench --repeat 3 --json baseline.json
+  bench_hotpaths.py /tmp/bench --compare baseline.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class Case:
+    """
+    One benchmarked path: a Python snippet (or script arguments), the generated
+    file it needs and whether it runs on a primed (warm) or fresh (cold) state.
+    """
+    def __init__(self, name, needs, code=None, script=None, prime=False, cold_files=()):
+        self.name = name
+        self.needs = needs
+        self.code = code
+        self.script = script
+        self.prime = prime
+        self.cold_files = cold_files
+
+    def command(self, settings):
+        if self.script:
+            return [sys.executable, os.path.join(REPO_DIR, self.script[0])] + [
+                part.format(**settings) for part in self.script[1:]]
+        return [sys.executable, "-c", self.code.format(**settings)]
+
+CASES = [
+    Case("journal_reader.records", "journal.json", code=(
+        "from journal_reader import iter_journal_records\n"
+        "from proof_analyzer import CREATE_MARKER, SUBMIT_MARKER\n"
+        "sum(1 for _ in iter_journal_records({service!r}, markers=(CREATE_MARKER, SUBMIT_MARKER), "
+        "since_minutes={minutes}))")),
+    Case("proof_analyzer", "journal.json", script=("proof_analyzer.py", "{service}", "{minutes}", "--stats")),
+    Case("journal_cursor.cold", "journal.json", code=(
+        "from journal_cursor import update_aggregate\n"
+        "update_aggregate({service!r}, {minutes}, state_dir={work_dir!r})"),
+        cold_files=("quileye_journal_{service}.json",)),
+    Case("journal_cursor.warm", "journal.json", code=(
+        "from journal_cursor import update_aggregate\n"
+        "update_aggregate({service!r}, {minutes}, state_dir={work_dir!r})"), prime=True),
+    Case("shard_intervals", "journal.json", code=(
+        "from journal_cursor import DEFAULT_RETENTION_MINUTES, shard_entries, update_aggregate\n"
+        "from shard_intervals import interval_lines\n"
+        "state = update_aggregate({service!r}, DEFAULT_RETENTION_MINUTES, state_dir={work_dir!r})\n"
+        "interval_lines(shard_entries(state, 51))"), prime=True),
+    Case("para_handler_client.check_old_logs", "journal.json", code=(
+        # The module logs to /root/para_crash.log and restarts para: both are redirected here
+        "import logging\n"
+        "logging.basicConfig(filename={work_dir!r} + '/para_crash.log', level=logging.DEBUG)\n"
+        "import para_handler_client\n"
+        "para_handler_client.restart_service = lambda: None\n"
+        "para_handler_client.check_old_logs()")),
+    Case("coinrepcomp.latest.index", "coinreport.log", code=(
+        "from coinrepcomp import get_latest_reports\n"
+        "get_latest_reports({data_dir!r} + '/coinreport.log', 2)")),
+    Case("coinrepcomp.latest.scan", "coinreport.log", code=(
+        # Same log without the .idx sidecar next to it
+        "from coinrepcomp import get_latest_reports\n"
+        "get_latest_reports({work_dir!r} + '/coinreport_noindex.log', 2)")),
+    Case("coinrepcomp.history", "coinreport.log", code=(
+        "from coinrepcomp import load_history\n"
+        "load_history({data_dir!r} + '/coinreport.log')")),
+    Case("check_store.parse_check", "quileye2.log", code=(
+        "from check_store import parse_check\n"
+        "from check_store import read_pointers\n"
+        "last_user, last_auto = read_pointers({data_dir!r} + '/quileye2_checks.txt', {data_dir!r} + '/quileye2.log')\n"
+        "lines = open({data_dir!r} + '/quileye2.log', errors='replace').readlines()\n"
+        "parse_check(lines, last_user)\n"
+        "parse_check(lines, last_auto)")),
+    Case("open_quileye.find_checks_reverse", "quileye2.log", code=(
+        "from open_quileye import find_checks_reverse\n"
+        "from check_store import read_pointers\n"
+        "last_user, last_auto = read_pointers({data_dir!r} + '/quileye2_checks.txt', {data_dir!r} + '/quileye2.log')\n"
+        "find_checks_reverse({data_dir!r} + '/quileye2.log', [last_user, last_auto])")),
+    Case("open_quileye.find_checks_in_records", "quileye2.jsonl", code=(
+        "from open_quileye import find_checks_in_records\n"
+        "from check_store import read_pointers\n"
+        "last_user, last_auto = read_pointers({data_dir!r} + '/quileye2_checks.txt', {data_dir!r} + '/quileye2.log')\n"
+        "find_checks_in_records({data_dir!r} + '/quileye2.log', [last_user, last_auto])")),
+    Case("check_store.import", "quileye2.log", code=(
+        "from check_store import connect, import_log\n"
+        "conn = connect({work_dir!r} + '/quileye2.db')\n"
+        "import_log(conn, {data_dir!r} + '/quileye2.log')\n"
+        "conn.commit()"), cold_files=("quileye2.db",)),
+]
+
+def run_measured(command, env, cwd):
+    """
+    Runs a command and returns (seconds, peak RSS in kB, exit status, last stderr line).
+    """
+    with tempfile.TemporaryFile('w+') as stderr:
+        started = time.perf_counter()
+        process = subprocess.Popen(command, env=env, cwd=cwd, stdout=subprocess.DEVNULL, stderr=stderr)
+        # wait4 reports the child's own rusage; ru_maxrss is in kB on Linux
+        _, status, rusage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - started
+        process.returncode = os.waitstatus_to_exitcode(status)
+        stderr.seek(0)
+        lines = stderr.read().strip().splitlines()
+    return elapsed, rusage.ru_maxrss, process.returncode, lines[-1] if lines else ""
+
+def count_processes(command, env, cwd):
+    """
+    Processes started besides the measured interpreter, from an strace execve log.
+    None when strace is not installed.
+    """
+    strace = shutil.which("strace")
+    if not strace:
+        return None
+    with tempfile.NamedTemporaryFile('r', suffix=".strace") as trace:
+        subprocess.run([strace, "-f", "-qq", "-e", "trace=execve", "-o", trace.name] + command,
+                       env=env, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        executed = sum(1 for line in trace if "execve(" in line and line.rstrip().endswith("= 0"))
+    return max(0, executed - 1)
+
+def journalctl_calls(data_dir):
+    try:
+        with open(os.path.join(data_dir, "journalctl.calls"), 'r') as f:
+            return sum(1 for _ in f)
+    except FileNotFoundError:
+        return 0
+
+def bench_case(case, settings, env, repeat):
+    work_dir = settings["work_dir"]
+    command = case.command(settings)
+    if case.prime:
+        subprocess.run(command, env=env, cwd=work_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    times, peak_rss, status, error = [], 0, 0, ""
+    calls_before = journalctl_calls(settings["data_dir"])
+    for _ in range(repeat):
+        for name in case.cold_files:
+            path = os.path.join(work_dir, name.format(**settings))
+            if os.path.exists(path):
+                os.remove(path)
+        elapsed, rss, status, error = run_measured(command, env, work_dir)
+        times.append(elapsed)
+        peak_rss = max(peak_rss, rss)
+        if status != 0:
+            break
+    calls = (journalctl_calls(settings["data_dir"]) - calls_before) // len(times)
+
+    for name in case.cold_files:
+        path = os.path.join(work_dir, name.format(**settings))
+        if os.path.exists(path):
+            os.remove(path)
+    return {
+        "name": case.name,
+        "min": min(times),
+        "median": statistics.median(times),
+        "rss_kb": peak_rss,
+        "processes": count_processes(command, env, work_dir),
+        "journalctl_calls": calls,
+        "status": status,
+        "error": error if status != 0 else "",
+    }
+
+def format_results(results, baseline=None):
+    baseline = {result["name"]: result for result in baseline or []}
+    lines = [f"{'Path':<36} {'Min':>9} {'Median':>9} {'Peak RSS':>10} {'Procs':>6} {'journalctl':>10}"]
+    for result in results:
+        processes = "n/a" if result["processes"] is None else str(result["processes"])
+        line = (f"{result['name']:<36} {result['min']:>8.3f}s {result['median']:>8.3f}s "
+                f"{result['rss_kb'] / 1024:>8.1f}MB {processes:>6} {result['journalctl_calls']:>10}")
+        if result["status"] != 0:
+            line += f"  FAILED (exit {result['status']}: {result['error']})"
+        previous = baseline.get(result["name"])
+        if previous:
+            line += (f"  {(result['median'] / previous['median'] - 1) * 100:+.0f}% time"
+                     f" {(result['rss_kb'] / previous['rss_kb'] - 1) * 100:+.0f}% RSS")
+        lines.append(line)
+    return "\n".join(lines)
+
+def regressions(results, baseline, threshold):
+    """
+    Names of the paths whose median time or peak RSS grew by more than 'threshold' percent.
+    """
+    previous = {result["name"]: result for result in baseline}
+    slower = []
+    for result in results:
+        old = previous.get(result["name"])
+        if not old or result["status"] != 0 or old["status"] != 0:
+            continue
+        if (result["median"] > old["median"] * (1 + threshold / 100)
+                or result["rss_kb"] > old["rss_kb"] * (1 + threshold / 100)):
+            slower.append(result["name"])
+    return slower
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the log analysis hot paths on generated data.")
+    parser.add_argument("data_dir", help="Directory written by log_generator.py")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per path (default: 3)")
+    parser.add_argument("--only", action="append", help="Only run paths starting with this name (repeatable)")
+    parser.add_argument("--minutes", type=int, help="Journal window (default: the whole generated journal)")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Compare with the results of an earlier --json run")
+    parser.add_argument("--threshold", type=float, default=20,
+                        help="Percent of slowdown or RSS growth counted as regression (default: 20)")
+    args = parser.parse_args()
+
+    data_dir = os.path.abspath(args.data_dir)
+    try:
+        with open(os.path.join(data_dir, "meta.json"), 'r') as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: {data_dir} has no usable meta.json, run log_generator.py first ({e})")
+        sys.exit(1)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)["results"]
+
+    env = dict(os.environ, PATH=os.path.join(data_dir, "bin") + os.pathsep + os.environ.get("PATH", ""),
+               PYTHONPATH=REPO_DIR)
+    with tempfile.TemporaryDirectory(prefix="bench_hotpaths_") as work_dir:
+        if os.path.exists(os.path.join(data_dir, "coinreport.log")):
+            os.symlink(os.path.join(data_dir, "coinreport.log"), os.path.join(work_dir, "coinreport_noindex.log"))
+        settings = {
+            "data_dir": data_dir,
+            "work_dir": work_dir,
+            "service": meta.get("service", "para"),
+            # One extra minute so the oldest records are inside the window
+            "minutes": args.minutes or int(meta.get("journal_minutes", 0)) + 2,
+        }
+        results = []
+        for case in CASES:
+            if args.only and not any(case.name.startswith(prefix) for prefix in args.only):
+                continue
+            if not os.path.exists(os.path.join(data_dir, case.needs)):
+                continue
+            results.append(bench_case(case, settings, env, args.repeat))
+            print(format_results(results[-1:], baseline).splitlines()[-1], flush=True)
+
+    print()
+    print(f"{meta['lines']} lines, {meta['workers']} workers")
+    print(format_results(results, baseline))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+    if baseline is not None:
+        slower = regressions(results, baseline, args.threshold)
+        if slower:
+            print(f"Regression above {args.threshold:g}%: {', '.join(slower)}")
+            sys.exit(1)
+    if any(result["status"] != 0 for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/python3
+import os
+import re
+import sqlite3
+import sys
+
+from report_records import ANSI_ESCAPE
+
+LOG_FILE = "/root/quileye2.log"
+DB_FILE = "/root/quileye2.db"
+POINTER_FILE = "/root/quileye2_checks.txt"
+
+ACTIVE_WORKERS_PATTERN = re.compile(r"Active Workers: (\d+)")
+
+# Keys as returned by parse_check, in display order, and their columns
+FIELD_COLUMNS = [
+    ("Max Frame", "max_frame"),
+    ("Prover Ring", "prover_ring"),
+    ("Seniority", "seniority"),
+    ("Coins", "coins"),
+    ("Owned balance", "balance"),
+    ("Proofs", "proofs"),
+    ("Creation", "creation"),
+    ("Submission", "submission"),
+    ("CPU-Processing", "cpu_processing"),
+]
+
+# Every field of a check in one pattern: one scan per line
+FIELD_PATTERN = re.compile(
+    r"Max Frame: (?P<max_frame>\d+)"
+    r"|Prover Ring: (?P<prover_ring>[+-]?\d+)"
+    r"|Seniority: (?P<seniority>\d+)"
+    r"|Coins: (?P<coins>\d+)"
+    r"|Owned balance: (?P<balance>[\d.]+) QUIL"
+    r"|(?P<proofs>\d+) Proofs"
+    r"|Creation: (?P<creation>[+-]?\d+(?:\.\d+)*)s"
+    r"|Submission: (?P<submission>[+-]?\d+(?:\.\d+)*)s"
+    r"|CPU-Processing: (?P<cpu_processing>[+-]?\d+(?:\.\d+)*)s"
+)
+
+# Group name -> (key in the check data, conversion)
+FIELDS = {
+    "max_frame": ("Max Frame", int),
+    "prover_ring": ("Prover Ring", int),
+    "seniority": ("Seniority", int),
+    "coins": ("Coins", int),
+    "balance": ("Owned balance", lambda value: round(float(value), 3)),
+    "proofs": ("Proofs", int),
+    "creation": ("Creation", float),
+    "submission": ("Submission", float),
+    "cpu_processing": ("CPU-Processing", float),
+}
+
+CHECK_LINES = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checks (
+    check_nr INTEGER PRIMARY KEY,
+    max_frame INTEGER,
+    active_workers INTEGER,
+    prover_ring INTEGER,
+    seniority INTEGER,
+    coins INTEGER,
+    balance REAL,
+    proofs INTEGER,
+    creation REAL,
+    submission REAL,
+    cpu_processing REAL,
+    text TEXT NOT NULL
+)
+"""
+
+def connect(db_path=DB_FILE, read_only=False):
+    """
+    Opens the check store and creates the table on first use. With read_only
+    nothing is created; a missing store raises sqlite3.OperationalError.
+    """
+    if read_only:
+        return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute(SCHEMA)
+    return conn
+
+def store_check(conn, check_nr, check_data, text):
+    """
+    Inserts or replaces one check record.
+    """
+    workers_match = ACTIVE_WORKERS_PATTERN.search(text)
+    columns = ["check_nr", "active_workers", "text"] + [column for _, column in FIELD_COLUMNS]
+    values = [check_nr, int(workers_match.group(1)) if workers_match else None, text]
+    values += [check_data.get(key) for key, _ in FIELD_COLUMNS]
+    placeholders = ", ".join("?" for _ in columns)
+    with conn:
+        conn.execute(f"INSERT OR REPLACE INTO checks ({', '.join(columns)}) VALUES ({placeholders})", values)
+
+def get_check(conn, check_nr):
+    """
+    Looks up one check by number. Returns (check_data, text) like
+    parse_check, or (None, None) if the check is not stored.
+    """
+    columns = ", ".join(column for _, column in FIELD_COLUMNS)
+    row = conn.execute(f"SELECT {columns}, text FROM checks WHERE check_nr = ?", (check_nr,)).fetchone()
+    if row is None:
+        return None, None
+    check_data = {key: value for (key, _), value in zip(FIELD_COLUMNS, row) if value is not None}
+    return check_data, row[-1]
+
+def latest_check_nr(conn):
+    row = conn.execute("SELECT MAX(check_nr) FROM checks").fetchone()
+    return row[0]
+
+def read_pointers(pointer_path=POINTER_FILE, log_path=LOG_FILE, seed=True):
+    """
+    Returns (LastUserCheck, LastAutoCheck) from the sidecar. Older setups kept
+    them as header lines in quileye2.log, so those are used to seed the sidecar
+    (unless seed is False).
+    """
+    pointers = {}
+    source = pointer_path if os.path.exists(pointer_path) else log_path
+    try:
+        with open(source, 'r') as f:
+            for line_number, line in enumerate(f):
+                if line.startswith(("LastUserCheck:", "LastAutoCheck:")):
+                    key, value = line.split(":", 1)
+                    pointers[key] = int(value.strip())
+                if len(pointers) == 2 or (source == log_path and line_number > 10):
+                    break
+    except FileNotFoundError:
+        pass
+
+    last_user_check = pointers.get("LastUserCheck")
+    last_auto_check = pointers.get("LastAutoCheck")
+    if seed and source == log_path and last_user_check is not None and last_auto_check is not None:
+        write_pointers(last_user_check, last_auto_check, pointer_path)
+    return last_user_check, last_auto_check
+
+def write_pointers(last_user_check, last_auto_check, pointer_path=POINTER_FILE):
+    """
+    Rewrites the two-line sidecar atomically.
+    """
+    tmp_path = f"{pointer_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(f"LastUserCheck: {last_user_check}\n")
+        f.write(f"LastAutoCheck: {last_auto_check}\n")
+    os.replace(tmp_path, pointer_path)
+
+def extract_check_fields(lines):
+    """
+    Reads every field from the lines of a check, one scan per line. Within a line
+    the first match of a field counts, later lines overwrite earlier ones.
+    """
+    check_data = {}
+    for line in lines:
+        seen = set()
+        for match in FIELD_PATTERN.finditer(ANSI_ESCAPE.sub('', line) if '\x1b' in line else line):
+            name = match.lastgroup
+            if name not in seen:
+                seen.add(name)
+                key, convert = FIELDS[name]
+                check_data[key] = convert(match.group(name))
+    return check_data
+
+def parse_check(lines, check_nr, from_end=False):
+    """
+    Parses the section of one Check-Nr from the log lines. With from_end the
+    last section with this number is taken.
+    """
+    check_pattern = f"Check-Nr {check_nr}:"
+    indices = range(len(lines) - 1, -1, -1) if from_end else range(len(lines))
+    start_index = next((i for i in indices if check_pattern in ANSI_ESCAPE.sub('', lines[i])), None)
+    if start_index is not None:
+        relevant_lines = lines[start_index : start_index + CHECK_LINES]
+        return extract_check_fields(relevant_lines), "".join(relevant_lines)
+    return None, None
+
+def parse_check_text(check_nr, text):
+    """
+    Parses the plain text of one check with parse_check.
+    """
+    lines = [f"Check-Nr {check_nr}:\n"] + [f"{line}\n" for line in ANSI_ESCAPE.sub('', text).strip("\n").splitlines()]
+    check_data, check_text = parse_check(lines, check_nr)
+    return check_data or {}, check_text
+
+def record_check(conn, check_nr, output):
+    """
+    Stores the output of quileye2.bash as check 'check_nr'.
+    """
+    check_data, text = parse_check_text(check_nr, output)
+    store_check(conn, check_nr, check_data, text)
+
+def import_log(conn, log_path=LOG_FILE):
+    """
+    One-time migration: stores every check found in quileye2.log.
+    """
+    header = re.compile(r"^Check-Nr (\d+):")
+    imported = 0
+    check_nr = None
+    block = []
+
+    def flush():
+        nonlocal imported
+        if check_nr is not None:
+            record_check(conn, check_nr, "".join(block))
+            imported += 1
+
+    with open(log_path, 'r', errors='replace') as f:
+        for line in f:
+            match = header.match(ANSI_ESCAPE.sub('', line))
+            if match:
+                flush()
+                check_nr = int(match.group(1))
+                block = []
+            elif check_nr is not None and len(block) < 3 and line.strip():
+                block.append(line)
+    flush()
+    return imported
+
+def main():
+    usage = "Usage: check_store.py record CHECK_NR < quileye2_output | check_store.py import [LOG_FILE]"
+    if len(sys.argv) < 2:
+        print(usage)
+        sys.exit(1)
+
+    command = sys.argv[1]
+    conn = connect()
+    if command == "record" and len(sys.argv) == 3:
+        record_check(conn, int(sys.argv[2]), sys.stdin.read())
+    elif command == "import":
+        log_path = sys.argv[2] if len(sys.argv) > 2 else LOG_FILE
+        print(f"Imported {import_log(conn, log_path)} checks from {log_path} into {DB_FILE}")
+    else:
+        print(usage)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -91,14 +91,26 @@ update_node_nr() {
 
 # Function to configure UFW
 configure_ufw() {
-    # Fetch the second and third columns from Git based on node_nr
-    REMOTE_DATA=$(curl -s https://raw.githubusercontent.com/qrux-opterator/sqripts/main/node_nr.txt | grep "^$NODE_NR" | awk '{print $2, $3}')
+    # Download the cluster table once; it gives the second and third columns for
+    # node_nr and is validated with core_planner.py
+    TABLE_FILE=$(mktemp)
+    curl -s https://raw.githubusercontent.com/qrux-opterator/sqripts/main/node_nr.txt > "$TABLE_FILE"
+    REMOTE_DATA=$(grep "^$NODE_NR" "$TABLE_FILE" | awk '{print $2, $3}')
     
     if [ -z "$REMOTE_DATA" ]; then
+        rm -f "$TABLE_FILE"
         color_text "31" "Node Number $NODE_NR not found in remote file."
         read -p "Press Enter to continue..."
         return
     fi
+
+    # Check the cluster table (overlapping core ranges, valid ports) before any rule is applied
+    if [ -f /root/core_planner.py ] && ! python3 /root/core_planner.py validate --nodes "$TABLE_FILE"; then
+        rm -f "$TABLE_FILE"
+        color_text "31" "The cluster table failed validation, UFW was not configured."
+        read -p "Press Enter to continue..."
+        return
+    fi
     
     SECOND_COLUMN=$(echo "$REMOTE_DATA" | awk '{print $1}')
     THIRD_COLUMN=$(echo "$REMOTE_DATA" | awk '{print $2}')
@@ -116,7 +128,13 @@ configure_ufw() {
 
     ufw allow "$RANGE_START:$RANGE_END/tcp"
 
-    color_text "32" "UFW has been configured for Node \033[36m$NODE_NR\033[32m with ports ${RANGE_START} to ${RANGE_END} open."
+    # With --node the opened range is checked against the table as well
+    if [ -f /root/core_planner.py ] && ! python3 /root/core_planner.py validate --nodes "$TABLE_FILE" --node "$NODE_NR"; then
+        color_text "31" "UFW rules were applied, but the port range does not match the cluster table."
+    else
+        color_text "32" "UFW has been configured for Node \033[36m$NODE_NR\033[32m with ports ${RANGE_START} to ${RANGE_END} open."
+    fi
+    rm -f "$TABLE_FILE"
     read -p "Press Enter to continue..."
 }
 
@@ -1,29 +1,20 @@
 #!/bin/bash
 
+# The Python part is installed by install_quileye2.sh
+if [ ! -f /root/ping_probe.py ]; then
+    echo "/root/ping_probe.py not found. Install it with install_quileye2.sh" >&2
+    exit 1
+fi
+
 input_file="/root/cm_settings.txt"
 output_file="/root/ping_results.txt"
 
-# Clear the output file if it exists
-> "$output_file"
-
-# Read the file line by line
-while read -r line; do
-    # Extract IP and associated value
-    ip=$(echo "$line" | awk '{print $1}')
-    value=$(echo "$line" | awk '{print $2}')
-
-    # Ping the IP address 3 times and extract the average time
-    avg_time=$(ping -c 3 "$ip" | awk -F'/' '/rtt/ {print $5}')
-
-    # Handle cases where ping fails
-    if [ -z "$avg_time" ]; then
-        avg_time="N/A"
-    fi
+# Pings per host and seconds per host
+count=3
+deadline=5
 
-    # Log the result
-    echo "$ip $avg_time" >> "$output_file"
-    echo "[LOG] Processed $ip: Average Ping = $avg_time ms"
-done < "$input_file"
+# Ping all IPs concurrently; the results are written sorted by average latency
+python3 /root/ping_probe.py --input "$input_file" --output "$output_file" --count "$count" --deadline "$deadline"
 
 # Output the results
 echo -e "\nPing Results:"
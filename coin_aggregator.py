@@ -0,0 +1,245 @@
+#!/usr/bin/python3
+import argparse
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+from check_store import DB_FILE, LOG_FILE, connect
+from report_records import append_record
+from snapshot_cache import SnapshotError, get_snapshot, node_info_value
+from thresholds import landing_rate_color
+
+REPORT_LOG = "/root/coinreport.log"
+
+QUIL_PATTERN = re.compile(r"^\s*(\S+)\s+QUIL\b")
+FRAME_PATTERN = re.compile(r"Frame (\d+),")
+TIMESTAMP_PATTERN = re.compile(r"\bTimestamp (\S+)")
+ACTIVE_WORKERS_PATTERN = re.compile(r"Active Workers: (\d+)")
+
+def parse_timestamp(text):
+    """
+    Parses an ISO timestamp from the qclient output (UTC) into epoch seconds.
+    Returns None if it cannot be read.
+    """
+    text = text.rstrip(",").replace("Z", "")
+    # fromisoformat only takes up to six fractional digits
+    text = re.sub(r"(\.\d{6})\d+", r"\1", text)
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def awk_number(value):
+    """
+    Formats a number like awk's print does (integers as is, otherwise %.6g).
+    """
+    if value == int(value) and abs(value) < 1e16:
+        return str(int(value))
+    return f"{value:.6g}"
+
+def aggregate_coins(lines, hours, now=None):
+    """
+    Streams the 'qclient token coins metadata' output once and collects the QUIL
+    values and frame numbers of all coins from the last 'hours' hours.
+    """
+    now = time.time() if now is None else now
+    values = []
+    frames = []
+    for line in lines:
+        timestamp_match = TIMESTAMP_PATTERN.search(line)
+        if not timestamp_match:
+            continue
+        timestamp = parse_timestamp(timestamp_match.group(1))
+        if timestamp is None or not 0 <= now - timestamp <= hours * 3600:
+            continue
+        quil_match = QUIL_PATTERN.match(line)
+        if quil_match:
+            try:
+                values.append((float(quil_match.group(1)), quil_match.group(1)))
+            except ValueError:
+                pass
+        frame_match = FRAME_PATTERN.search(line)
+        if frame_match:
+            frames.append(int(frame_match.group(1)))
+    return values, frames
+
+def coin_statistics(values):
+    """
+    Returns total, average, median, high and low of the QUIL values as the
+    strings coinrep.bash used to print.
+    """
+    if not values:
+        return {"total": "0", "average": "0", "median": "0", "high": "0", "low": "0"}
+    ordered = sorted(values)
+    numbers = [number for number, _ in ordered]
+    count = len(numbers)
+    total = sum(numbers)
+    if count % 2:
+        median = numbers[count // 2]
+    else:
+        median = (numbers[count // 2 - 1] + numbers[count // 2]) / 2
+    return {
+        "total": awk_number(total),
+        "average": awk_number(total / count),
+        "median": awk_number(median),
+        "high": ordered[-1][1],
+        "low": ordered[0][1],
+    }
+
+def landing_rate(frames):
+    """
+    Share of frames in the covered frame span that produced a coin, in percent.
+    """
+    if not frames:
+        return 0.0
+    frame_diff = max(frames) - min(frames)
+    return (len(frames) / frame_diff) * 100 if frame_diff != 0 else 0.0
+
+def latest_active_workers(db_path=DB_FILE, log_path=LOG_FILE):
+    """
+    Returns the Active Workers from the cached node-info snapshot, falling back to
+    the latest check in the check store or quileye2.log. None if nothing has a value.
+    """
+    try:
+        workers = node_info_value(get_snapshot("node-info"), "Active Workers")
+        if workers is not None:
+            return int(workers.split()[0])
+    except (SnapshotError, ValueError, IndexError):
+        pass
+    if os.path.exists(db_path):
+        conn = connect(db_path)
+        row = conn.execute(
+            "SELECT active_workers FROM checks WHERE active_workers IS NOT NULL ORDER BY check_nr DESC LIMIT 1"
+        ).fetchone()
+        if row is not None:
+            return row[0]
+    if os.path.exists(log_path):
+        workers = None
+        with open(log_path, 'r', errors='replace') as f:
+            for line in f:
+                match = ACTIVE_WORKERS_PATTERN.search(line)
+                if match:
+                    workers = int(match.group(1))
+        return workers
+    return None
+
+def prompt_active_workers():
+    """
+    Asks for the number of active workers on the terminal (stdin carries the coin data).
+    """
+    try:
+        with open("/dev/tty", 'r+') as tty:
+            tty.write(f"File {LOG_FILE} not found. Enter the number of active workers: ")
+            tty.flush()
+            return int(tty.readline().strip())
+    except (OSError, ValueError):
+        return None
+
+def report_rows(stats, active_workers):
+    """
+    (label, value) rows of a report, values as the strings coinrep.bash printed.
+    """
+    if active_workers and active_workers > 0:
+        per_worker = {key: awk_number(float(value) / active_workers) for key, value in stats.items()}
+    else:
+        per_worker = {key: "N/A" for key in stats}
+    return [
+        ("Total QUIL earned", stats["total"]),
+        ("Average QUIL per Coin", stats["average"]),
+        ("Median QUIL per Coin", stats["median"]),
+        ("High QUIL per Coin", stats["high"]),
+        ("Low QUIL per Coin", stats["low"]),
+        ("Active Workers", active_workers if active_workers is not None else ""),
+        ("Total per Worker", per_worker["total"]),
+        ("Average per Worker", per_worker["average"]),
+        ("Median per Worker", per_worker["median"]),
+        ("High per Worker", per_worker["high"]),
+        ("Low per Worker", per_worker["low"]),
+    ]
+
+def format_report(stats, rate, hours, active_workers, now=None, thresholds=None):
+    """
+    Builds the coinreport.log block in the same layout as coinrep.bash. The landing
+    rate is colored by the LANDING_RATE_LOW/HIGH thresholds.
+    """
+    now = time.time() if now is None else now
+    lines = [
+        "",
+        f"Landing Rate: {landing_rate_color(rate, thresholds)}{rate:.2f}%\033[0m",
+        time.strftime("%a %b %e %H:%M:%S %Z %Y", time.localtime(now)),
+        f"━━━━━━━━━━━━━━━━ COINREPORT {hours}hs  ━━━━━━━━━━━━━━━━",
+    ]
+    lines += [f"{label + ':':<25} {str(value):<20}" for label, value in report_rows(stats, active_workers)]
+    lines.append("━" * 45)
+    return "\n".join(lines) + "\n"
+
+def report_record(stats, rate, hours, active_workers, now=None):
+    """
+    The values of format_report as a JSON record. 'report' is keyed like the reports
+    coinrepcomp.py parses from the log, with numbers (None for N/A) instead of text.
+    """
+    now = time.time() if now is None else now
+    report = {"Landing Rate": round(rate, 2)}
+    for label, value in report_rows(stats, active_workers):
+        try:
+            report[label] = value if isinstance(value, int) else float(value)
+        except ValueError:
+            report[label] = None
+    return {
+        "time": now,
+        "hours": hours,
+        "date": time.strftime("%a %b %e %H:%M:%S %Z %Y", time.localtime(now)),
+        "report": report,
+    }
+
+def append_report(report, log_path=REPORT_LOG, record=None):
+    """
+    Appends the report and records its offset in the index sidecar for coinrepcomp.py.
+    The JSON record, if given, goes to the .jsonl file with the same offset.
+    """
+    with open(log_path, 'a') as f:
+        # The block starts with an empty line, the report itself one byte later
+        offset = f.tell() + 1
+        f.write(report)
+    with open(log_path + ".idx", 'a') as index_file:
+        index_file.write(f"{offset}\n")
+    if record is not None:
+        append_record(log_path, dict(record, offset=offset))
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate 'qclient token coins metadata' output into coinreport.log.")
+    parser.add_argument("hours", nargs="?", type=int, default=24, help="Timeframe in hours (default: 24)")
+    parser.add_argument("--input", help="Read the qclient output from a file ('-' for stdin) instead of the snapshot cache")
+    parser.add_argument("--log", default=REPORT_LOG, help=f"Report log (default: {REPORT_LOG})")
+    args = parser.parse_args()
+
+    if args.input is None:
+        try:
+            metadata = get_snapshot("coin-metadata")
+        except SnapshotError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        values, frames = aggregate_coins(metadata.splitlines(), args.hours)
+    elif args.input == "-":
+        values, frames = aggregate_coins(sys.stdin, args.hours)
+    else:
+        with open(args.input, 'r', errors='replace') as f:
+            values, frames = aggregate_coins(f, args.hours)
+
+    active_workers = latest_active_workers()
+    if active_workers is None:
+        active_workers = prompt_active_workers()
+
+    stats = coin_statistics(values)
+    rate = landing_rate(frames)
+    now = time.time()
+    report = format_report(stats, rate, args.hours, active_workers, now)
+    append_report(report, args.log, report_record(stats, rate, args.hours, active_workers, now))
+
+if __name__ == "__main__":
+    main()
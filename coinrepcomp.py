@@ -1,8 +1,12 @@
+import argparse
 import os
 import re
+from datetime import datetime
 from tabulate import tabulate
 from colorama import init, Fore, Style
 
+from report_records import ANSI_ESCAPE, first_record, iter_lines_reverse, iter_records_reverse
+
 # Initialize colorama for cross-platform compatibility
 init(autoreset=True)
 
@@ -53,40 +57,309 @@ def parse_report(report_lines):
                 data[key] = value
     return data
 
-def get_latest_reports(file_path, number_of_reports=2):
+REPORT_MARKER = b'Landing Rate:'
+
+def index_path_for(file_path):
     """
-    Reads the log file and retrieves the latest 'number_of_reports' reports.
+    Returns the offset index sidecar that coinrep.bash appends to.
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"The file {file_path} does not exist.")
+    return file_path + '.idx'
 
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
+def iter_report_offsets_reverse(f, file_size):
+    """
+    Yields the byte offset of every 'Landing Rate:' line, newest first.
+    """
+    for offset, line in iter_lines_reverse(f, file_size):
+        if line.startswith(REPORT_MARKER):
+            yield offset
 
-    reports = []
-    current_report = []
+def read_indexed_offsets(f, file_path, file_size, number_of_reports):
+    """
+    Returns the last 'number_of_reports' offsets from the index sidecar, or None
+    if there is no index or it does not match the log (e.g. after a rotation).
+    """
+    try:
+        with open(index_path_for(file_path), 'rb') as index_file:
+            index_file.seek(0, os.SEEK_END)
+            index_size = index_file.tell()
+            # Offsets are short lines, so a small tail of the index is enough
+            index_file.seek(max(0, index_size - 32 * (number_of_reports + 1)))
+            tail = index_file.read().split(b'\n')
+    except FileNotFoundError:
+        return None
 
-    for line in lines:
-        line = line.rstrip('\n')
-        if line.startswith('Landing Rate:'):
-            if current_report:
-                reports.append(current_report)
-                current_report = []
-        current_report.append(line)
-    if current_report:
-        reports.append(current_report)
+    if index_size > 32 * (number_of_reports + 1):
+        tail = tail[1:]  # First entry may be cut
+    try:
+        offsets = [int(entry) for entry in tail if entry.strip()]
+    except ValueError:
+        return None
+    offsets = offsets[-number_of_reports:]
+    if not offsets or offsets[-1] >= file_size:
+        return None
+
+    for offset in offsets:
+        f.seek(offset)
+        if f.read(len(REPORT_MARKER)) != REPORT_MARKER:
+            return None
+    return offsets
+
+def read_report_block(f, start, end):
+    """
+    Reads the lines of one report between two byte offsets.
+    """
+    f.seek(start)
+    return f.read(end - start).decode('utf-8', errors='replace').splitlines()
 
-    if len(reports) < number_of_reports:
-        raise ValueError(f"Only {len(reports)} report(s) found, but {number_of_reports} requested.")
+def read_report_blocks(f, offsets, file_size):
+    """
+    Reads the reports starting at the given offsets; the last one runs to EOF.
+    """
+    ends = offsets[1:] + [file_size]
+    return [read_report_block(f, start, end) for start, end in zip(offsets, ends)]
 
-    # Get the last 'number_of_reports' reports
-    latest_reports = reports[-number_of_reports:]
+def record_to_report(record):
+    """
+    Turns a coin_aggregator.py JSON record into a report dictionary like parse_report,
+    with numbers instead of text values.
+    """
+    values = record['report']
+    report = {'Check': str(record['hours']), 'Landing Rate': values.get('Landing Rate'), 'Date': record['date']}
+    report.update(values)
+    return report
+
+def record_matches_log(f, file_size, record):
+    """
+    True if the record describes the last report in the log, i.e. no report was
+    appended without a record (coinreport.bash, older coinrep.bash).
+    """
+    offset = record.get('offset')
+    if not isinstance(offset, int) or not 0 <= offset < file_size:
+        return False
+    report = read_report_block(f, offset, file_size)
+    markers = [line.startswith('Landing Rate:') for line in report]
+    return bool(markers) and markers[0] and sum(markers) == 1
+
+def load_records(file_path, limit=None, since=None):
+    """
+    Loads reports from the JSON records next to the log, oldest first, with the
+    selection of load_history. Returns None if the records cannot stand in for the
+    log: missing, behind the log, or ending before the requested range is covered
+    (the log may hold reports from before the records were written).
+    """
+    reports = []
+    oldest = None
+    with open(file_path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        for record in iter_records_reverse(file_path):
+            if oldest is None and not record_matches_log(f, file_size, record):
+                return None
+            if limit is not None and len(reports) >= limit:
+                break
+            try:
+                report = record_to_report(record)
+            except (KeyError, TypeError, AttributeError):
+                return None
+            if since is not None:
+                report_date = parse_report_date(report['Date'])
+                if report_date is not None and report_date < since:
+                    break
+            reports.append(report)
+            oldest = record
+        else:
+            # Ran out of records: complete only if the oldest one is the log's first report
+            covered = limit is not None and len(reports) >= limit
+            first = first_record(file_path)
+            if not covered and (oldest is None or first is None or first.get('offset', 0) > 1):
+                return None
+    reports.reverse()
+    return reports
+
+def get_latest_reports(file_path, number_of_reports=2):
+    """
+    Retrieves the latest 'number_of_reports' reports, oldest first.
+    The JSON records are used when they are current; otherwise only the end of the
+    log is read: offsets come from the index sidecar or, without a usable index,
+    from a backward scan.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"The file {file_path} does not exist.")
+
+    records = load_records(file_path, limit=number_of_reports)
+    if records is not None and len(records) == number_of_reports:
+        return records
+
+    with open(file_path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        offsets = read_indexed_offsets(f, file_path, file_size, number_of_reports)
+        latest_reports = None
+        if offsets is not None:
+            latest_reports = read_report_blocks(f, offsets, file_size)
+            # A report appended without updating the index makes the index stale
+            if any(sum(line.startswith('Landing Rate:') for line in report) != 1 for report in latest_reports):
+                latest_reports = None
+
+        if latest_reports is None:
+            offsets = []
+            for offset in iter_report_offsets_reverse(f, file_size):
+                offsets.insert(0, offset)
+                if len(offsets) == number_of_reports:
+                    break
+            latest_reports = read_report_blocks(f, offsets, file_size)
+
+        if len(latest_reports) < number_of_reports:
+            raise ValueError(f"Only {len(latest_reports)} report(s) found, but {number_of_reports} requested.")
 
     # Parse the reports into dictionaries
     parsed_reports = [parse_report(report) for report in latest_reports]
 
     return parsed_reports
 
+def iter_reports_reverse(file_path):
+    """
+    Yields parsed reports newest first, reading the log backward from EOF.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"The file {file_path} does not exist.")
+
+    with open(file_path, 'rb') as f:
+        end = os.fstat(f.fileno()).st_size
+        for offset in iter_report_offsets_reverse(f, end):
+            yield parse_report(read_report_block(f, offset, end))
+            end = offset
+
+def parse_report_date(date_str):
+    """
+    Parses the `date` line of a report (e.g. 'Wed Dec  4 10:00:00 UTC 2024').
+    Returns a datetime or None.
+    """
+    parts = date_str.split()
+    if len(parts) == 6:
+        # Drop the timezone name, strptime only knows a few of them
+        parts.pop(4)
+    try:
+        return datetime.strptime(" ".join(parts), "%a %b %d %H:%M:%S %Y")
+    except ValueError:
+        return None
+
+def load_history(file_path, limit=None, since=None):
+    """
+    Loads the last 'limit' reports and/or all reports dated on or after 'since',
+    oldest first.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"The file {file_path} does not exist.")
+    records = load_records(file_path, limit=limit, since=since)
+    if records is not None:
+        return records
+
+    reports = []
+    for report in iter_reports_reverse(file_path):
+        if limit is not None and len(reports) >= limit:
+            break
+        if since is not None:
+            report_date = parse_report_date(report.get('Date', ''))
+            if report_date is not None and report_date < since:
+                break
+        reports.append(report)
+    reports.reverse()
+    return reports
+
+def build_columns(reports):
+    """
+    Turns a list of reports into one column (list of floats or None) per metric.
+    Timeframe dependent totals are normalized to the timeframe of the newest report.
+    """
+    target_hours = report_hours(reports[-1])
+    hours = [report_hours(report) for report in reports]
+    metrics = []
+    for report in reports:
+        for key in report:
+            if key not in ('Date', 'raw', 'Check') and key not in metrics:
+                metrics.append(key)
+
+    columns = {}
+    for key in metrics:
+        column = [convert_value(report.get(key)) for report in reports]
+        if key in NORMALIZED_KEYS:
+            column = [normalize_to_hours(value, report_hour, target_hours) for value, report_hour in zip(column, hours)]
+        columns[key] = column
+    return columns
+
+def rolling_mean(values, window):
+    """
+    Rolling mean over 'window' points, computed from prefix sums in one pass.
+    """
+    prefix = [0.0]
+    for value in values:
+        prefix.append(prefix[-1] + value)
+    return [
+        (prefix[i + 1] - prefix[max(0, i + 1 - window)]) / (i + 1 - max(0, i + 1 - window))
+        for i in range(len(values))
+    ]
+
+def linear_slope(xs, ys):
+    """
+    Least squares slope of ys over xs, or None with fewer than two distinct xs.
+    """
+    n = len(xs)
+    if n < 2:
+        return None
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if variance == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+def generate_history_table(reports, window=5):
+    """
+    Generates a trend table over many reports: first and last value, rolling mean,
+    slope per day (per report if the dates cannot be read) and the change between
+    the rolling mean of the first and the last 'window' reports.
+    """
+    columns = build_columns(reports)
+    dates = [parse_report_date(report.get('Date', '')) for report in reports]
+    use_days = all(date is not None for date in dates)
+    if use_days:
+        positions = [(date - dates[0]).total_seconds() / 86400 for date in dates]
+    else:
+        positions = list(range(len(reports)))
+
+    headers = ["Metric", "First", "Last", f"Rolling Mean ({window})", "Slope / Day" if use_days else "Slope / Report", "Change"]
+    table_data = [['Reports', len(reports), f"{reports[0].get('Date', 'N/A')} → {reports[-1].get('Date', 'N/A')}", '', '', '']]
+
+    for key, column in columns.items():
+        points = [(x, y) for x, y in zip(positions, column) if y is not None]
+        if not points:
+            continue
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        means = rolling_mean(ys, window)
+        slope = linear_slope(xs, ys)
+        first_mean = sum(ys[:window]) / len(ys[:window])
+        change = compare_values(means[-1], first_mean, key)
+
+        last_text = f"{ys[-1]:.6g}"
+        if key == 'Total QUIL earned':
+            last_text = f"{Style.BRIGHT}{Fore.YELLOW}{last_text}{Style.RESET_ALL}"
+        table_data.append([
+            key,
+            f"{ys[0]:.6g}",
+            last_text,
+            f"{means[-1]:.6g}",
+            f"{slope:+.6g}" if slope is not None else "N/A",
+            change
+        ])
+
+    return tabulate(
+        table_data,
+        headers=headers,
+        tablefmt="fancy_grid",
+        stralign="left",
+        numalign="left"
+    )
+
 def convert_value(value):
     """
     Converts a string to a float, removing any non-numeric characters like '%'.
@@ -94,6 +367,11 @@ def convert_value(value):
     """
     if value is None:
         return None
+    # Values from the JSON records are numbers already
+    if isinstance(value, (int, float)):
+        return float(value)
+    # Remove ANSI color codes first, their digits would end up in the number
+    value = ANSI_ESCAPE.sub('', value)
     # Remove any non-numeric characters except for '.' and '-'
     cleaned_value = re.sub(r'[^\d\.\-]', '', value)
     try:
@@ -101,6 +379,20 @@ def convert_value(value):
     except ValueError:
         return None
 
+def display_value(key, value):
+    """
+    Text of a report value: log values as they are, record numbers as the log prints them.
+    """
+    if value is None:
+        return 'N/A'
+    if isinstance(value, str):
+        return value
+    if key == 'Landing Rate':
+        return f"{value:.2f}%"
+    if value == int(value):
+        return str(int(value))
+    return str(value)
+
 def compare_values(new_value, previous_value, metric):
     """
     Compares two numerical values and returns a formatted percentage difference string.
@@ -116,6 +408,24 @@ def compare_values(new_value, previous_value, metric):
             return f"{Fore.YELLOW}➖ No Change{Style.RESET_ALL}"
     return f"{Fore.YELLOW}➖ N/A{Style.RESET_ALL}"
 
+# Totals that depend on the report timeframe and are compared per normalized timeframe
+NORMALIZED_KEYS = ['Total QUIL earned', 'Total per Worker']
+
+def normalize_to_hours(value, hours, target_hours):
+    """
+    Scales a total covering 'hours' to 'target_hours'. Returns None if not possible.
+    """
+    if value is None or not hours or hours <= 0:
+        return None
+    return value * (target_hours / hours)
+
+def report_hours(report):
+    """
+    Returns the timeframe of a report in hours ('COINREPORT 24hs' -> 24) or None.
+    """
+    match = re.match(r"(\d+)", report.get('Check', ''))
+    return int(match.group(1)) if match else None
+
 def generate_comparison_table(new_report, previous_report):
     """
     Generates a table comparing new and previous report values.
@@ -151,23 +461,20 @@ def generate_comparison_table(new_report, previous_report):
     keys_to_compare = [key for key in new_report.keys() if key not in ['Date', 'raw', 'Check']]
 
     for key in keys_to_compare:
-        new_val_str = new_report.get(key, 'N/A')
-        prev_val_str = previous_report.get(key, 'N/A')
-
-        # Convert values to numeric types
-        new_val_numeric = convert_value(new_val_str)
-        prev_val_numeric = convert_value(prev_val_str)
+        new_val_numeric = convert_value(new_report.get(key))
+        prev_val_numeric = convert_value(previous_report.get(key))
+        new_val_str = display_value(key, new_report.get(key))
+        prev_val_str = display_value(key, previous_report.get(key))
 
         # Initialize normalized values
         new_normalized = None
         prev_normalized = None
 
         # For 'Total QUIL earned' and 'Total per Worker', normalize values
-        if key in ['Total QUIL earned', 'Total per Worker']:
+        if key in NORMALIZED_KEYS:
             try:
                 # Normalize new report to the previous time frame
-                if last_hours > 0:
-                    new_normalized = new_val_numeric * (previous_hours / last_hours) if new_val_numeric is not None else None
+                new_normalized = normalize_to_hours(new_val_numeric, last_hours, previous_hours)
                 # Previous report is already in previous_hours, so no normalization needed
                 prev_normalized = prev_val_numeric  # Already in previous_hours
                 # Use normalized values for comparison
@@ -205,8 +512,23 @@ def generate_comparison_table(new_report, previous_report):
     return table
 
 def main():
-    file_path = 'coinreport.log'  # Ensure this path is correct
+    parser = argparse.ArgumentParser(description="Compare coin reports from coinreport.log.")
+    parser.add_argument("file", nargs="?", default='coinreport.log', help="Path to coinreport.log")
+    parser.add_argument("--history", type=int, metavar="N", help="Show the trend over the last N reports")
+    parser.add_argument("--since", metavar="DATE", help="Show the trend over all reports since DATE (YYYY-MM-DD)")
+    parser.add_argument("--window", type=int, default=5, help="Rolling mean window for --history/--since (default: 5)")
+    args = parser.parse_args()
+
+    file_path = args.file  # Ensure this path is correct
     try:
+        if args.history or args.since:
+            since = datetime.strptime(args.since, "%Y-%m-%d") if args.since else None
+            reports = load_history(file_path, limit=args.history, since=since)
+            if len(reports) < 2:
+                raise ValueError(f"Only {len(reports)} report(s) found in range, at least 2 needed.")
+            print("\n" + generate_history_table(reports, max(1, args.window)) + "\n")
+            return
+
         # Retrieve the latest two reports
         latest_two_reports = get_latest_reports(file_path, 2)
 
@@ -0,0 +1,242 @@
+#!/usr/bin/python3
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+from fleet_collector import HOSTS_FILE, NODE_NR_FILE, collect_fleet, read_hosts, read_nodes
+
+PORT_BASE = 40000
+PORT_MAX = 65535
+
+# Collects the probe output of every node (see fleet_collector.py for the template)
+PROBE_COMMAND = "ssh -o BatchMode=yes -o ConnectTimeout=5 {host} python3 /root/core_planner.py probe"
+
+def probe_machine():
+    """
+    Returns this machine's core count and RAM in GB.
+    """
+    ram_gb = 0.0
+    with open("/proc/meminfo", 'r') as f:
+        for line in f:
+            if line.startswith("MemTotal:"):
+                ram_gb = int(line.split()[1]) / 1024 / 1024
+                break
+    return {"cores": os.cpu_count(), "ram_gb": round(ram_gb, 1)}
+
+def core_range(start_core, workers):
+    """
+    Cores the data workers of a node run on, as para.sh numbers them: a node
+    starting at 0 runs the parent itself and workers 1..workers-1, every other
+    node runs start+1..start+workers.
+    """
+    if start_core == 0:
+        return 1, workers - 1
+    return start_core + 1, start_core + workers
+
+def next_start(start_core, workers):
+    return core_range(start_core, workers)[1]
+
+def port_range(workers):
+    """
+    Port range clusterupdate.bash configure_ufw opens for a node.
+    """
+    return PORT_BASE, PORT_BASE + workers
+
+def worker_capacity(cores, ram_gb, ram_per_worker=2.0, reserve_cores=0):
+    """
+    Workers a machine can run: one per core, limited by RAM.
+    """
+    by_ram = int(ram_gb // ram_per_worker) if ram_per_worker > 0 else cores
+    return max(0, min(cores - reserve_cores, by_ram))
+
+def plan_cluster(nodes, inventory, ram_per_worker=2.0, reserve_cores=0):
+    """
+    Lays out contiguous, non-overlapping core ranges for one cluster. The node
+    at start core 0 stays master and the order of the other nodes is kept, so
+    only the nodes after a resized one move. Nodes without inventory keep their
+    current worker count.
+    """
+    ordered = [node for node in nodes if node["start_core"] == 0] + [node for node in nodes if node["start_core"] != 0]
+    planned = []
+    start = 0
+    for node in ordered:
+        machine = inventory.get(node["node"])
+        if machine:
+            workers = worker_capacity(machine["cores"], machine["ram_gb"], ram_per_worker, reserve_cores)
+        else:
+            workers = node["workers"]
+        if workers <= (1 if start == 0 else 0):
+            continue
+        planned.append(dict(node, start_core=start, workers=workers))
+        start = next_start(start, workers)
+    return planned
+
+def plan(nodes, inventory, ram_per_worker=2.0, reserve_cores=0):
+    """
+    Plans every cluster and returns the nodes in node_nr.txt order, new ones last.
+    """
+    clusters = {}
+    for node in nodes:
+        clusters.setdefault(node["cluster"], []).append(node)
+    planned = {}
+    for cluster_nodes in clusters.values():
+        for node in plan_cluster(cluster_nodes, inventory, ram_per_worker, reserve_cores):
+            planned[node["node"]] = node
+    return [planned[node["node"]] for node in nodes if node["node"] in planned]
+
+def validate(nodes, ufw_status=None, node_nr=None):
+    """
+    Returns a list of problems: duplicate nodes, overlapping or non-contiguous
+    core ranges within a cluster, port ranges outside the valid ports and, with
+    'ufw status' output, a port range that does not match node_nr.txt.
+    """
+    problems = []
+    seen = set()
+    clusters = {}
+    for node in nodes:
+        if node["node"] in seen:
+            problems.append(f"Node {node['node']} is listed twice")
+        seen.add(node["node"])
+        clusters.setdefault(node["cluster"], []).append(node)
+        if port_range(node["workers"])[1] > PORT_MAX:
+            problems.append(f"Node {node['node']}: port range ends above {PORT_MAX}")
+
+    for cluster, cluster_nodes in clusters.items():
+        masters = [node for node in cluster_nodes if node["start_core"] == 0]
+        if len(masters) != 1:
+            problems.append(f"Cluster {cluster}: {len(masters)} nodes start at core 0")
+        ranges = sorted((core_range(node["start_core"], node["workers"]), node["node"]) for node in cluster_nodes)
+        for ((first, last), nr), ((next_first, next_last), next_nr) in zip(ranges, ranges[1:]):
+            if next_first <= last:
+                problems.append(f"Cluster {cluster}: cores of node {nr} ({first}-{last}) and node {next_nr} "
+                                f"({next_first}-{next_last}) overlap")
+            elif next_first > last + 1:
+                problems.append(f"Cluster {cluster}: cores {last + 1}-{next_first - 1} between node {nr} "
+                                f"and node {next_nr} are unused")
+
+    if ufw_status is not None and node_nr is not None:
+        node = next((node for node in nodes if node["node"] == node_nr), None)
+        if node is None:
+            problems.append(f"Node {node_nr} is not in the node list")
+        else:
+            expected = "{}:{}/tcp".format(*port_range(node["workers"]))
+            allowed = re.findall(r"^(\d+:\d+/tcp)\s+ALLOW", ufw_status, re.MULTILINE)
+            if expected not in allowed:
+                problems.append(f"Node {node_nr}: ufw does not allow {expected} (allowed: {', '.join(allowed) or 'none'})")
+    return problems
+
+def format_node_nr(nodes):
+    return "".join(f"{node['node']}\t{node['start_core']}\t{node['workers']}\t{node['cluster']}\n" for node in nodes)
+
+def write_node_nr(nodes, path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(format_node_nr(nodes))
+    os.replace(tmp_path, path)
+
+def read_inventory(path):
+    """
+    Reads 'NODE_NR CORES RAM_GB' lines.
+    """
+    inventory = {}
+    with open(path, 'r') as f:
+        for line in f:
+            parts = line.split("#", 1)[0].split()
+            if len(parts) >= 3 and parts[0].isdigit():
+                inventory[int(parts[0])] = {"cores": int(parts[1]), "ram_gb": float(parts[2])}
+    return inventory
+
+def collect_inventory(nodes, hosts_path, command, concurrency, timeout):
+    """
+    Probes every node over the fleet collector; unreachable nodes are left out.
+    """
+    inventory = {}
+    for entry in collect_fleet(nodes, read_hosts(hosts_path), command, concurrency, timeout):
+        if entry["status"] == "ok" and "cores" in entry:
+            inventory[entry["node"]] = {"cores": entry["cores"], "ram_gb": entry["ram_gb"]}
+        else:
+            print(f"Warning: node {entry['node']} not probed ({entry['status']}), keeping its worker count",
+                  file=sys.stderr)
+    return inventory
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan and check the core ranges in node_nr.txt.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("probe", help="Print this machine's cores and RAM as JSON")
+
+    plan_parser = subparsers.add_parser("plan", help="Compute new core ranges from the real machine sizes")
+    plan_parser.add_argument("--inventory", help="'NODE_NR CORES RAM_GB' lines instead of probing the nodes")
+    plan_parser.add_argument("--hosts", default=HOSTS_FILE, help=f"'NODE_NR HOST' lines (default: {HOSTS_FILE})")
+    plan_parser.add_argument("--probe-command", default=PROBE_COMMAND, help="Probe command, {host} is replaced")
+    plan_parser.add_argument("--concurrency", type=int, default=8, help="Nodes probed at the same time (default: 8)")
+    plan_parser.add_argument("--timeout", type=float, default=20, help="Seconds per node (default: 20)")
+    plan_parser.add_argument("--ram-per-worker", type=float, default=2.0, help="GB of RAM per worker (default: 2)")
+    plan_parser.add_argument("--reserve-cores", type=int, default=0, help="Cores left free on every node (default: 0)")
+    plan_parser.add_argument("--add", action="append", default=[], metavar="NODE_NR:CLUSTER",
+                             help="Add a new node to a cluster (repeatable)")
+    plan_parser.add_argument("--output", help="Write the new node_nr.txt here instead of printing it")
+
+    validate_parser = subparsers.add_parser("validate", help="Check core and port ranges")
+    validate_parser.add_argument("--node", type=int, help="Also check this node's ufw port range")
+    for sub in (plan_parser, validate_parser):
+        sub.add_argument("--nodes", default=NODE_NR_FILE, help=f"Node list (default: {NODE_NR_FILE})")
+    args = parser.parse_args()
+
+    if args.command == "probe":
+        print(json.dumps(probe_machine()))
+        return
+
+    try:
+        nodes = read_nodes(args.nodes)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.command == "validate":
+        ufw_status = None
+        if args.node is not None:
+            ufw_status = subprocess.run(["ufw", "status"], stdout=subprocess.PIPE, universal_newlines=True).stdout
+        problems = validate(nodes, ufw_status, args.node)
+        for problem in problems:
+            print(f"Error: {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"{len(nodes)} nodes OK.")
+        return
+
+    for addition in args.add:
+        node_nr, _, cluster = addition.partition(":")
+        nodes.append({"node": int(node_nr), "start_core": -1, "workers": 0, "cluster": cluster or "A"})
+    if args.inventory:
+        inventory = read_inventory(args.inventory)
+    else:
+        inventory = collect_inventory(nodes, args.hosts, args.probe_command, args.concurrency, args.timeout)
+
+    planned = plan(nodes, inventory, args.ram_per_worker, args.reserve_cores)
+    problems = validate(planned)
+    if problems:
+        for problem in problems:
+            print(f"Error: {problem}")
+        sys.exit(1)
+
+    previous = {node["node"]: node for node in nodes}
+    planned_nrs = {node["node"] for node in planned}
+    for node in nodes:
+        if node["node"] not in planned_nrs:
+            print(f"Warning: node {node['node']} has no usable workers and was left out", file=sys.stderr)
+    for node in planned:
+        old = previous[node["node"]]
+        if (old["start_core"], old["workers"]) != (node["start_core"], node["workers"]):
+            print(f"Node {node['node']}: {old['start_core']} {old['workers']} -> {node['start_core']} {node['workers']}",
+                  file=sys.stderr)
+    print(f"Active workers: {sum(node['workers'] for node in planned)}", file=sys.stderr)
+    if args.output:
+        write_node_nr(planned, args.output)
+    else:
+        sys.stdout.write(format_node_nr(planned))
+
+if __name__ == "__main__":
+    main()
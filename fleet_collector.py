@@ -0,0 +1,245 @@
+#!/usr/bin/python3
+import argparse
+import json
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from check_store import DB_FILE, FIELD_COLUMNS, connect, latest_check_nr
+from report_records import ANSI_ESCAPE
+
+# The cluster table (node_nr.txt of this repository); on the nodes /root/node_nr.txt
+# only holds the node's own number and cluster letter
+NODE_NR_FILE = "/root/cluster_node_nr.txt"
+HOSTS_FILE = "/root/fleet_hosts.txt"
+REPORT_LOG = "/root/coinreport.log"
+
+# {host} and {node} are filled in per node; the remote side prints its latest results as JSON
+DEFAULT_COMMAND = "ssh -o BatchMode=yes -o ConnectTimeout=5 {host} python3 /root/fleet_collector.py --local"
+
+# (column header, key in the node result, width)
+TABLE_COLUMNS = [
+    ("Node", "node", 6),
+    ("Host", "host", 18),
+    ("Workers", "workers", 8),
+    ("Check", "check_nr", 7),
+    ("Age", "age", 8),
+    ("Frame", "Max Frame", 9),
+    ("Ring", "Prover Ring", 5),
+    ("Seniority", "Seniority", 10),
+    ("Proofs", "Proofs", 7),
+    ("Coins", "Coins", 7),
+    ("Balance", "Owned balance", 12),
+    ("QUIL/Worker", "Total per Worker", 12),
+    ("Landing", "Landing Rate", 9),
+    ("Status", "status", 10),
+]
+
+def read_nodes(node_nr_path=NODE_NR_FILE):
+    """
+    Reads node_nr.txt ('NODE_NR START_CORE WORKERS CLUSTER' per line).
+    """
+    nodes = []
+    with open(node_nr_path, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[0].isdigit():
+                nodes.append({
+                    "node": int(parts[0]),
+                    "start_core": int(parts[1]),
+                    "workers": int(parts[2]),
+                    "cluster": parts[3] if len(parts) > 3 else "",
+                })
+    return nodes
+
+def read_hosts(hosts_path=HOSTS_FILE):
+    """
+    Reads the 'NODE_NR HOST' lines that map node numbers to SSH hosts.
+    """
+    hosts = {}
+    with open(hosts_path, 'r') as f:
+        for line in f:
+            parts = line.split("#", 1)[0].split()
+            if len(parts) >= 2 and parts[0].isdigit():
+                hosts[int(parts[0])] = parts[1]
+    return hosts
+
+def local_results(db_path=DB_FILE, report_log=REPORT_LOG):
+    """
+    Latest check from the check store and latest coin report of this node.
+    """
+    result = {}
+    if os.path.exists(db_path):
+        conn = connect(db_path)
+        check_nr = latest_check_nr(conn)
+        if check_nr is not None:
+            columns = ", ".join(column for _, column in FIELD_COLUMNS)
+            row = conn.execute(f"SELECT {columns}, active_workers FROM checks WHERE check_nr = ?",
+                               (check_nr,)).fetchone()
+            result.update({key: value for (key, _), value in zip(FIELD_COLUMNS, row) if value is not None})
+            result["Active Workers"] = row[-1]
+            result["check_nr"] = check_nr
+            result["updated"] = os.path.getmtime(db_path)
+    if os.path.exists(report_log):
+        # Imported here because only the nodes themselves need coinrepcomp (and tabulate)
+        try:
+            from coinrepcomp import display_value, iter_reports_reverse, load_records
+        except ImportError:
+            return result
+        records = load_records(report_log, limit=1)
+        if records:
+            result.update({key: display_value(key, value) for key, value in records[0].items()})
+            return result
+        report = next(iter_reports_reverse(report_log), None)
+        if report:
+            result.update({key: ANSI_ESCAPE.sub('', value) for key, value in report.items()})
+    return result
+
+def kill_group(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+def collect_node(node, host, command_template, timeout, running):
+    """
+    Runs the collect command for one node and returns its parsed results.
+    The process is kept in 'running' so it can be killed when the deadline passes.
+    """
+    entry = dict(node, host=host)
+    command = [part.format(host=host, node=node["node"]) for part in shlex.split(command_template)]
+    try:
+        # Own session, so the whole process group can be killed (e.g. ssh behind a wrapper)
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   universal_newlines=True, start_new_session=True)
+    except OSError as e:
+        entry["status"] = "error"
+        entry["error"] = str(e)
+        return entry
+    running.add(process)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_group(process)
+        process.communicate()
+        entry["status"] = "timeout"
+        return entry
+    finally:
+        running.discard(process)
+    if process.returncode != 0:
+        entry["status"] = f"exit {process.returncode}"
+        entry["error"] = stderr.strip()
+        return entry
+    try:
+        values = json.loads(stdout)
+    except ValueError:
+        values = None
+    if not isinstance(values, dict):
+        entry["status"] = "bad output"
+        return entry
+    entry.update(values)
+    entry["status"] = "ok"
+    return entry
+
+def collect_fleet(nodes, hosts, command_template=DEFAULT_COMMAND, concurrency=8, timeout=20, deadline=None):
+    """
+    Collects all nodes with at most 'concurrency' commands at a time. Nodes that
+    have not answered when 'deadline' seconds have passed are reported as pending,
+    so slow hosts never hold back the table.
+    """
+    entries = {}
+    running = set()
+    futures = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for node in nodes:
+            host = hosts.get(node["node"])
+            if host is None:
+                entries[node["node"]] = dict(node, host="", status="no host")
+            else:
+                futures[executor.submit(collect_node, node, host, command_template, timeout, running)] = node
+        done, not_done = wait(futures, timeout=deadline)
+        for future in not_done:
+            future.cancel()
+        for process in list(running):
+            kill_group(process)
+    for future in done:
+        node = futures[future]
+        try:
+            entry = future.result()
+        except Exception as e:
+            # One broken host only loses its own row
+            entry = dict(node, host=hosts[node["node"]], status="error", error=str(e))
+        entries[node["node"]] = entry
+    for future in not_done:
+        node = futures[future]
+        entries[node["node"]] = dict(node, host=hosts[node["node"]], status="pending")
+    return [entries[node["node"]] for node in nodes]
+
+def format_age(seconds):
+    if seconds < 3600:
+        return f"{seconds // 60:.0f}m"
+    if seconds < 86400:
+        return f"{seconds // 3600:.0f}h"
+    return f"{seconds // 86400:.0f}d"
+
+def format_fleet_table(entries, now=None):
+    """
+    Builds the fleet table plus a totals line.
+    """
+    now = time.time() if now is None else now
+    lines = ["".join(f"{header:<{width}}" for header, _, width in TABLE_COLUMNS)]
+    for entry in entries:
+        values = dict(entry)
+        if "updated" in entry:
+            values["age"] = format_age(now - entry["updated"])
+        lines.append("".join(
+            f"{str(values.get(key, '-') if values.get(key) is not None else '-'):<{width}}"
+            for _, key, width in TABLE_COLUMNS
+        ))
+
+    answered = [entry for entry in entries if entry["status"] == "ok"]
+    total_workers = sum(entry["workers"] for entry in entries)
+    balance = sum(entry.get("Owned balance") or 0 for entry in answered)
+    lines.append("")
+    lines.append(f"Nodes answered: {len(answered)}/{len(entries)} - Workers: {total_workers} - "
+                 f"Owned balance (answered nodes): {balance:.2f}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect the latest quileye and coinrep results from all cluster nodes.")
+    parser.add_argument("--local", action="store_true", help="Print this node's latest results as JSON and exit")
+    parser.add_argument("--db", default=DB_FILE, help=f"Check store for --local (default: {DB_FILE})")
+    parser.add_argument("--report-log", default=REPORT_LOG, help=f"Coin report log for --local (default: {REPORT_LOG})")
+    parser.add_argument("--nodes", default=NODE_NR_FILE, help=f"Node list (default: {NODE_NR_FILE})")
+    parser.add_argument("--hosts", default=HOSTS_FILE, help=f"'NODE_NR HOST' lines (default: {HOSTS_FILE})")
+    parser.add_argument("--command", default=DEFAULT_COMMAND,
+                        help="Collect command, {host} and {node} are replaced (default: ssh ... --local)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Nodes queried at the same time (default: 8)")
+    parser.add_argument("--timeout", type=float, default=20, help="Seconds per node (default: 20)")
+    parser.add_argument("--deadline", type=float, help="Print what arrived after this many seconds")
+    parser.add_argument("--json", action="store_true", help="Print the merged results as JSON")
+    args = parser.parse_args()
+
+    if args.local:
+        print(json.dumps(local_results(args.db, args.report_log)))
+        return
+
+    try:
+        nodes = read_nodes(args.nodes)
+        hosts = read_hosts(args.hosts)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    entries = collect_fleet(nodes, hosts, args.command, args.concurrency, args.timeout, args.deadline)
+    if args.json:
+        print(json.dumps(entries, indent=1))
+    else:
+        print(format_fleet_table(entries))
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,32 @@ FILES=(
     "open_quileye.py"
     "blink_quileye.bash"
     "quileye2.bash"
+    "journal_reader.py"
+    "proof_analyzer.py"
+    "journal_cursor.py"
+    "proof_histogram.py"
+    "check_store.py"
+    "snapshot_cache.py"
+    "fleet_collector.py"
+    "core_planner.py"
+    "release_fetcher.py"
+    "rolling_update.py"
+    "quil_report.py"
+    "thresholds.py"
+    "report_records.py"
+    "quil_dashboard.py"
+    "coinrepcomp.py"
+    "shard_intervals.py"
+    "quileye.bash"
+    "quileye_para.bash"
+    "coin_aggregator.py"
+    "coinrep.bash"
+    "memory_guard.py"
+    "ramcheck.bash"
+    "ping_probe.py"
+    "cm_pingcheck.bash"
+    "metrics_exporter.py"
+    "landing_correlation.py"
 )
 
 # Installation directory
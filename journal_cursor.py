@@ -0,0 +1,292 @@
+#!/usr/bin/python3
+import argparse
+import fcntl
+import json
+import os
+import tempfile
+import time
+
+from journal_reader import JournalError, iter_journal_lines, message_text, extract_fields, service_unit
+from proof_analyzer import CREATE_MARKER, SUBMIT_MARKER
+from proof_histogram import prune_histograms, record_value
+
+# Aggregates are saved next to /root/quileye_settings.txt
+STATE_DIR = "/root"
+
+# How far back the aggregate reaches (grows when a longer window is requested)
+DEFAULT_RETENTION_MINUTES = 600
+
+# Unpaired proofs are kept this long waiting for their counterpart
+PENDING_MINUTES = 30
+
+# Number of shard entries kept for the interval statistics (shard_intervals.py)
+SHARD_KEEP = 5000
+
+SHARD_MARKER = "shard"
+SHARD_FIELDS = ("frame_number", "frame_age", "ring", "active_workers", "ts")
+
+def state_path(service, state_dir=STATE_DIR):
+    """
+    Returns the aggregate file of a service, e.g. /root/quileye_journal_para.json.
+    """
+    name = service_unit(service)[:-len(".service")]
+    return os.path.join(state_dir, f"quileye_journal_{name}.json")
+
+def new_state(retention, now, previous=None):
+    """
+    Empty aggregate. The hourly histograms of 'previous' are kept for the hours
+    that end before the new coverage starts, the journal is read again from there.
+    """
+    covered_since = now - retention * 60
+    histograms = {}
+    if previous is not None:
+        histograms = {key: hour for key, hour in previous.get("histograms", {}).items()
+                      if (int(key) + 1) * 3600 <= covered_since}
+    return {
+        "cursor": None,
+        "retention": retention,
+        "covered_since": covered_since,
+        "buckets": {},
+        "pending": {},
+        "shards": [],
+        "histograms": histograms
+    }
+
+def load_state(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def save_state(path, state):
+    """
+    Writes the aggregate atomically so an interrupted run never leaves half a file.
+    Every writer gets its own temporary file, so writers never truncate each other's.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _bucket(state, realtime):
+    # One bucket per minute: [creates, creation sum, submits, submission sum, matches, cpu sum, unmatched]
+    key = str(int(realtime // 60))
+    bucket = state["buckets"].get(key)
+    if bucket is None:
+        bucket = state["buckets"][key] = [0, 0.0, 0, 0.0, 0, 0.0, 0]
+    return bucket
+
+def _fold_proof(state, realtime, frame_number, frame_age, is_create):
+    bucket = _bucket(state, realtime)
+    histograms = state.setdefault("histograms", {})
+    if is_create:
+        bucket[0] += 1
+        bucket[1] += frame_age
+        record_value(histograms, realtime, "creation", frame_age)
+    else:
+        bucket[2] += 1
+        bucket[3] += frame_age
+        record_value(histograms, realtime, "submission", frame_age)
+    if frame_number is None:
+        return
+
+    # Same pairing rule as match_proofs: a submission is never older than its creation
+    pending = state["pending"].setdefault(str(frame_number), {"c": [], "s": [], "t": realtime})
+    pending["t"] = realtime
+    if is_create:
+        candidates = [age for age in pending["s"] if age >= frame_age]
+        if candidates:
+            submit_age = min(candidates)
+            pending["s"].remove(submit_age)
+            bucket[4] += 1
+            bucket[5] += submit_age - frame_age
+            record_value(histograms, realtime, "cpu", submit_age - frame_age)
+        else:
+            pending["c"].append(frame_age)
+    else:
+        candidates = [age for age in pending["c"] if age <= frame_age]
+        if candidates:
+            create_age = min(candidates)
+            pending["c"].remove(create_age)
+            bucket[4] += 1
+            bucket[5] += frame_age - create_age
+            record_value(histograms, realtime, "cpu", frame_age - create_age)
+        else:
+            pending["s"].append(frame_age)
+    if not pending["c"] and not pending["s"]:
+        del state["pending"][str(frame_number)]
+
+def _fold_shard(state, realtime, fields):
+    state["shards"].append([realtime] + [fields[name] for name in SHARD_FIELDS])
+
+def fold_lines(state, lines):
+    """
+    Folds raw journal JSON lines into the aggregate and advances the cursor.
+    Returns the number of lines read.
+    """
+    count = 0
+    last_line = None
+    for line in lines:
+        count += 1
+        last_line = line
+        is_create = CREATE_MARKER in line
+        if not is_create and SUBMIT_MARKER not in line and SHARD_MARKER not in line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        message = message_text(record)
+        try:
+            realtime = int(record["__REALTIME_TIMESTAMP"]) / 1000000
+        except (KeyError, ValueError):
+            realtime = time.time()
+        fields = extract_fields(message)
+
+        if CREATE_MARKER in message or SUBMIT_MARKER in message:
+            try:
+                frame_age = float(fields["frame_age"])
+            except (KeyError, TypeError, ValueError):
+                frame_age = None
+            if frame_age is not None:
+                _fold_proof(state, realtime, fields.get("frame_number"), frame_age, CREATE_MARKER in message)
+        if SHARD_MARKER in message and all(name in fields for name in SHARD_FIELDS):
+            _fold_shard(state, realtime, fields)
+
+    if last_line is not None:
+        try:
+            state["cursor"] = json.loads(last_line).get("__CURSOR", state["cursor"])
+        except ValueError:
+            pass
+    return count
+
+def prune(state, now):
+    """
+    Drops buckets outside the retention, histograms older than HISTOGRAM_HOURS,
+    expires unpaired proofs and caps the shard list.
+    """
+    oldest_minute = int((now - state["retention"] * 60) // 60)
+    state["buckets"] = {key: bucket for key, bucket in state["buckets"].items() if int(key) >= oldest_minute}
+    prune_histograms(state.setdefault("histograms", {}), now)
+
+    for frame_number, pending in list(state["pending"].items()):
+        if now - pending["t"] > PENDING_MINUTES * 60:
+            if pending["c"]:
+                _bucket(state, pending["t"])[6] += len(pending["c"])
+            del state["pending"][frame_number]
+
+    state["shards"] = state["shards"][-SHARD_KEEP:]
+    state["covered_since"] = max(state["covered_since"], now - state["retention"] * 60)
+
+def update_aggregate(service, window_minutes, state_dir=STATE_DIR, source=None, save=True):
+    """
+    Reads only the journal entries after the saved cursor and folds them into the
+    on-disk aggregate. The full window is only read on the first run, after the
+    cursor became invalid, or when a longer window than covered is requested.
+    Load, fold and save run under an exclusive lock on '<aggregate>.lock', so the
+    cron jobs, the exporter and blink never fold the same entries twice or save
+    over each other. With save=False the entries are folded in memory only.
+    """
+    path = state_path(service, state_dir)
+    if not save:
+        return _update_state(service, window_minutes, path, source)
+    with open(f"{path}.lock", 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        state = _update_state(service, window_minutes, path, source)
+        save_state(path, state)
+    return state
+
+def _update_state(service, window_minutes, path, source):
+    return fold_journal(load_state(path), service, window_minutes, source)
+
+def fold_journal(state, service, window_minutes, source=None):
+    """
+    Folds the journal entries after the cursor of 'state' (None: a new aggregate)
+    and returns the updated aggregate without saving it. A caller that keeps the
+    returned state, such as the dashboard, only reads new entries on the next call.
+    """
+    now = time.time()
+    retention = max(DEFAULT_RETENTION_MINUTES, window_minutes)
+
+    # An aggregate saved before the histograms existed is read again once to fill them.
+    # A source file has no cursor to continue from, so it is always folded into a new one
+    if (source or state is None or not state.get("cursor") or "histograms" not in state
+            or state["covered_since"] > now - window_minutes * 60 + 60):
+        if state is not None:
+            retention = max(retention, state.get("retention", retention))
+        state = new_state(retention, now, state)
+    else:
+        state["retention"] = max(state["retention"], retention)
+
+    try:
+        if state["cursor"] and not source:
+            fold_lines(state, iter_journal_lines(service, after_cursor=state["cursor"]))
+        else:
+            fold_lines(state, iter_journal_lines(service, source=source, since_minutes=state["retention"]))
+    except JournalError:
+        if not state["cursor"]:
+            raise
+        # The journal was rotated or vacuumed past the cursor: start over
+        state = new_state(state["retention"], now, state)
+        fold_lines(state, iter_journal_lines(service, since_minutes=state["retention"]))
+
+    prune(state, now)
+    return state
+
+def proof_window(state, window_minutes, now=None):
+    """
+    Computes the proof summary of the last 'window_minutes' from the aggregate.
+    Returns (summary, unmatched creations) where summary matches proof_analyzer.summarize.
+    """
+    now = time.time() if now is None else now
+    first_minute = int((now - window_minutes * 60) // 60)
+    totals = [0, 0.0, 0, 0.0, 0, 0.0, 0]
+    for key, bucket in state["buckets"].items():
+        if int(key) >= first_minute:
+            for i, value in enumerate(bucket):
+                totals[i] += value
+
+    creates, create_sum, submits, submit_sum, matches, cpu_sum, unmatched = totals
+    if not creates or not submits or not matches:
+        return None, unmatched
+    return (creates, create_sum / creates, submit_sum / submits, cpu_sum / matches), unmatched
+
+def shard_entries(state, count):
+    """
+    Returns the last 'count' shard entries in chronological order as
+    (realtime, frame_number, frame_age, ring, active_workers, ts) lists.
+    """
+    return state["shards"][-count:] if count > 0 else []
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally aggregate proof and shard journal entries.")
+    parser.add_argument("command", choices=["update", "shards"],
+                        help="update: fold new entries; shards: print the latest shard lines")
+    parser.add_argument("service", help="Service name, for example ceremonyclient or para")
+    parser.add_argument("count", nargs="?", type=int, default=DEFAULT_RETENTION_MINUTES,
+                        help="update: window in minutes; shards: number of entries")
+    parser.add_argument("--input", help="Read journalctl -o json output from a file ('-' for stdin)")
+    args = parser.parse_args()
+
+    if args.command == "update":
+        state = update_aggregate(args.service, args.count, source=args.input)
+        print(f"Aggregate updated: {len(state['buckets'])} minutes, {len(state['shards'])} shard entries")
+        return
+
+    state = update_aggregate(args.service, DEFAULT_RETENTION_MINUTES, source=args.input)
+    for realtime, frame_number, frame_age, ring, active_workers, ts in shard_entries(state, args.count):
+        date_part = time.strftime("%b %d %H:%M:%S", time.localtime(realtime))
+        fields = json.dumps({
+            "frame_number": frame_number, "frame_age": frame_age, "ring": ring,
+            "active_workers": active_workers, "ts": ts
+        }, separators=(',', ':'))
+        print(f"{date_part} {fields}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+import json
+import re
+import subprocess
+import sys
+
+class JournalError(Exception):
+    """
+    Raised when journalctl exits with an error (e.g. an unknown cursor).
+    """
+
+# Fallback for messages whose JSON part is cut off or not valid JSON
+FIELD_PATTERN = re.compile(r'"(\w+)":("(?:[^"\\]|\\.)*"|[^,}\s]+)')
+
+def service_unit(service):
+    """
+    Returns the systemd unit name for a service ("para" -> "para.service").
+    """
+    service = service.strip()
+    return service if service.endswith(".service") else f"{service}.service"
+
+def journal_command(service, since_minutes=None, after_cursor=None, reverse=False, lines=None, follow=False):
+    """
+    Builds the journalctl command that streams the unit's records as JSON.
+    """
+    command = ["journalctl", "-u", service_unit(service), "--no-hostname", "-o", "json"]
+    if since_minutes is not None:
+        command += ["--since", f"{since_minutes} minutes ago"]
+    if after_cursor:
+        command += ["--after-cursor", after_cursor]
+    if reverse:
+        command.append("--reverse")
+    if lines is not None:
+        command += ["-n", str(lines)]
+    if follow:
+        command.append("-f")
+    return command
+
+def iter_journal_lines(service=None, source=None, **options):
+    """
+    Yields the raw JSON lines of one journalctl run, or of a file when 'source'
+    is given ('-' reads stdin). The journal is only read once.
+    """
+    if source == "-":
+        yield from sys.stdin
+        return
+    if source:
+        with open(source, 'r', errors='replace') as f:
+            yield from f
+        return
+
+    process = subprocess.Popen(
+        journal_command(service, **options),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        universal_newlines=True,
+        errors='replace'
+    )
+    try:
+        yield from process.stdout
+    finally:
+        # The caller may stop early (e.g. --reverse with a limit)
+        if process.poll() is None:
+            process.terminate()
+        process.stdout.close()
+        process.wait()
+    if process.returncode != 0:
+        raise JournalError(f"journalctl exited with status {process.returncode}")
+
+def iter_journal_records(service=None, source=None, markers=None, **options):
+    """
+    Yields journal records as dictionaries. When 'markers' is given, lines that
+    contain none of them are skipped before decoding the JSON.
+    """
+    for line in iter_journal_lines(service, source, **options):
+        if markers and not any(marker in line for marker in markers):
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict):
+            yield record
+
+def message_text(record):
+    """
+    Returns the MESSAGE field of a record as text. journald stores messages that
+    are not valid UTF-8 as a list of byte values.
+    """
+    message = record.get("MESSAGE")
+    if message is None:
+        return ""
+    if isinstance(message, list):
+        return bytes(message).decode('utf-8', errors='replace')
+    return str(message)
+
+def _convert_field(raw_value):
+    if raw_value.startswith('"'):
+        try:
+            return json.loads(raw_value)
+        except ValueError:
+            return raw_value.strip('"')
+    try:
+        return int(raw_value)
+    except ValueError:
+        pass
+    try:
+        return float(raw_value)
+    except ValueError:
+        return raw_value
+
+def extract_fields(message):
+    """
+    Extracts the structured fields (frame_number, frame_age, ring, ...) from the
+    JSON part of a node log message.
+    """
+    start = message.find('{')
+    end = message.rfind('}')
+    if start == -1:
+        return {}
+    if end > start:
+        try:
+            fields = json.loads(message[start:end + 1])
+            if isinstance(fields, dict):
+                return fields
+        except ValueError:
+            pass
+    return {key: _convert_field(value) for key, value in FIELD_PATTERN.findall(message[start:])}
@@ -0,0 +1,355 @@
+#!/usr/bin/python3
+"""
+Joins the coin reports (coinreport.log) with the quileye2 checks (quileye2.log)
+by time and correlates the landing rate and the earnings with the proof timings,
+Active Workers and Prover Ring. Every coin report covers the 'hours' before it,
+so it is paired with the mean of the checks taken in that window. Both logs are
+read from their JSON records where those exist.
+
+  landing_correlation.py                    correlation and regression table
+  landing_correlation.py --csv joined.csv   also write the joined dataset
+"""
+import argparse
+import csv
+import math
+import re
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from check_store import LOG_FILE, extract_check_fields
+from report_records import ANSI_ESCAPE, first_record, iter_records_reverse
+
+REPORT_LOG = "/root/coinreport.log"
+
+# Values averaged over the checks of a report window, in table order
+KNOBS = ["Creation", "Submission", "CPU-Processing", "Active Workers", "Prover Ring"]
+TARGETS = ["Landing Rate", "Total per Worker"]
+# CPU-Processing is about Submission - Creation, so together with those two it would
+# make the regression collinear; it only gets a Pearson r
+REGRESSION_KNOBS = [knob for knob in KNOBS if knob != "CPU-Processing"]
+# A knob whose variance is explained by the other knobs to more than 1 - this
+# (R² > 0.999) makes the betas meaningless
+COLLINEAR_TOLERANCE = 1e-3
+
+CHECK_HEADER = re.compile(r"^Check-Nr (\d+):")
+DATE_PATTERN = re.compile(r"Date: (.+?)\s*$")
+ACTIVE_WORKERS_PATTERN = re.compile(r"Active Workers: (\d+)")
+
+def parse_date(text):
+    """
+    Epoch seconds of a `date` output such as 'Wed Dec  4 10:00:00 UTC 2024', or None.
+    """
+    parts = text.split()
+    if len(parts) == 6:
+        # Drop the timezone name, strptime only knows a few of them
+        parts.pop(4)
+    try:
+        return datetime.strptime(" ".join(parts), "%a %b %d %H:%M:%S %Y").timestamp()
+    except ValueError:
+        return None
+
+def number(value):
+    """
+    Float of a record number or a log text value (ANSI codes, '%' and units removed), or None.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"[-+]?\d+(?:\.\d+)?", ANSI_ESCAPE.sub('', str(value)))
+    return float(match.group(0)) if match else None
+
+def load_coin_reports(log_path=REPORT_LOG):
+    """
+    Coin reports as {'time', 'hours', target: value} dicts, oldest first.
+    coinrepcomp.load_history decides between the records and the log text; without
+    tabulate (which coinrepcomp needs) only the JSON records are read.
+    """
+    try:
+        from coinrepcomp import load_history
+    except ImportError:
+        load_history = None
+
+    reports = []
+    if load_history is not None:
+        for report in load_history(log_path):
+            report_time = parse_date(report.get('Date', ''))
+            hours = number(report.get('Check'))
+            if report_time is not None and hours:
+                reports.append(dict({target: number(report.get(target)) for target in TARGETS},
+                                    time=report_time, hours=hours))
+        return reports
+
+    for record in iter_records_reverse(log_path):
+        values = record.get("report", {})
+        reports.append(dict({target: number(values.get(target)) for target in TARGETS},
+                            time=record["time"], hours=record["hours"]))
+    reports.reverse()
+    return reports
+
+def read_log_checks(log_path, before=None):
+    """
+    Checks from the quileye2.log text, for the ones written before the records.
+    Stops at check number 'before'.
+    """
+    checks = []
+    check_nr = None
+    block = []
+
+    def flush():
+        text = ANSI_ESCAPE.sub('', "".join(block))
+        date_match = DATE_PATTERN.search(block[0]) if block else None
+        check_time = parse_date(date_match.group(1)) if date_match else None
+        if check_nr is not None and check_time is not None:
+            check = extract_check_fields(text.splitlines())
+            workers_match = ACTIVE_WORKERS_PATTERN.search(text)
+            check["Active Workers"] = int(workers_match.group(1)) if workers_match else None
+            checks.append(dict(check, time=check_time))
+
+    try:
+        with open(log_path, 'r', errors='replace') as f:
+            for line in f:
+                match = CHECK_HEADER.match(ANSI_ESCAPE.sub('', line))
+                if match:
+                    flush()
+                    check_nr = int(match.group(1))
+                    block = []
+                    if before is not None and check_nr >= before:
+                        return checks
+                elif check_nr is not None and len(block) < 3 and line.strip():
+                    block.append(line)
+    except FileNotFoundError:
+        return checks
+    flush()
+    return checks
+
+def load_checks(log_path=LOG_FILE):
+    """
+    Checks as {'time', knob: value} dicts, oldest first: the JSON records, and the
+    log text for the checks written before the first record.
+    """
+    checks = []
+    for record in iter_records_reverse(log_path):
+        check = dict(record.get("check", {}), time=record["time"])
+        check["Active Workers"] = record.get("active_workers")
+        checks.append(check)
+    checks.reverse()
+
+    first = first_record(log_path)
+    if first is None:
+        return read_log_checks(log_path)
+    if first.get("check_nr", 1) > 1:
+        checks = read_log_checks(log_path, before=first["check_nr"]) + checks
+    return checks
+
+class WindowMeans:
+    """
+    Prefix sums per knob over the checks sorted by time, so the mean of any
+    time window costs two binary searches.
+    """
+    def __init__(self, checks):
+        checks = sorted(checks, key=lambda check: check["time"])
+        self.times = [check["time"] for check in checks]
+        self.sums = {}
+        self.counts = {}
+        for knob in KNOBS:
+            sums = [0.0]
+            counts = [0]
+            for check in checks:
+                value = number(check.get(knob))
+                sums.append(sums[-1] + (value if value is not None else 0.0))
+                counts.append(counts[-1] + (value is not None))
+            self.sums[knob] = sums
+            self.counts[knob] = counts
+
+    def window(self, start, end):
+        """
+        (number of checks, {knob: mean or None}) of the checks in [start, end].
+        """
+        first = bisect_left(self.times, start)
+        last = bisect_right(self.times, end)
+        means = {}
+        for knob in KNOBS:
+            count = self.counts[knob][last] - self.counts[knob][first]
+            means[knob] = (self.sums[knob][last] - self.sums[knob][first]) / count if count else None
+        return last - first, means
+
+def join(reports, checks, non_overlapping=False):
+    """
+    One row per coin report that has checks in its window: time, checks, targets
+    and the window means of the knobs. With 'non_overlapping', only reports whose
+    windows do not overlap are kept (newest first), so no check is counted twice.
+    """
+    means = WindowMeans(checks)
+    rows = []
+    window_start = None
+    for report in sorted(reports, key=lambda report: report["time"], reverse=True):
+        if non_overlapping and window_start is not None and report["time"] > window_start:
+            continue
+        start = report["time"] - report["hours"] * 3600
+        count, values = means.window(start, report["time"])
+        if not count:
+            continue
+        window_start = start
+        row = {"time": report["time"], "hours": report["hours"], "checks": count}
+        row.update({target: report[target] for target in TARGETS})
+        row.update(values)
+        rows.append(row)
+    rows.reverse()
+    return rows
+
+def pearson(xs, ys):
+    """
+    (r, slope, intercept) of the least squares line of ys over xs, from one pass
+    of sums. None with fewer than three points or without variance.
+    """
+    n = len(xs)
+    if n < 3:
+        return None
+    sum_x = sum_y = sum_xx = sum_yy = sum_xy = 0.0
+    for x, y in zip(xs, ys):
+        sum_x += x
+        sum_y += y
+        sum_xx += x * x
+        sum_yy += y * y
+        sum_xy += x * y
+    sxx = sum_xx - sum_x * sum_x / n
+    syy = sum_yy - sum_y * sum_y / n
+    sxy = sum_xy - sum_x * sum_y / n
+    if sxx <= 0 or syy <= 0:
+        return None
+    slope = sxy / sxx
+    return sxy / math.sqrt(sxx * syy), slope, (sum_y - slope * sum_x) / n
+
+class CollinearError(ValueError):
+    """
+    Raised when a knob is (almost) a linear combination of the other knobs.
+    """
+
+def solve(matrix, vector, tolerance=1e-12):
+    """
+    Solves matrix * x = vector by Gaussian elimination with partial pivoting.
+    Returns None when a pivot falls below 'tolerance' (singular matrix).
+    """
+    size = len(vector)
+    rows = [list(row) + [value] for row, value in zip(matrix, vector)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda i: abs(rows[i][column]))
+        if abs(rows[pivot][column]) < tolerance:
+            return None
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        for i in range(column + 1, size):
+            factor = rows[i][column] / rows[column][column]
+            for j in range(column, size + 1):
+                rows[i][j] -= factor * rows[column][j]
+    solution = [0.0] * size
+    for i in range(size - 1, -1, -1):
+        solution[i] = (rows[i][size] - sum(rows[i][j] * solution[j] for j in range(i + 1, size))) / rows[i][i]
+    return solution
+
+def regression(rows, target, knobs):
+    """
+    Multiple least squares regression of the target on the knobs, on standardized
+    values so the coefficients compare across knobs (change of the target in
+    standard deviations per standard deviation of the knob). Knobs without
+    variance are left out. Returns ({knob: beta}, R², n) or None, and raises
+    CollinearError when X'X is ill-conditioned.
+    """
+    points = [row for row in rows if row[target] is not None and all(row[knob] is not None for knob in knobs)]
+    n = len(points)
+    if n < 3:
+        return None
+    scales = {}
+    for name in [target] + knobs:
+        values = [row[name] for row in points]
+        mean = sum(values) / n
+        deviation = math.sqrt(sum((value - mean) ** 2 for value in values) / (n - 1))
+        if deviation > 0:
+            scales[name] = (mean, deviation)
+    knobs = [knob for knob in knobs if knob in scales]
+    if target not in scales or not knobs or n <= len(knobs) + 1:
+        return None
+
+    def standardized(row, name):
+        mean, deviation = scales[name]
+        return (row[name] - mean) / deviation
+
+    features = [[standardized(row, knob) for knob in knobs] for row in points]
+    ys = [standardized(row, target) for row in points]
+    # Normal equations X'X b = X'y; the standardized data needs no intercept
+    xtx = [[sum(feature[i] * feature[j] for feature in features) for j in range(len(knobs))]
+           for i in range(len(knobs))]
+    xty = [sum(feature[i] * y for feature, y in zip(features, ys)) for i in range(len(knobs))]
+    # On standardized data every pivot is (n - 1) times the share of a knob's variance
+    # that the knobs eliminated before it do not explain
+    betas = solve(xtx, xty, COLLINEAR_TOLERANCE * (n - 1))
+    if betas is None:
+        raise CollinearError(f"collinear knobs ({', '.join(knobs)})")
+    residual = sum((y - sum(beta * x for beta, x in zip(betas, feature))) ** 2 for feature, y in zip(features, ys))
+    return dict(zip(knobs, betas)), 1 - residual / sum(y * y for y in ys), n
+
+def format_analysis(rows, target):
+    """
+    Pearson r and slope of the target over every knob, plus the multiple regression
+    over REGRESSION_KNOBS.
+    """
+    lines = [f"{target}: {len(rows)} report windows",
+             f"{'Knob':<16} {'n':>5} {'r':>7} {'Slope':>12} {'Std. beta':>10}"]
+    try:
+        fit = regression(rows, target, REGRESSION_KNOBS)
+        collinear = False
+    except CollinearError:
+        fit, collinear = None, True
+    betas = fit[0] if fit else {}
+    for knob in KNOBS:
+        pairs = [(row[knob], row[target]) for row in rows if row[knob] is not None and row[target] is not None]
+        result = pearson([x for x, _ in pairs], [y for _, y in pairs])
+        beta = f"{betas[knob]:+.3f}" if knob in betas else "-"
+        if result is None:
+            lines.append(f"{knob:<16} {len(pairs):>5} {'-':>7} {'-':>12} {beta:>10}")
+        else:
+            r, slope, _ = result
+            lines.append(f"{knob:<16} {len(pairs):>5} {r:>+7.3f} {slope:>+12.4g} {beta:>10}")
+    if fit:
+        lines.append(f"Multiple regression: R² {fit[1]:.3f} over {fit[2]} windows (without CPU-Processing)")
+    elif collinear:
+        lines.append("Multiple regression: collinear, the knobs depend on each other")
+    else:
+        lines.append("Multiple regression: not enough windows with all values")
+    return "\n".join(lines)
+
+def write_csv(rows, path):
+    fields = ["time", "hours", "checks"] + TARGETS + KNOBS
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({field: "" if row[field] is None else row[field] for field in fields})
+
+def main():
+    parser = argparse.ArgumentParser(description="Correlate the landing rate and earnings with the proof timings.")
+    parser.add_argument("--coin-log", default=REPORT_LOG, help=f"Coin report log (default: {REPORT_LOG})")
+    parser.add_argument("--check-log", default=LOG_FILE, help=f"quileye2 log (default: {LOG_FILE})")
+    parser.add_argument("--non-overlapping", action="store_true",
+                        help="Only use reports whose windows do not overlap (independent points)")
+    parser.add_argument("--csv", help="Write the joined dataset to this file")
+    args = parser.parse_args()
+
+    try:
+        reports = load_coin_reports(args.coin_log)
+        checks = load_checks(args.check_log)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    rows = join(reports, checks, args.non_overlapping)
+    print(f"{len(reports)} coin reports, {len(checks)} checks, {len(rows)} report windows with checks")
+    if args.csv:
+        write_csv(rows, args.csv)
+    for target in TARGETS:
+        print()
+        print(format_analysis(rows, target))
+
+if __name__ == "__main__":
+    main()
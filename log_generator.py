@@ -0,0 +1,285 @@
+#!/usr/bin/python3
+"""
+Writes synthetic node data for bench_hotpaths.py into one directory:
+  journal.json      journalctl -o json records of a para/ceremonyclient node
+  coinreport.log    coin_aggregator.py report blocks (with the .idx sidecar and .jsonl records)
+  quileye2.log      blink_quileye.bash check blocks (plus quileye2_checks.txt and .jsonl records)
+  bin/journalctl    a journalctl stand-in that serves journal.json
+The newest entries are dated now, so '--since N minutes ago' windows work.
+"""
+import argparse
+import json
+import os
+import random
+import stat
+import sys
+import time
+from collections import deque
+
+from coin_aggregator import awk_number, format_report, report_record
+from proof_analyzer import CREATE_MARKER, SUBMIT_MARKER, format_summary
+from quil_report import check_fields
+from report_records import records_path_for
+from thresholds import DEFAULT_THRESHOLDS, bounds
+
+KINDS = ("journal", "coinreport", "quileye2")
+MAX_WORKERS = 256
+FRAME_INTERVAL = 10.0
+CHECK_INTERVAL = 600
+REPORT_INTERVAL = 3600
+REPORT_LINES = 16
+CHECK_LINES = 5
+BOOT_ID = "5b0e2c7d9f8a4e1b8c3d6f2a1e0b9c8d"
+PEER_ID = "QmSynth1cNodeP33r1dF0rB3nchmark1ngTh3Hotpaths0000"
+
+def journal_lines_per_frame(workers):
+    # Parent: frame, proof creation and submission; every worker one line per frame
+    return 3 + workers
+
+def journal_record(index, realtime, unit, identifier, pid, level, msg, fields):
+    message = dict({"level": level, "ts": round(realtime, 3), "caller": f"node/main.go:{200 + index % 50}",
+                    "msg": msg}, **fields)
+    micros = int(realtime * 1000000)
+    record = {
+        "__CURSOR": f"s={BOOT_ID};i={index:x};b={BOOT_ID};m={micros:x};t={micros:x};x={index * 7919:x}",
+        "__REALTIME_TIMESTAMP": str(micros),
+        "__MONOTONIC_TIMESTAMP": str(micros - 1700000000000000),
+        "_BOOT_ID": BOOT_ID,
+        "PRIORITY": "3" if level == "error" else "6",
+        "SYSLOG_IDENTIFIER": identifier,
+        "_PID": str(pid),
+        "_SYSTEMD_UNIT": unit,
+        "MESSAGE": json.dumps(message, separators=(',', ':')),
+    }
+    return json.dumps(record, separators=(',', ':'))
+
+def generate_journal(path, lines, workers, service="para", end=None, seed=1):
+    """
+    Writes about 'lines' records: every worker reports "data worker listening"
+    once, then each frame brings a creation, a submission and one line per worker.
+    Returns the covered span in minutes.
+    """
+    rng = random.Random(seed)
+    end = time.time() if end is None else end
+    unit = service if service.endswith(".service") else f"{service}.service"
+    frames = max(1, (lines - workers) // journal_lines_per_frame(workers))
+    # Submissions trail their frame by up to a minute; the newest one lands just before 'end'
+    start = end - frames * FRAME_INTERVAL - 60
+    identifier = "node-2.0.4-linux-amd64"
+    ring = rng.randint(0, 5)
+    index = 0
+    with open(path, 'w') as f:
+        for core in range(1, workers + 1):
+            f.write(journal_record(index, start + core * 0.01, unit, identifier, 2000 + core, "info",
+                                   "data worker listening", {"core": core}) + "\n")
+            index += 1
+        for frame in range(frames):
+            frame_number = 150000 + frame
+            realtime = start + frame * FRAME_INTERVAL + rng.uniform(0, 1)
+            f.write(journal_record(index, realtime, unit, identifier, 2000, "info", "got frame",
+                                   {"frame_number": frame_number, "peer_count": rng.randint(40, 90)}) + "\n")
+            index += 1
+            create_age = rng.lognormvariate(2.6, 0.35)
+            f.write(journal_record(index, realtime + 0.2, unit, identifier, 2000, "info", CREATE_MARKER, {
+                "frame_number": frame_number, "frame_age": round(create_age, 3), "ring": ring,
+                "active_workers": workers, "ts": round(realtime + 0.2, 3)}) + "\n")
+            index += 1
+            for core in range(1, workers + 1):
+                if rng.random() < 0.001:
+                    f.write(journal_record(index, realtime + 0.3, unit, identifier, 2000 + core, "error",
+                                           "error while sending proof",
+                                           {"core": core, "error": "context canceled"}) + "\n")
+                else:
+                    f.write(journal_record(index, realtime + 0.3, unit, identifier, 2000 + core, "info",
+                                           "data worker proof complete", {"core": core,
+                                           "frame_number": frame_number}) + "\n")
+                index += 1
+            submit_age = create_age + rng.lognormvariate(2.7, 0.3)
+            f.write(journal_record(index, realtime + submit_age - create_age, unit, identifier, 2000, "info",
+                                   SUBMIT_MARKER, {"frame_number": frame_number,
+                                                   "frame_age": round(submit_age, 3)}) + "\n")
+            index += 1
+    return frames * FRAME_INTERVAL / 60
+
+def generate_coinreport(path, lines, workers, end=None, seed=1):
+    """
+    Writes hourly 24h report blocks and their offset index like coin_aggregator.py.
+    """
+    rng = random.Random(seed)
+    end = time.time() if end is None else end
+    blocks = max(2, lines // REPORT_LINES)
+    with open(path, 'w') as f, open(path + ".idx", 'w') as index_file, open(records_path_for(path), 'w') as records:
+        for block in range(blocks):
+            coins = sorted(rng.lognormvariate(-2.5, 0.6) for _ in range(rng.randint(20, 60)))
+            stats = {
+                "total": awk_number(sum(coins)),
+                "average": awk_number(sum(coins) / len(coins)),
+                "median": awk_number(coins[len(coins) // 2]),
+                "high": awk_number(coins[-1]),
+                "low": awk_number(coins[0]),
+            }
+            offset = f.tell() + 1
+            rate = rng.uniform(2, 40)
+            now = end - (blocks - 1 - block) * REPORT_INTERVAL
+            index_file.write(f"{offset}\n")
+            f.write(format_report(stats, rate, 24, workers, now=now, thresholds=DEFAULT_THRESHOLDS))
+            record = dict(report_record(stats, rate, 24, workers, now), offset=offset)
+            records.write(json.dumps(record, separators=(",", ":")) + "\n")
+    return blocks
+
+def generate_quileye2(path, lines, workers, end=None, seed=1):
+    """
+    Writes check blocks in the blink_quileye.bash layout and the pointer file next to it.
+    """
+    rng = random.Random(seed)
+    end = time.time() if end is None else end
+    checks = max(2, lines // CHECK_LINES)
+    ring = rng.randint(0, 5)
+    seniority = 1000
+    balance = 100.0
+    # The default thresholds, so the output does not depend on the local threshold file
+    summary_bounds = {"creation_bounds": bounds(DEFAULT_THRESHOLDS, "CREATION"),
+                      "submission_bounds": bounds(DEFAULT_THRESHOLDS, "SUBMISSION"),
+                      "cpu_bounds": bounds(DEFAULT_THRESHOLDS, "CPU")}
+    with open(path, 'w') as f, open(records_path_for(path), 'w') as records:
+        for check_nr in range(1, checks + 1):
+            now = end - (checks - check_nr) * CHECK_INTERVAL
+            seniority += rng.randint(0, 3)
+            balance += rng.uniform(0, 0.5)
+            if rng.random() < 0.01:
+                ring = max(0, ring + rng.choice((-1, 1)))
+            # CPU-Processing is the time between creation and submission, as proof_analyzer derives it
+            creation = rng.uniform(10, 30)
+            submission = creation + rng.uniform(10, 30)
+            summary = (rng.randint(50, 70), creation, submission, submission - creation)
+            node_lines = [
+                f"Peer ID: {PEER_ID} - Date: {time.strftime('%a %b %e %H:%M:%S %Z %Y', time.localtime(now))}",
+                f"Max Frame: {150000 + check_nr * 60} - Active Workers: {workers} - Prover Ring: {ring} - "
+                f"Seniority: {seniority} - Coins: {check_nr * 3} - Owned balance: {balance:.6f} QUIL",
+            ]
+            f.write(f"\nCheck-Nr {check_nr}:\n")
+            f.write("\n".join(node_lines + [format_summary(summary, 180, color=True, **summary_bounds)]) + "\n")
+            values = {"Max Frame": str(150000 + check_nr * 60), "Prover Ring": str(ring),
+                      "Seniority": str(seniority), "Owned balance": f"{balance:.6f}"}
+            text = "\n".join([f"Check-Nr {check_nr}:"] + node_lines + [format_summary(summary, 180)]) + "\n"
+            record = {"time": now, "service": "para", "minutes": 180, "active_workers": workers,
+                      "check": check_fields(values, check_nr * 3, summary), "check_nr": check_nr, "text": text}
+            records.write(json.dumps(record, separators=(",", ":")) + "\n")
+    with open(os.path.join(os.path.dirname(path), "quileye2_checks.txt"), 'w') as f:
+        f.write(f"LastUserCheck: 1\nLastAutoCheck: {checks}\n")
+    return checks
+
+SHIM = """#!{python}
+import sys
+sys.path.insert(0, {repo!r})
+from log_generator import journalctl_shim
+journalctl_shim({data_dir!r}, sys.argv[1:])
+"""
+
+def write_shim(data_dir):
+    """
+    Puts a journalctl stand-in into data_dir/bin. Put that directory first in PATH.
+    """
+    bin_dir = os.path.join(data_dir, "bin")
+    os.makedirs(bin_dir, exist_ok=True)
+    path = os.path.join(bin_dir, "journalctl")
+    with open(path, 'w') as f:
+        f.write(SHIM.format(python=sys.executable, repo=os.path.dirname(os.path.abspath(__file__)),
+                            data_dir=os.path.abspath(data_dir)))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+def realtime_of(line):
+    start = line.find('"__REALTIME_TIMESTAMP":"') + len('"__REALTIME_TIMESTAMP":"')
+    return int(line[start:line.index('"', start)]) / 1000000
+
+def short_line(line, hostname=True):
+    record = json.loads(line)
+    date_part = time.strftime("%b %d %H:%M:%S", time.localtime(int(record["__REALTIME_TIMESTAMP"]) / 1000000))
+    host = "" if not hostname else "synthetic "
+    return f"{date_part} {host}{record['SYSLOG_IDENTIFIER']}[{record['_PID']}]: {record['MESSAGE']}\n"
+
+def journalctl_shim(data_dir, argv):
+    """
+    Serves data_dir/journal.json for the journalctl options the tools use
+    (-o json, --since 'N minutes ago', --after-cursor, --reverse, -n, -f).
+    Every call is counted in data_dir/journalctl.calls.
+    """
+    with open(os.path.join(data_dir, "journalctl.calls"), 'a') as f:
+        f.write(" ".join(argv) + "\n")
+
+    output, since, cursor, reverse, count, hostname = "short", None, None, False, None, True
+    args = iter(argv)
+    for arg in args:
+        if arg == "-o":
+            output = next(args)
+        elif arg.startswith("--output="):
+            output = arg.split("=", 1)[1]
+        elif arg in ("-S", "--since"):
+            since = time.time() - float(next(args).split()[0]) * 60
+        elif arg == "--after-cursor":
+            cursor = next(args)
+        elif arg in ("-r", "--reverse"):
+            reverse = True
+        elif arg in ("-n", "--lines"):
+            count = int(next(args))
+        elif arg == "--no-hostname":
+            hostname = False
+        elif arg in ("-u", "--unit"):
+            next(args)
+
+    with open(os.path.join(data_dir, "journal.json"), 'r') as f:
+        lines = iter(f)
+        if cursor:
+            marker = f'"__CURSOR":"{cursor}"'
+            found = any(marker in line for line in lines)
+            if not found:
+                sys.stderr.write("Failed to seek to cursor: Invalid argument\n")
+                sys.exit(1)
+        if since is not None:
+            lines = (line for line in lines if realtime_of(line) >= since)
+        if count is not None:
+            lines = deque(lines, maxlen=count)
+        if reverse:
+            lines = reversed(list(lines))
+        write = sys.stdout.write
+        try:
+            for line in lines:
+                write(line if output == "json" else short_line(line, hostname))
+        except BrokenPipeError:
+            sys.stderr.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic journal, coinreport.log and quileye2.log data.")
+    parser.add_argument("data_dir", help="Output directory")
+    parser.add_argument("--lines", type=int, default=100000, help="Approximate lines per file (default: 100000)")
+    parser.add_argument("--workers", type=int, default=24, help=f"Data workers of the node (1-{MAX_WORKERS}, default: 24)")
+    parser.add_argument("--kind", action="append", choices=KINDS, help="File(s) to generate (default: all)")
+    parser.add_argument("--service", default="para", help="Unit name in the journal records (default: para)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    args = parser.parse_args()
+
+    if not 1 <= args.workers <= MAX_WORKERS or args.lines < 1:
+        print(f"Error: --workers must be between 1 and {MAX_WORKERS} and --lines positive")
+        sys.exit(1)
+    os.makedirs(args.data_dir, exist_ok=True)
+    end = time.time()
+    meta = {"lines": args.lines, "workers": args.workers, "service": args.service, "end": end}
+    for kind in args.kind or KINDS:
+        started = time.time()
+        if kind == "journal":
+            meta["journal_minutes"] = generate_journal(os.path.join(args.data_dir, "journal.json"), args.lines,
+                                                       args.workers, args.service, end, args.seed)
+            write_shim(args.data_dir)
+        elif kind == "coinreport":
+            meta["reports"] = generate_coinreport(os.path.join(args.data_dir, "coinreport.log"), args.lines,
+                                                  args.workers, end, args.seed)
+        else:
+            meta["checks"] = generate_quileye2(os.path.join(args.data_dir, "quileye2.log"), args.lines,
+                                               args.workers, end, args.seed)
+        print(f"{kind}: {time.time() - started:.1f}s")
+    with open(os.path.join(args.data_dir, "meta.json"), 'w') as f:
+        json.dump(meta, f)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/python3
+import argparse
+import json
+import os
+import re
+import signal
+import subprocess
+import time
+
+from thresholds import THRESHOLDS_FILE, load_thresholds
+
+YELLOW = "\033[1;33m"
+BLUE = "\033[1;34m"
+GREEN = "\033[0;32m"
+RED = "\033[0;31m"
+RESET = "\033[0m"
+
+WORKER_PATTERN = re.compile(r"/node-[^/\s]*$")
+CORE_PATTERN = re.compile(r"--core=(\d+)")
+SUPERVISOR_STATUS_FILE = "/root/para_supervisor.json"
+
+def read_meminfo(path="/proc/meminfo"):
+    """
+    Returns /proc/meminfo as a dict of kB values.
+    """
+    values = {}
+    with open(path, 'r') as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            parts = rest.split()
+            if parts:
+                values[key] = int(parts[0])
+    return values
+
+def read_pressure(path="/proc/pressure/memory"):
+    """
+    Returns the 'some' and 'full' avg10 of the memory PSI, or None without PSI support.
+    """
+    try:
+        with open(path, 'r') as f:
+            text = f.read()
+    except OSError:
+        return None
+    pressure = {}
+    for line in text.splitlines():
+        kind, *fields = line.split()
+        pressure[kind] = float(dict(field.split("=") for field in fields)["avg10"])
+    return pressure
+
+def sample():
+    """
+    One memory sample: RAM usage in percent, swap used in GB and PSI avg10 values.
+    """
+    meminfo = read_meminfo()
+    total = meminfo["MemTotal"]
+    available = meminfo.get("MemAvailable", meminfo["MemFree"])
+    pressure = read_pressure() or {}
+    return {
+        "ram": (total - available) / total * 100,
+        "swap": (meminfo.get("SwapTotal", 0) - meminfo.get("SwapFree", 0)) / 1024 / 1024,
+        "some": pressure.get("some"),
+        "full": pressure.get("full"),
+    }
+
+def sample_window(samples, interval):
+    """
+    Takes 'samples' samples 'interval' seconds apart.
+    """
+    window = []
+    for i in range(samples):
+        if i:
+            time.sleep(interval)
+        window.append(sample())
+    return window
+
+def breaches(window, ram_limit, swap_limit, psi_limit):
+    """
+    Returns the reasons that held in every sample of the window, so a single
+    spike never counts as pressure.
+    """
+    reasons = []
+    if all(s["ram"] > ram_limit for s in window):
+        reasons.append(f"RAM above {ram_limit:g}%")
+    if all(s["swap"] > swap_limit for s in window):
+        reasons.append(f"swap above {swap_limit:g}G")
+    if all(s["full"] is not None and s["full"] > psi_limit for s in window):
+        reasons.append(f"memory pressure (full avg10) above {psi_limit:g}%")
+    return reasons
+
+def process_memory(status_path):
+    """
+    VmRSS plus VmSwap of a process in kB, from /proc/<pid>/status.
+    """
+    memory = 0
+    with open(status_path, 'r') as f:
+        for line in f:
+            if line.startswith(("VmRSS:", "VmSwap:")):
+                memory += int(line.split()[1])
+    return memory
+
+def worker_processes(proc_dir="/proc"):
+    """
+    Returns (pid, core, rss_kb) for every data worker (node binary with --core=N).
+    RSS includes the worker's swapped-out memory.
+    """
+    workers = []
+    for pid in os.listdir(proc_dir):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(os.path.join(proc_dir, pid, "cmdline"), 'rb') as f:
+                args = f.read().decode(errors='replace').split("\0")
+            if not args or not WORKER_PATTERN.search(args[0]):
+                continue
+            core_match = CORE_PATTERN.search(" ".join(args[1:]))
+            if not core_match:
+                continue
+            rss = process_memory(os.path.join(proc_dir, pid, "status"))
+        except OSError:
+            continue
+        workers.append((int(pid), int(core_match.group(1)), rss))
+    return workers
+
+def parent_pid(pid, proc_dir="/proc"):
+    with open(os.path.join(proc_dir, str(pid), "stat"), 'r') as f:
+        # The command name in parentheses may contain spaces
+        return int(f.read().rsplit(")", 1)[1].split()[1])
+
+def worker_supervisor(pid, status_file=SUPERVISOR_STATUS_FILE, proc_dir="/proc"):
+    """
+    What starts the worker again after it exits: para_supervisor.py (its status
+    file names its pid) or the node parent that spawned the worker. None for any
+    other parent, e.g. para.sh, which does not restart single cores.
+    """
+    try:
+        ppid = parent_pid(pid, proc_dir)
+    except (OSError, ValueError, IndexError):
+        return None
+    try:
+        with open(status_file, 'r') as f:
+            if json.load(f).get("supervisor_pid") == ppid:
+                return "para_supervisor.py"
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        with open(os.path.join(proc_dir, str(ppid), "cmdline"), 'rb') as f:
+            args = f.read().decode(errors='replace').split("\0")
+    except OSError:
+        return None
+    if WORKER_PATTERN.search(args[0]) and not CORE_PATTERN.search(" ".join(args[1:])):
+        return "node parent"
+    return None
+
+def recycle_worker(workers):
+    """
+    Terminates the worker with the largest memory footprint. Only pass workers
+    that have a supervisor (see worker_supervisor), which starts that core again.
+    A worker that exited since the scan is skipped for the next largest one;
+    returns None if none is left.
+    """
+    for pid, core, rss in sorted(workers, key=lambda worker: worker[2], reverse=True):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            continue
+        return pid, core, rss
+    return None
+
+def report(window, ram_limit, swap_limit):
+    latest = window[-1]
+    ram_ok = latest["ram"] <= ram_limit
+    swap_ok = latest["swap"] <= swap_limit
+    print(f"{YELLOW}RAM Usage: {latest['ram']:.2f}% - "
+          f"{GREEN + 'Check Passed! ✅' if ram_ok else RED + 'Check Failed ❌'}{RESET}")
+    print(f"{BLUE}Swap Used: {latest['swap']:.2f}G - "
+          f"{GREEN + 'Check Passed! ✅' if swap_ok else RED + 'Check Failed ❌'}{RESET}")
+    if latest["some"] is not None:
+        print(f"Memory Pressure: some {latest['some']:.2f}% full {latest['full']:.2f}% (avg10)")
+
+def main():
+    thresholds = load_thresholds()
+    parser = argparse.ArgumentParser(description="Relieve memory pressure by recycling the largest supervised worker before restarting the service.")
+    parser.add_argument("--service", default="ceremonyclient", help="Service restarted as last resort (default: ceremonyclient)")
+    parser.add_argument("--ram-limit", type=float, default=thresholds["RAM_LIMIT"],
+                        help=f"RAM usage in percent (default: RAM_LIMIT from {THRESHOLDS_FILE}, 95)")
+    parser.add_argument("--swap-limit", type=float, default=thresholds["SWAP_LIMIT"],
+                        help=f"Swap used in GB (default: SWAP_LIMIT from {THRESHOLDS_FILE}, 2)")
+    parser.add_argument("--psi-limit", type=float, default=thresholds["PSI_LIMIT"],
+                        help=f"PSI full avg10 in percent (default: PSI_LIMIT from {THRESHOLDS_FILE}, 10)")
+    parser.add_argument("--samples", type=int, default=6, help="Samples per window (default: 6)")
+    parser.add_argument("--interval", type=float, default=5, help="Seconds between samples (default: 5)")
+    parser.add_argument("--settle", type=float, default=30, help="Seconds to wait after recycling a worker (default: 30)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be done")
+    args = parser.parse_args()
+
+    window = sample_window(args.samples, args.interval)
+    report(window, args.ram_limit, args.swap_limit)
+    reasons = breaches(window, args.ram_limit, args.swap_limit, args.psi_limit)
+    if not reasons:
+        return
+
+    print(f"Sustained {', '.join(reasons)} over {args.samples} samples.")
+    workers = worker_processes()
+    supervised = [worker for worker in workers if worker_supervisor(worker[0])]
+    if workers and not supervised:
+        print("No supervisor restarts single workers, so the service is restarted instead.")
+    workers = supervised
+    if workers:
+        if args.dry_run:
+            pid, core, rss = max(workers, key=lambda worker: worker[2])
+            print(f"Would recycle core {core} (pid {pid}, {rss / 1024 / 1024:.2f}G).")
+            return
+        recycled = recycle_worker(workers)
+        if recycled is None:
+            print("The workers exited before they could be recycled.")
+        else:
+            pid, core, rss = recycled
+            print(f"Recycled core {core} (pid {pid}, {rss / 1024 / 1024:.2f}G). Checking again in {args.settle:.0f}s...")
+            time.sleep(args.settle)
+            window = sample_window(args.samples, args.interval)
+            reasons = breaches(window, args.ram_limit, args.swap_limit, args.psi_limit)
+            if not reasons:
+                print("Memory pressure relieved.")
+                return
+            print(f"Still {', '.join(reasons)}.")
+
+    if args.dry_run:
+        print(f"Would restart {args.service}.")
+        return
+    print(f"Restarting {args.service} now...")
+    subprocess.run(["service", args.service, "restart"])
+
+if __name__ == "__main__":
+    main()
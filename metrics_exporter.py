@@ -0,0 +1,220 @@
+#!/usr/bin/python3
+"""
+Serves the node, coin, proof, shard and memory values as Prometheus text on a
+local port. A background thread refreshes them every --refresh seconds from the
+shared snapshot cache and the incremental journal aggregate; scrapes only read
+the last rendered text and never start qclient or journalctl.
+"""
+import argparse
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from coin_aggregator import aggregate_coins, landing_rate
+from journal_cursor import proof_window, shard_entries, update_aggregate
+from memory_guard import sample
+from shard_intervals import gap_statistics
+from snapshot_cache import get_snapshot, node_info_value
+
+SETTINGS_FILE = "/root/quileye_settings.txt"
+HOST = "127.0.0.1"
+PORT = 9477
+
+# Node-info labels and the gauges they become
+NODE_INFO_METRICS = [
+    ("Max Frame", "quil_max_frame", "Highest frame the node has seen"),
+    ("Active Workers", "quil_active_workers", "Data workers the node reports"),
+    ("Prover Ring", "quil_prover_ring", "Prover ring of the node"),
+    ("Seniority", "quil_seniority", "Seniority of the node"),
+    ("Owned balance", "quil_balance_quil", "Owned balance in QUIL"),
+]
+
+def default_service():
+    try:
+        with open(SETTINGS_FILE, 'r') as f:
+            return f.read().strip() or "para"
+    except OSError:
+        return "para"
+
+def first_number(value):
+    """
+    Leading number of a node-info value such as '12.345 QUIL', or None.
+    """
+    try:
+        return float(value.split()[0])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+class Metrics:
+    """
+    Collects gauges as (name, help, [(labels, value)]) in insertion order.
+    """
+    def __init__(self):
+        self.families = {}
+
+    def add(self, name, help_text, value, **labels):
+        if value is None:
+            return
+        family = self.families.setdefault(name, (help_text, []))
+        family[1].append((labels, value))
+
+    def render(self):
+        lines = []
+        for name, (help_text, samples) in self.families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{label}"' for key, label in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value:.15g}" if label_text else f"{name} {value:.15g}")
+        return "\n".join(lines) + "\n"
+
+def collect_node_info(metrics):
+    node_info = get_snapshot("node-info")
+    for label, name, help_text in NODE_INFO_METRICS:
+        metrics.add(name, help_text, first_number(node_info_value(node_info, label)))
+
+def collect_coins(metrics, hours):
+    metrics.add("quil_coins", "Coins owned by the node", len(get_snapshot("coins").splitlines()))
+    values, frames = aggregate_coins(get_snapshot("coin-metadata").splitlines(), hours)
+    metrics.add("quil_earned_quil", "QUIL earned in the window", sum(number for number, _ in values), hours=hours)
+    metrics.add("quil_landing_rate_percent", "Frames in the window that produced a coin",
+                landing_rate(frames), hours=hours)
+
+def collect_journal(metrics, service, window_minutes, shard_count):
+    state = update_aggregate(service, window_minutes)
+    summary, unmatched = proof_window(state, window_minutes)
+    if summary:
+        proofs, creation, submission, cpu = summary
+        metrics.add("quil_proofs", "Proofs created in the window", proofs, minutes=window_minutes)
+        metrics.add("quil_proof_creation_seconds", "Average frame age at proof creation",
+                    creation, minutes=window_minutes)
+        metrics.add("quil_proof_submission_seconds", "Average frame age at proof submission",
+                    submission, minutes=window_minutes)
+        metrics.add("quil_proof_cpu_seconds", "Average time between creation and submission",
+                    cpu, minutes=window_minutes)
+    metrics.add("quil_proofs_unmatched", "Proof creations without a submission", unmatched, minutes=window_minutes)
+
+    entries = shard_entries(state, shard_count)
+    if entries:
+        latest = entries[-1]
+        metrics.add("quil_frame_age_seconds", "Frame age of the latest shard entry", float(latest[2]))
+        metrics.add("quil_shard_last_seconds", "Seconds since the latest shard entry", time.time() - float(latest[5]))
+    if len(entries) >= 2:
+        gaps = [abs(float(entry[5]) - float(previous[5])) for previous, entry in zip(entries, entries[1:])]
+        for stat, value in zip(("low", "high", "avg", "median"), gap_statistics(gaps)):
+            metrics.add("quil_shard_gap_seconds", "Gap between shard entries", value, stat=stat)
+
+def collect_memory(metrics):
+    memory = sample()
+    metrics.add("node_ram_used_percent", "RAM in use (MemTotal - MemAvailable)", memory["ram"])
+    metrics.add("node_swap_used_gigabytes", "Swap in use", memory["swap"])
+    for kind in ("some", "full"):
+        metrics.add("node_memory_pressure_percent", "Memory PSI avg10", memory[kind], kind=kind)
+
+class Exporter:
+    """
+    Keeps the last rendered metrics text and refreshes it in a background thread.
+    A failing source only drops its own metrics and sets its quil_exporter_up to 0;
+    quil_exporter_last_success_timestamp_seconds stays at the last refresh in which
+    every source succeeded.
+    """
+    def __init__(self, service, window_minutes=180, coin_hours=24, shard_count=50, refresh=60):
+        self.service = service
+        self.window_minutes = window_minutes
+        self.coin_hours = coin_hours
+        self.shard_count = shard_count
+        self.refresh = refresh
+        self.text = b""
+        self.last_success = None
+        self.lock = threading.Lock()
+
+    def collect(self):
+        started = time.time()
+        metrics = Metrics()
+        sources = [
+            ("node_info", lambda: collect_node_info(metrics)),
+            ("coins", lambda: collect_coins(metrics, self.coin_hours)),
+            ("journal", lambda: collect_journal(metrics, self.service, self.window_minutes, self.shard_count)),
+            ("memory", lambda: collect_memory(metrics)),
+        ]
+        all_up = True
+        for source, collect in sources:
+            try:
+                collect()
+                up = 1
+            except Exception as e:
+                # Snapshot and journal errors, but also anything unexpected in a source
+                print(f"Warning: {source} not collected ({type(e).__name__}: {e})", file=sys.stderr)
+                up = 0
+            all_up = all_up and up
+            metrics.add("quil_exporter_up", "Whether the last refresh of a source succeeded", up, source=source)
+        if all_up:
+            self.last_success = time.time()
+        metrics.add("quil_exporter_refresh_timestamp_seconds", "Time of the last refresh", time.time())
+        metrics.add("quil_exporter_last_success_timestamp_seconds",
+                    "Time of the last refresh in which every source succeeded", self.last_success)
+        metrics.add("quil_exporter_refresh_duration_seconds", "Duration of the last refresh", time.time() - started)
+        text = metrics.render().encode()
+        with self.lock:
+            self.text = text
+
+    def run(self):
+        while True:
+            time.sleep(self.refresh)
+            try:
+                self.collect()
+            except Exception as e:
+                # The thread must survive: scrapes keep the last text, whose timestamps show its age
+                print(f"Error: refresh failed ({type(e).__name__}: {e})", file=sys.stderr)
+
+    def current(self):
+        with self.lock:
+            return self.text
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    exporter = None
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.exporter.current()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Prometheus text endpoint for the quileye and coinrep values.")
+    parser.add_argument("--service", default=default_service(),
+                        help=f"Node service (default: from {SETTINGS_FILE} or para)")
+    parser.add_argument("--host", default=HOST, help=f"Listen address (default: {HOST})")
+    parser.add_argument("--port", type=int, default=PORT, help=f"Listen port (default: {PORT})")
+    parser.add_argument("--refresh", type=float, default=60, help="Seconds between refreshes (default: 60)")
+    parser.add_argument("--window", type=int, default=180, help="Proof window in minutes (default: 180)")
+    parser.add_argument("--coin-hours", type=float, default=24, help="Coin and landing rate window (default: 24)")
+    parser.add_argument("--shards", type=int, default=50, help="Shard entries for the gap statistics (default: 50)")
+    parser.add_argument("--once", action="store_true", help="Print the metrics once and exit")
+    args = parser.parse_args()
+
+    exporter = Exporter(args.service, args.window, args.coin_hours, args.shards, args.refresh)
+    if args.once:
+        exporter.collect()
+        sys.stdout.write(exporter.current().decode())
+        return
+
+    # The first refresh completes before the port opens, so no scrape sees empty text
+    exporter.collect()
+    threading.Thread(target=exporter.run, daemon=True).start()
+    MetricsHandler.exporter = exporter
+    with ThreadingHTTPServer((args.host, args.port), MetricsHandler) as server:
+        print(f"Serving metrics on http://{args.host}:{args.port}/metrics")
+        server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import re
 from wcwidth import wcswidth
 
+from check_store import CHECK_LINES, connect, extract_check_fields, get_check, read_pointers, write_pointers
+from report_records import ANSI_ESCAPE, iter_lines_reverse, iter_records_reverse
+
 # ANSI-Escape-Codes für Farben und Stil
 RESET = "\033[0m"
 BOLD = "\033[1m"
@@ -31,58 +34,49 @@ def strip_ansi_codes(text):
     """
     Entfernt ANSI-Escape-Sequenzen aus einem Text.
     """
-    ansi_escape = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
-    return ansi_escape.sub('', text)
+    return ANSI_ESCAPE.sub('', text) if '\x1b' in text else text
 
-def parse_check(lines, check_nr):
+def find_checks_reverse(log_file_path, check_nrs):
+    """
+    Sucht die Check-Nr Abschnitte vom Ende der Logdatei her und hört auf, sobald
+    alle gefunden sind. Gibt {check_nr: (check_data, check_lines)} zurück.
     """
-    Parsen eines spezifischen Check-Nr Abschnitts aus den Logzeilen.
+    wanted = {f"Check-Nr {check_nr}:": check_nr for check_nr in check_nrs}
+    found = {}
+    following = []  # Die Zeilen nach der aktuellen, in Dateireihenfolge
+    with open(log_file_path, 'rb') as log_file:
+        for _, raw_line in iter_lines_reverse(log_file):
+            line = raw_line.decode('utf-8', errors='replace') + "\n"
+            if "Check-Nr" in line:
+                header = strip_ansi_codes(line)
+                pattern = next((pattern for pattern in wanted if pattern in header), None)
+                if pattern is not None:
+                    check_nr = wanted.pop(pattern)
+                    relevant_lines = [strip_ansi_codes(part) for part in [line] + following[:CHECK_LINES - 1]]
+                    found[check_nr] = (extract_check_fields(relevant_lines), "".join(relevant_lines))
+                    if not wanted:
+                        break
+            following.insert(0, line)
+            del following[CHECK_LINES - 1:]
+    return found
+
+def find_checks_in_records(log_file_path, check_nrs):
     """
-    check_pattern = f"Check-Nr {check_nr}:"
-    start_index = next((i for i, line in enumerate(lines) if check_pattern in strip_ansi_codes(line)), None)
-    if start_index is not None:
-        relevant_lines = lines[start_index : start_index + 4]
-        check_data = {}
-        for line in relevant_lines:
-            stripped_line = strip_ansi_codes(line)
-            if "Max Frame:" in stripped_line:
-                match = re.search(r"Max Frame: (\d+)", stripped_line)
-                if match:
-                    check_data["Max Frame"] = int(match.group(1))
-            if "Prover Ring:" in stripped_line:
-                match = re.search(r"Prover Ring: ([+-]?\d+)", stripped_line)
-                if match:
-                    check_data["Prover Ring"] = int(match.group(1))
-            if "Seniority:" in stripped_line:
-                match = re.search(r"Seniority: (\d+)", stripped_line)
-                if match:
-                    check_data["Seniority"] = int(match.group(1))
-            if "Coins:" in stripped_line:
-                match = re.search(r"Coins: (\d+)", stripped_line)
-                if match:
-                    check_data["Coins"] = int(match.group(1))
-            if "Owned balance:" in stripped_line:
-                match = re.search(r"Owned balance: ([\d.]+) QUIL", stripped_line)
-                if match:
-                    check_data["Owned balance"] = round(float(match.group(1)), 3)
-            if "Proofs" in stripped_line:
-                match = re.search(r"(\d+) Proofs", stripped_line)
-                if match:
-                    check_data["Proofs"] = int(match.group(1))
-            if "Creation:" in stripped_line:
-                match = re.search(r"Creation: ([+-]?\d+(\.\d+)*)s", stripped_line)
-                if match:
-                    check_data["Creation"] = float(match.group(1))
-            if "Submission:" in stripped_line:
-                match = re.search(r"Submission: ([+-]?\d+(\.\d+)*)s", stripped_line)
-                if match:
-                    check_data["Submission"] = float(match.group(1))
-            if "CPU-Processing:" in stripped_line:
-                match = re.search(r"CPU-Processing: ([+-]?\d+(\.\d+)*)s", stripped_line)
-                if match:
-                    check_data["CPU-Processing"] = float(match.group(1))
-        return check_data, "".join(relevant_lines)
-    return None, None
+    Sucht die Checks in den JSON-Records neben der Logdatei (quileye2.jsonl), vom Ende her.
+    Die Felder stehen dort schon fertig, es wird nichts geparst.
+    """
+    wanted = set(check_nrs)
+    found = {}
+    # Nur Zeilen mit einer gesuchten Nummer werden dekodiert (json.dumps mit und ohne Leerzeichen)
+    markers = [f'"check_nr"{separator}{check_nr},'.encode() for check_nr in wanted for separator in (":", ": ")]
+    for record in iter_records_reverse(log_file_path, markers):
+        check_nr = record.get("check_nr")
+        if check_nr in wanted and isinstance(record.get("check"), dict):
+            wanted.discard(check_nr)
+            found[check_nr] = (record["check"], record.get("text", ""))
+            if not wanted:
+                break
+    return found
 
 def calculate_changes(user_data, auto_data):
     """
@@ -254,61 +248,54 @@ def create_special_event_message(prover_ring_diff):
 
     return display_menu(special_event_title, content)
 
-def update_last_user_check(log_lines, last_auto_check):
+def load_checks(conn, check_nrs, log_file_path):
     """
-    Aktualisiert den LastUserCheck-Wert in den Logzeilen auf den Wert von LastAutoCheck.
+    Lädt Checks per Nummer aus dem Check-Store (conn None: ohne Store), sonst aus den
+    JSON-Records. Ältere Checks, die nur in der Logdatei stehen, werden dort vom Ende her gesucht.
     """
-    updated_lines = []
-    for line in log_lines:
-        if line.startswith("LastUserCheck:"):
-            updated_line = f"LastUserCheck: {last_auto_check}\n"
-            updated_lines.append(updated_line)
-        else:
-            updated_lines.append(line)
-    return updated_lines
+    checks = {}
+    for check_nr in check_nrs if conn is not None else []:
+        check_data, check_lines = get_check(conn, check_nr)
+        if check_data is not None:
+            checks[check_nr] = (check_data, check_lines)
+    missing = [check_nr for check_nr in check_nrs if check_nr not in checks]
+    if missing:
+        checks.update(find_checks_in_records(log_file_path, missing))
+    missing = [check_nr for check_nr in check_nrs if check_nr not in checks]
+    if missing:
+        checks.update(find_checks_reverse(log_file_path, missing))
+    return checks
 
 def main():
     log_file_path = "/root/quileye2.log"  # Pfad zur Logdatei
 
+    # Extrahiere LastUserCheck und LastAutoCheck aus der Pointer-Datei
     try:
-        with open(log_file_path, 'r') as log_file:
-            log_content_colored = log_file.readlines()
-            log_content_stripped = [strip_ansi_codes(line) for line in log_content_colored]
-    except FileNotFoundError:
-        print(f"Error: Logdatei '{log_file_path}' nicht gefunden.")
+        last_user_check, last_auto_check = read_pointers(log_path=log_file_path)
+    except ValueError:
+        print("Error: Ungültiger Wert für LastUserCheck oder LastAutoCheck.")
         return
 
-    # Extrahiere LastUserCheck und LastAutoCheck
-    last_user_check = None
-    last_auto_check = None
-    for line in log_content_stripped:
-        if line.startswith("LastUserCheck:"):
-            try:
-                last_user_check = int(line.split(":")[1].strip())
-            except ValueError:
-                print("Error: Ungültiger Wert für LastUserCheck.")
-                return
-        elif line.startswith("LastAutoCheck:"):
-            try:
-                last_auto_check = int(line.split(":")[1].strip())
-            except ValueError:
-                print("Error: Ungültiger Wert für LastAutoCheck.")
-                return
-
     if last_user_check is None or last_auto_check is None:
-        print("Error: LastUserCheck oder LastAutoCheck nicht in der Logdatei gefunden.")
+        print("Error: LastUserCheck oder LastAutoCheck nicht gefunden.")
         return
 
     # Berechne die Differenz zwischen AutoCheck und UserCheck
     autocheck_difference = last_auto_check - last_user_check
 
-    # Parse die Daten für beide Checks
-    user_data, user_lines = parse_check(log_content_stripped, last_user_check)
-    auto_data, auto_lines = parse_check(log_content_stripped, last_auto_check)
+    # Lade die Daten für beide Checks
+    conn = connect()
+    try:
+        checks = load_checks(conn, [last_user_check, last_auto_check], log_file_path)
+    except FileNotFoundError:
+        print(f"Error: Logdatei '{log_file_path}' nicht gefunden.")
+        return
 
-    if user_data is None or auto_data is None:
+    if last_user_check not in checks or last_auto_check not in checks:
         print("Error: Daten für die angegebenen Checks in der Logdatei nicht gefunden.")
         return
+    user_data, user_lines = checks[last_user_check]
+    auto_data, auto_lines = checks[last_auto_check]
 
     # Berechne Änderungen
     changes = calculate_changes(user_data, auto_data)
@@ -373,15 +360,11 @@ def main():
     last_node_check_menu = display_menu(new_title, new_content)
     print(last_node_check_menu)
 
-    # Aktualisiere LastUserCheck auf LastAutoCheck in den Logzeilen
-    updated_log_lines = update_last_user_check(log_content_colored, last_auto_check)
-
-    # Schreibe die aktualisierten Zeilen zurück in die Logdatei
+    # Aktualisiere LastUserCheck auf LastAutoCheck (nur die Pointer-Datei, die Logdatei bleibt unverändert)
     try:
-        with open(log_file_path, 'w') as log_file:
-            log_file.writelines(updated_log_lines)
+        write_pointers(last_auto_check, last_auto_check)
     except Exception as e:
-        print(f"Error beim Aktualisieren der Logdatei: {e}")
+        print(f"Error beim Aktualisieren der Pointer-Datei: {e}")
 
 if __name__ == "__main__":
     main()
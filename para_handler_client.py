@@ -1,4 +1,6 @@
 #!/usr/bin/python3
+import argparse
+import asyncio
 import subprocess
 import time
 from datetime import datetime
@@ -177,11 +179,143 @@ def monitor_journal():
         logging.info("Monitoring interrupted by user.")
         print("[DEBUG] Monitoring interrupted by user.")
 
-if __name__ == "__main__":
+# Lines that show para.sh (re)starting the workers; a heartbeat is expected after them
+START_MARKERS = ("node parent id:", "started para script service")
+
+def is_error_line(line):
+    lowered = line.lower()
+    return "panic:" in lowered or "error" in lowered
+
+class Watchdog:
+    """
+    Keeps one journalctl -f stream of para.service open and restarts the service on
+    panic/error lines, on a missing "data worker listening" heartbeat after a start,
+    or when the journal stays silent too long. Restarts back off exponentially.
+    """
+
+    def __init__(self, heartbeat_deadline=120, silence_deadline=600, backoff_base=5, backoff_max=300,
+                 stable_after=900, restart_grace=10):
+        self.heartbeat_deadline = heartbeat_deadline
+        self.silence_deadline = silence_deadline
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.restart_grace = restart_grace
+        self.consecutive_restarts = 0
+        self.last_restart = None
+        self.heartbeat_due = None
+        self.last_line_time = time.monotonic()
+
+    def backoff_delay(self):
+        if self.consecutive_restarts == 0:
+            return 0
+        return min(self.backoff_base * 2 ** (self.consecutive_restarts - 1), self.backoff_max)
+
+    async def restart(self, reason):
+        now = time.monotonic()
+        if self.last_restart is not None and now - self.last_restart > self.stable_after:
+            # The service ran stable long enough, start over with the shortest delay
+            self.consecutive_restarts = 0
+        delay = self.backoff_delay()
+        log_event(f"Watchdog: {reason}. Restarting in {delay}s (restart #{self.consecutive_restarts + 1}).", error=True)
+        if delay:
+            await asyncio.sleep(delay)
+        await asyncio.get_running_loop().run_in_executor(None, restart_service)
+        self.note_restart()
+
+    def note_restart(self):
+        self.consecutive_restarts += 1
+        self.last_restart = time.monotonic()
+        self.heartbeat_due = self.last_restart + self.heartbeat_deadline
+        self.last_line_time = self.last_restart
+
+    def in_grace_period(self):
+        return self.last_restart is not None and time.monotonic() - self.last_restart < self.restart_grace
+
+    async def handle_line(self, line):
+        lowered = line.lower()
+        self.last_line_time = time.monotonic()
+        if "data worker listening" in lowered:
+            if self.heartbeat_due is not None:
+                log_event(line)
+            self.heartbeat_due = None
+        elif any(marker in lowered for marker in START_MARKERS):
+            self.heartbeat_due = time.monotonic() + self.heartbeat_deadline
+        if is_error_line(line) and not self.in_grace_period():
+            # Errors while the old processes shut down are expected
+            await self.restart(f"Found panic/error: {line}")
+
+    async def check_deadlines(self):
+        now = time.monotonic()
+        if self.heartbeat_due is not None and now > self.heartbeat_due:
+            await self.restart(f'No "data worker listening" within {self.heartbeat_deadline}s')
+        elif self.silence_deadline and now - self.last_line_time > self.silence_deadline:
+            await self.restart(f"No journal entries for {self.silence_deadline}s")
+
+    async def run(self):
+        logging.info("Watchdog started.")
+        print("[DEBUG] Watchdog started.")
+        while True:
+            process = await asyncio.create_subprocess_exec(
+                "journalctl", "-u", "para.service", "--no-hostname", "-n", "0", "-f",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            try:
+                while True:
+                    try:
+                        raw_line = await asyncio.wait_for(process.stdout.readline(), timeout=1)
+                    except asyncio.TimeoutError:
+                        await self.check_deadlines()
+                        continue
+                    if not raw_line:
+                        break
+                    line = raw_line.decode('utf-8', errors='replace').strip()
+                    if line:
+                        await self.handle_line(line)
+                    await self.check_deadlines()
+            finally:
+                if process.returncode is None:
+                    process.terminate()
+                await process.wait()
+            logging.warning("journalctl stream ended, reopening.")
+            await asyncio.sleep(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check para.service and restart it on crashes.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Run as a long-running watchdog instead of a 30 second one-shot check")
+    parser.add_argument("--heartbeat-deadline", type=int, default=120,
+                        help='Seconds after a start until "data worker listening" must appear (default: 120)')
+    parser.add_argument("--silence-deadline", type=int, default=600,
+                        help="Restart when the journal is silent this long, 0 disables (default: 600)")
+    parser.add_argument("--backoff-base", type=int, default=5, help="First restart backoff in seconds (default: 5)")
+    parser.add_argument("--backoff-max", type=int, default=300, help="Maximum restart backoff in seconds (default: 300)")
+    args = parser.parse_args()
+
     print("[DEBUG] Script started.")
     logging.debug("Script started.")
-    should_restart = check_old_logs()
-    if not should_restart:
-        monitor_journal()
+    if args.watch:
+        watchdog = Watchdog(
+            heartbeat_deadline=args.heartbeat_deadline,
+            silence_deadline=args.silence_deadline,
+            backoff_base=args.backoff_base,
+            backoff_max=args.backoff_max
+        )
+        # Same initial check as the one-shot mode, then keep watching
+        if check_old_logs():
+            watchdog.note_restart()
+        try:
+            asyncio.run(watchdog.run())
+        except KeyboardInterrupt:
+            logging.info("Watchdog interrupted by user.")
+            print("[DEBUG] Watchdog interrupted by user.")
+    else:
+        should_restart = check_old_logs()
+        if not should_restart:
+            monitor_journal()
     print("[DEBUG] Script finished.")
     logging.debug("Script finished.")
+
+if __name__ == "__main__":
+    main()
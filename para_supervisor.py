@@ -0,0 +1,271 @@
+#!/usr/bin/python3
+"""
+Supervises the node parent and its --core=N data workers like para.sh does,
+but tracks every worker by PID and restarts only the core that exited.
+
+Takes the same arguments as para.sh, e.g. in para.service:
+ExecStart=/usr/bin/python3 /root/para_supervisor.py run linux amd64 0 1 1.4.21.1
+serviceandpara.sh --supervisor writes para.service with this line.
+"""
+import argparse
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import time
+
+NODE_DIR = "/root/ceremonyclient/node"
+STATUS_FILE = "/root/para_supervisor.json"
+
+class Child:
+    """
+    One supervised process (the parent has core None).
+    """
+    def __init__(self, core):
+        self.core = core
+        self.process = None
+        self.pidfd = None
+        self.started = None
+        self.restarts = 0
+        self.failures = 0
+        self.last_exit = None
+        self.restart_at = None
+
+    @property
+    def name(self):
+        return "parent" if self.core is None else f"core {self.core}"
+
+    def as_status(self, now):
+        return {
+            "pid": self.process.pid if self.process else None,
+            "uptime": round(now - self.started) if self.process else 0,
+            "restarts": self.restarts,
+            "last_exit": self.last_exit,
+            "restart_in": max(0, round(self.restart_at - now)) if self.restart_at else None,
+        }
+
+def open_pidfd(pid):
+    """
+    Returns a pidfd for the process, or None where pidfds are not available
+    (Python < 3.9 or kernel < 5.3); exits are then picked up by polling waitpid.
+    """
+    try:
+        return os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        return None
+
+class Supervisor:
+    def __init__(self, binary, starting_core, max_cores, status_file=STATUS_FILE,
+                 backoff_base=5, backoff_max=300, stable_after=600):
+        self.binary = binary
+        self.starting_core = starting_core
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.status_file = status_file
+        self.parent = Child(None) if starting_core == 0 else None
+        # Like para.sh: with core 0 the parent takes one of the cores
+        worker_count = max_cores - 1 if starting_core == 0 else max_cores
+        self.workers = {
+            starting_core + i: Child(starting_core + i) for i in range(1, worker_count + 1)
+        }
+        self.poller = select.poll()
+        self.by_fd = {}
+        self.stopping = False
+
+    def parent_pid(self):
+        # Slaves without a local parent pass their own PID, as para.sh did with $$
+        if self.parent and self.parent.process:
+            return self.parent.process.pid
+        return os.getpid()
+
+    def command(self, child):
+        if child.core is None:
+            return [self.binary]
+        return [self.binary, f"--core={child.core}", f"--parent-process={self.parent_pid()}"]
+
+    def spawn(self, child):
+        child.process = subprocess.Popen(self.command(child), cwd=os.path.dirname(self.binary))
+        child.started = time.time()
+        child.restart_at = None
+        child.pidfd = open_pidfd(child.process.pid)
+        if child.pidfd is not None:
+            self.poller.register(child.pidfd, select.POLLIN)
+            self.by_fd[child.pidfd] = child
+        print(f"Started {child.name}: pid {child.process.pid}", flush=True)
+
+    def release(self, child):
+        if child.pidfd is not None:
+            self.poller.unregister(child.pidfd)
+            del self.by_fd[child.pidfd]
+            os.close(child.pidfd)
+            child.pidfd = None
+        child.process = None
+
+    def stop(self, child, timeout=10):
+        """
+        Terminates a child and waits for it, killing it after 'timeout' seconds.
+        """
+        if child.process is None:
+            return
+        if child.process.poll() is None:
+            child.process.terminate()
+            try:
+                child.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                child.process.kill()
+                child.process.wait()
+        self.release(child)
+
+    def backoff_delay(self, child):
+        return min(self.backoff_base * 2 ** max(child.failures - 1, 0), self.backoff_max)
+
+    def handle_exit(self, child, returncode):
+        now = time.time()
+        uptime = now - child.started
+        self.release(child)
+        child.last_exit = returncode
+        child.failures = 1 if uptime >= self.stable_after else child.failures + 1
+        if self.stopping:
+            return
+        if child is self.parent:
+            # Workers are bound to the parent PID, so all of them follow it
+            print(f"Parent exited with {returncode} after {uptime:.0f}s. Restarting all cores.", flush=True)
+            for worker in self.workers.values():
+                self.stop(worker)
+                worker.restart_at = None
+            child.restart_at = now + self.backoff_delay(child)
+        else:
+            delay = self.backoff_delay(child)
+            print(f"{child.name} exited with {returncode} after {uptime:.0f}s. Restarting in {delay}s.", flush=True)
+            child.restart_at = now + delay
+
+    def reap(self, timeout):
+        """
+        Waits up to 'timeout' seconds for exits and handles every child that exited.
+        """
+        if self.by_fd:
+            ready = self.poller.poll(timeout * 1000)
+            for fd, _ in ready:
+                child = self.by_fd.get(fd)
+                if child is not None and child.process.poll() is not None:
+                    self.handle_exit(child, child.process.returncode)
+        else:
+            time.sleep(timeout)
+        # Children without a pidfd are checked with waitpid on every round
+        for child in self.children():
+            if child.process is not None and child.pidfd is None and child.process.poll() is not None:
+                self.handle_exit(child, child.process.returncode)
+
+    def children(self):
+        return ([self.parent] if self.parent else []) + list(self.workers.values())
+
+    def start_due(self):
+        now = time.time()
+        if self.parent and self.parent.process is None:
+            if self.parent.restart_at is None or self.parent.restart_at <= now:
+                self.parent.restarts += self.parent.restart_at is not None
+                self.spawn(self.parent)
+                for worker in self.workers.values():
+                    worker.restarts += worker.started is not None
+                    self.spawn(worker)
+            return
+        for worker in self.workers.values():
+            if worker.process is None and (worker.restart_at is None or worker.restart_at <= now):
+                worker.restarts += worker.started is not None
+                self.spawn(worker)
+
+    def write_status(self):
+        now = time.time()
+        status = {
+            "updated": round(now),
+            "supervisor_pid": os.getpid(),
+            "parent": self.parent.as_status(now) if self.parent else None,
+            "cores": {str(core): worker.as_status(now) for core, worker in self.workers.items()},
+        }
+        tmp_path = f"{self.status_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(status, f, indent=1)
+        os.replace(tmp_path, self.status_file)
+
+    def run(self, status_interval=5):
+        def request_stop(signum, frame):
+            self.stopping = True
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        print(f"Node parent: {'local' if self.parent else os.getpid()}, Starting Core: {self.starting_core}, "
+              f"Workers: {len(self.workers)}", flush=True)
+        last_status = 0
+        while not self.stopping:
+            self.start_due()
+            if time.time() - last_status >= status_interval:
+                self.write_status()
+                last_status = time.time()
+            self.reap(1)
+
+        print("Stopping all cores.", flush=True)
+        for child in self.children():
+            self.stop(child)
+            child.restart_at = None
+        self.write_status()
+
+def print_status(status_file=STATUS_FILE):
+    """
+    Prints the per-core table from the status file of a running supervisor.
+    """
+    try:
+        with open(status_file, 'r') as f:
+            status = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    age = max(0, time.time() - status["updated"])
+    print(f"Supervisor pid {status['supervisor_pid']}, status from {age:.0f}s ago")
+    print(f"{'Core':<8}{'PID':<10}{'Uptime':<16}{'Restarts':<10}{'Last exit':<10}")
+    rows = [("parent", status["parent"])] if status["parent"] else []
+    rows += sorted(status["cores"].items(), key=lambda item: int(item[0]))
+    for core, entry in rows:
+        if entry["pid"] is None:
+            state = f"restart in {entry['restart_in']}s" if entry["restart_in"] is not None else "down"
+        else:
+            state = time.strftime("%H:%M:%S", time.gmtime(entry["uptime"])) if entry["uptime"] < 86400 \
+                else f"{entry['uptime'] // 86400}d"
+        last_exit = "" if entry["last_exit"] is None else entry["last_exit"]
+        print(f"{core:<8}{entry['pid'] or '-':<10}{state:<16}{entry['restarts']:<10}{last_exit:<10}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-core supervisor for the node data workers.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Start and supervise the parent and workers")
+    run_parser.add_argument("os")
+    run_parser.add_argument("architecture")
+    run_parser.add_argument("starting_core", type=int)
+    run_parser.add_argument("max_cores", type=int)
+    run_parser.add_argument("version")
+    run_parser.add_argument("--node-dir", default=NODE_DIR, help=f"Node directory (default: {NODE_DIR})")
+    run_parser.add_argument("--backoff-base", type=int, default=5, help="First restart delay in seconds (default: 5)")
+    run_parser.add_argument("--backoff-max", type=int, default=300, help="Maximum restart delay in seconds (default: 300)")
+    run_parser.add_argument("--stable-after", type=int, default=600,
+                            help="Uptime in seconds after which the backoff resets (default: 600)")
+    status_parser = subparsers.add_parser("status", help="Show per-core uptime and restart counts")
+    for sub in (run_parser, status_parser):
+        sub.add_argument("--status-file", default=STATUS_FILE, help=f"Status file (default: {STATUS_FILE})")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        print_status(args.status_file)
+        return
+
+    binary = os.path.join(args.node_dir, f"node-{args.version}-{args.os}-{args.architecture}")
+    if not os.access(binary, os.X_OK):
+        print(f"Error: {binary} not found or not executable")
+        sys.exit(1)
+    Supervisor(binary, args.starting_core, args.max_cores, args.status_file,
+               args.backoff_base, args.backoff_max, args.stable_after).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+import argparse
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+INPUT_FILE = "/root/cm_settings.txt"
+OUTPUT_FILE = "/root/ping_results.txt"
+
+REPLY_PATTERN = re.compile(r"time[=<]([\d.]+) ms")
+SUMMARY_PATTERN = re.compile(r"(\d+) packets transmitted, (\d+) (?:packets )?received")
+
+def read_hosts(input_path=INPUT_FILE):
+    """
+    Returns the IPs (first column) of cm_settings.txt in file order.
+    """
+    hosts = []
+    with open(input_path, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if parts and parts[0] not in hosts:
+                hosts.append(parts[0])
+    return hosts
+
+def parse_ping_output(output, count):
+    """
+    Computes min/avg/max, jitter (mean difference between consecutive replies)
+    and packet loss from the ping output.
+    """
+    times = [float(value) for value in REPLY_PATTERN.findall(output)]
+    summary = SUMMARY_PATTERN.search(output)
+    transmitted = int(summary.group(1)) if summary else count
+    received = int(summary.group(2)) if summary else len(times)
+    loss = 100.0 * (transmitted - received) / transmitted if transmitted else 100.0
+    result = {"min": None, "avg": None, "max": None, "jitter": None, "loss": loss}
+    if times:
+        result["min"] = min(times)
+        result["avg"] = sum(times) / len(times)
+        result["max"] = max(times)
+        diffs = [abs(b - a) for a, b in zip(times, times[1:])]
+        result["jitter"] = sum(diffs) / len(diffs) if diffs else 0.0
+    return result
+
+def probe(ip, count=3, deadline=5, interval=0.2):
+    """
+    Pings one host. The whole probe ends after 'deadline' seconds, so a dead
+    host costs at most the deadline instead of count times the reply timeout.
+    """
+    command = ["ping", "-n", "-c", str(count), "-i", str(interval), "-w", str(deadline), ip]
+    try:
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                universal_newlines=True, timeout=deadline + 2)
+        output = result.stdout
+    except subprocess.TimeoutExpired as e:
+        output = e.stdout or ""
+        if isinstance(output, bytes):
+            output = output.decode(errors='replace')
+    except OSError:
+        output = ""
+    return ip, parse_ping_output(output, count)
+
+def probe_all(hosts, count=3, deadline=5, interval=0.2, concurrency=32):
+    """
+    Probes all hosts with at most 'concurrency' pings at a time; returns
+    (ip, result) pairs sorted by average latency, unreachable hosts last.
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda ip: probe(ip, count, deadline, interval), hosts))
+    return sorted(results, key=lambda item: (item[1]["avg"] is None, item[1]["avg"] or 0))
+
+def format_value(value):
+    return "N/A" if value is None else f"{value:.3f}"
+
+def write_results(results, output_path=OUTPUT_FILE):
+    """
+    Writes 'ip avg min max jitter loss%' lines atomically. The first two columns
+    stay 'ip avg' as cm_pingcheck.bash always wrote them.
+    """
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        for ip, result in results:
+            f.write(f"{ip} {format_value(result['avg'])} {format_value(result['min'])} "
+                    f"{format_value(result['max'])} {format_value(result['jitter'])} {result['loss']:.0f}%\n")
+    os.replace(tmp_path, output_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Ping all cluster IPs concurrently.")
+    parser.add_argument("--input", default=INPUT_FILE, help=f"IP list, first column (default: {INPUT_FILE})")
+    parser.add_argument("--output", default=OUTPUT_FILE, help=f"Results file (default: {OUTPUT_FILE})")
+    parser.add_argument("--count", type=int, default=3, help="Pings per host (default: 3)")
+    parser.add_argument("--deadline", type=int, default=5, help="Seconds per host (default: 5)")
+    parser.add_argument("--interval", type=float, default=0.2, help="Seconds between pings (default: 0.2)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Hosts pinged at the same time (default: 32)")
+    args = parser.parse_args()
+
+    try:
+        hosts = read_hosts(args.input)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    results = probe_all(hosts, args.count, args.deadline, args.interval, args.concurrency)
+    for ip, result in results:
+        print(f"[LOG] Processed {ip}: Average Ping = {format_value(result['avg'])} ms "
+              f"(min {format_value(result['min'])}, max {format_value(result['max'])}, "
+              f"jitter {format_value(result['jitter'])}, loss {result['loss']:.0f}%)")
+    write_results(results, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+import argparse
+
+from journal_reader import JournalError, iter_journal_records, message_text, extract_fields
+from thresholds import THRESHOLDS_FILE, bounds, load_thresholds
+
+CREATE_MARKER = "creating data shard ring proof"
+SUBMIT_MARKER = "submitting data proof"
+
+# Colors for thresholds
+GREEN = '\033[32m'
+YELLOW = '\033[33m'
+RED = '\033[31m'
+RESET = '\033[0m'
+
+def classify_proofs(records):
+    """
+    Sorts proof records into creation and submission events in a single pass.
+    Returns two lists of (frame_number, frame_age) tuples.
+    """
+    creates = []
+    submits = []
+    for record in records:
+        message = message_text(record)
+        if CREATE_MARKER in message:
+            events = creates
+        elif SUBMIT_MARKER in message:
+            events = submits
+        else:
+            continue
+        fields = extract_fields(message)
+        try:
+            frame_age = float(fields["frame_age"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        frame_number = fields.get("frame_number")
+        events.append((frame_number, frame_age))
+    return creates, submits
+
+def match_proofs(creates, submits):
+    """
+    Pairs creation and submission events by frame_number in O(n).
+    Several submissions per frame and events in any order are handled by pairing
+    each creation with the earliest unused submission that is not older than it.
+    Returns (cpu_times, unmatched_creates, unmatched_submits).
+    """
+    frames = {}
+    for frame_number, frame_age in creates:
+        frames.setdefault(frame_number, ([], []))[0].append(frame_age)
+    for frame_number, frame_age in submits:
+        frames.setdefault(frame_number, ([], []))[1].append(frame_age)
+
+    cpu_times = []
+    unmatched_creates = 0
+    unmatched_submits = 0
+    for frame_number, (create_ages, submit_ages) in frames.items():
+        if frame_number is None:
+            unmatched_creates += len(create_ages)
+            unmatched_submits += len(submit_ages)
+            continue
+        create_ages.sort()
+        submit_ages.sort()
+        i = j = 0
+        while i < len(create_ages) and j < len(submit_ages):
+            if submit_ages[j] < create_ages[i]:
+                # Submission without a matching creation in the window
+                unmatched_submits += 1
+                j += 1
+                continue
+            cpu_times.append(submit_ages[j] - create_ages[i])
+            i += 1
+            j += 1
+        unmatched_creates += len(create_ages) - i
+        unmatched_submits += len(submit_ages) - j
+    return cpu_times, unmatched_creates, unmatched_submits
+
+def percentile(sorted_values, percent):
+    """
+    Returns the linearly interpolated percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def format_cpu_stats(cpu_times, unmatched_creates, unmatched_submits):
+    """
+    Builds the CPU-Processing distribution line (percentiles and unmatched proofs).
+    """
+    if not cpu_times:
+        return f"CPU-Processing: no matched proofs - Unmatched: {unmatched_creates} created, {unmatched_submits} submitted"
+    ordered = sorted(cpu_times)
+    return (
+        f"CPU-Processing p50: {percentile(ordered, 50):.2f}s - p90: {percentile(ordered, 90):.2f}s"
+        f" - p99: {percentile(ordered, 99):.2f}s - Unmatched: {unmatched_creates} created, {unmatched_submits} submitted"
+    )
+
+def average(values):
+    return sum(values) / len(values)
+
+def colorize(value, bounds):
+    """
+    Colors a formatted value green, yellow or red based on (optimal max, warning max).
+    """
+    optimal_max, warning_max = bounds
+    text = f"{value:.2f}"
+    if value <= optimal_max:
+        return f"{GREEN}{text}{RESET}"
+    elif value <= warning_max:
+        return f"{YELLOW}{text}{RESET}"
+    return f"{RED}{text}{RESET}"
+
+def summarize(creates, submits, cpu_times):
+    """
+    Returns (proofs, creation avg, submission avg, cpu avg) or None without data.
+    """
+    if not creates or not submits or not cpu_times:
+        return None
+    return (
+        len(creates),
+        average([age for _, age in creates]),
+        average([age for _, age in submits]),
+        average(cpu_times)
+    )
+
+def format_summary(summary, time_window, color=False,
+                   creation_bounds=None, submission_bounds=None, cpu_bounds=None):
+    """
+    Builds the "N Proofs - Creation: ..." summary line used in quileye2.log.
+    Bounds that are not given come from the threshold file.
+    """
+    if summary is None:
+        return f"No proofs found in the last {time_window} minutes"
+
+    total_proofs, create_avg, submit_avg, cpu_avg = summary
+    if color:
+        if None in (creation_bounds, submission_bounds, cpu_bounds):
+            thresholds = load_thresholds()
+            creation_bounds = creation_bounds or bounds(thresholds, "CREATION")
+            submission_bounds = submission_bounds or bounds(thresholds, "SUBMISSION")
+            cpu_bounds = cpu_bounds or bounds(thresholds, "CPU")
+        create_text = colorize(create_avg, creation_bounds)
+        submit_text = colorize(submit_avg, submission_bounds)
+        cpu_text = colorize(cpu_avg, cpu_bounds)
+    else:
+        create_text = f"{create_avg:.2f}"
+        submit_text = f"{submit_avg:.2f}"
+        cpu_text = f"{cpu_avg:.2f}"
+
+    return f"{total_proofs} Proofs - Creation: {create_text}s - Submission: {submit_text}s - CPU-Processing: {cpu_text}s"
+
+def analyze_proofs(service, time_window, source=None):
+    """
+    Reads the journal of the service once and returns the classified proof events.
+    """
+    records = iter_journal_records(
+        service,
+        source=source,
+        markers=(CREATE_MARKER, SUBMIT_MARKER),
+        since_minutes=time_window
+    )
+    return classify_proofs(records)
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze proof creation and submission frame ages.")
+    parser.add_argument("service", help="Service name, for example ceremonyclient or para")
+    parser.add_argument("minutes", nargs="?", type=int, default=180, help="Time window in minutes (default: 180)")
+    parser.add_argument("--color", action="store_true", help="Color the averages by threshold")
+    thresholds = load_thresholds()
+    parser.add_argument("--creation-bounds", nargs=2, type=float, default=bounds(thresholds, "CREATION"),
+                        metavar=("OPTIMAL", "WARNING"), help=f"Default: CREATION_* from {THRESHOLDS_FILE}")
+    parser.add_argument("--submission-bounds", nargs=2, type=float, default=bounds(thresholds, "SUBMISSION"),
+                        metavar=("OPTIMAL", "WARNING"), help=f"Default: SUBMISSION_* from {THRESHOLDS_FILE}")
+    parser.add_argument("--cpu-bounds", nargs=2, type=float, default=bounds(thresholds, "CPU"),
+                        metavar=("OPTIMAL", "WARNING"), help=f"Default: CPU_* from {THRESHOLDS_FILE}")
+    parser.add_argument("--stats", action="store_true", help="Also print CPU-Processing percentiles and unmatched proofs")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only read journal entries since the last run and report from the saved aggregate")
+    parser.add_argument("--input", help="Read journalctl -o json output from a file ('-' for stdin)")
+    args = parser.parse_args()
+
+    try:
+        if args.incremental:
+            # Imported here because journal_cursor builds on this module
+            from journal_cursor import update_aggregate, proof_window
+            aggregate = update_aggregate(args.service, args.minutes, source=args.input)
+            summary, unmatched_creates = proof_window(aggregate, args.minutes)
+        else:
+            creates, submits = analyze_proofs(args.service, args.minutes, source=args.input)
+            cpu_times, unmatched_creates, unmatched_submits = match_proofs(creates, submits)
+            summary = summarize(creates, submits, cpu_times)
+    except JournalError as e:
+        print(f"Error: {e}")
+        return
+
+    print(format_summary(
+        summary, args.minutes, color=args.color,
+        creation_bounds=args.creation_bounds,
+        submission_bounds=args.submission_bounds,
+        cpu_bounds=args.cpu_bounds
+    ))
+    if args.stats:
+        if args.incremental:
+            print(f"Unmatched: {unmatched_creates} created")
+        else:
+            print(format_cpu_stats(cpu_times, unmatched_creates, unmatched_submits))
+
+if __name__ == "__main__":
+    main()
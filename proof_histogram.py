@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+"""
+Frame age histograms of proof creation, proof submission and their difference
+(CPU-Processing), one set per hour. The buckets are log-linear like HdrHistogram:
+10 ms wide up to 0.64 s, above that 32 buckets per doubling (about 3% relative
+error). journal_cursor.py folds every proof into them while it reads the journal,
+so they are saved with its aggregate and kept for HISTOGRAM_HOURS. Hours merge
+by adding counts, so any window gets exact bucket counts and percentiles.
+"""
+import argparse
+import sys
+import time
+
+UNIT = 0.01  # seconds per unit of the lowest buckets
+SUB_BITS = 6
+SUB_BUCKETS = 1 << SUB_BITS
+HALF_BUCKETS = SUB_BUCKETS // 2
+
+# How long the hourly histograms are kept (the minute buckets only cover the retention)
+HISTOGRAM_HOURS = 7 * 24
+
+METRICS = ("creation", "submission", "cpu")
+PERCENTS = (50, 95, 99)
+
+def bucket_index(value):
+    """
+    Bucket of a value in seconds; negative values count as 0.
+    """
+    units = max(0, int(value / UNIT))
+    if units < SUB_BUCKETS:
+        return units
+    shift = units.bit_length() - SUB_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF_BUCKETS + (units >> shift) - HALF_BUCKETS
+
+def bucket_bounds(index):
+    """
+    (lowest, highest) value in seconds that falls into a bucket.
+    """
+    if index < SUB_BUCKETS:
+        return index * UNIT, (index + 1) * UNIT
+    shift = (index - SUB_BUCKETS) // HALF_BUCKETS + 1
+    sub = (index - SUB_BUCKETS) % HALF_BUCKETS + HALF_BUCKETS
+    return (sub << shift) * UNIT, ((sub + 1) << shift) * UNIT
+
+def hour_key(realtime):
+    return str(int(realtime // 3600))
+
+def record_value(histograms, realtime, metric, value):
+    """
+    Counts one value in the hour of 'realtime'. 'histograms' is the
+    {hour: {metric: {bucket: count}}} mapping saved in the journal aggregate.
+    """
+    hour = histograms.setdefault(hour_key(realtime), {})
+    counts = hour.setdefault(metric, {})
+    bucket = str(bucket_index(value))
+    counts[bucket] = counts.get(bucket, 0) + 1
+
+def prune_histograms(histograms, now, keep_hours=HISTOGRAM_HOURS):
+    oldest_hour = int(now // 3600) - keep_hours
+    for key in [key for key in histograms if int(key) < oldest_hour]:
+        del histograms[key]
+
+def merge(counts_list):
+    """
+    Adds bucket counts; the result is the histogram of the combined window.
+    """
+    merged = {}
+    for counts in counts_list:
+        for bucket, count in counts.items():
+            merged[int(bucket)] = merged.get(int(bucket), 0) + count
+    return merged
+
+def window_counts(histograms, metric, first_hour, last_hour):
+    """
+    Merged histogram of one metric over the hours first_hour..last_hour (inclusive).
+    """
+    return merge(hour.get(metric, {}) for key, hour in histograms.items() if first_hour <= int(key) <= last_hour)
+
+def total(counts):
+    return sum(counts.values())
+
+def value_at_percentile(counts, percent):
+    """
+    Highest value of the bucket that holds the percentile (as HdrHistogram
+    reports it), or None for an empty histogram.
+    """
+    count = total(counts)
+    if not count:
+        return None
+    rank = max(1, -(-count * percent // 100))
+    seen = 0
+    for bucket in sorted(counts):
+        seen += counts[bucket]
+        if seen >= rank:
+            return bucket_bounds(int(bucket))[1]
+    return bucket_bounds(max(counts))[1]
+
+def fraction_below(counts, seconds):
+    """
+    Share of values below 'seconds'. The bucket that holds 'seconds' is split linearly.
+    """
+    count = total(counts)
+    if not count:
+        return None
+    below = 0.0
+    for bucket, bucket_count in counts.items():
+        low, high = bucket_bounds(int(bucket))
+        if high <= seconds:
+            below += bucket_count
+        elif low < seconds:
+            below += bucket_count * (seconds - low) / (high - low)
+    return below / count
+
+def format_percentiles(counts):
+    values = [value_at_percentile(counts, percent) for percent in PERCENTS]
+    if values[0] is None:
+        return "-"
+    return "/".join(f"{value:.1f}" for value in values)
+
+def format_hours(histograms, hours, under=(), now=None):
+    """
+    One line per hour (newest last) and a merged line for the whole window: proofs,
+    p50/p95/p99 of every metric and the share of submissions under each 'under' second.
+    """
+    now = time.time() if now is None else now
+    last_hour = int(now // 3600)
+    first_hour = last_hour - hours + 1
+    header = f"{'Hour':<12} {'Proofs':>7} {'Creation p50/95/99':>20} {'Submission p50/95/99':>22} {'CPU p50/95/99':>18}"
+    header += "".join(f" {f'<{seconds:g}s':>7}" for seconds in under)
+    lines = [header]
+
+    def line(label, first, last):
+        counts = {metric: window_counts(histograms, metric, first, last) for metric in METRICS}
+        text = (f"{label:<12} {total(counts['creation']):>7} {format_percentiles(counts['creation']):>20} "
+                f"{format_percentiles(counts['submission']):>22} {format_percentiles(counts['cpu']):>18}")
+        for seconds in under:
+            share = fraction_below(counts["submission"], seconds)
+            text += f" {'-' if share is None else f'{share * 100:.1f}%':>7}"
+        return text
+
+    for hour in range(first_hour, last_hour + 1):
+        if str(hour) in histograms:
+            lines.append(line(time.strftime("%m-%d %H:00", time.localtime(hour * 3600)), hour, hour))
+    lines.append(line(f"Last {hours}h", first_hour, last_hour))
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Hourly frame age percentiles of proof creation and submission.")
+    parser.add_argument("service", help="Service name, for example ceremonyclient or para")
+    parser.add_argument("hours", nargs="?", type=int, default=24, help="Hours to show (default: 24)")
+    parser.add_argument("--under", type=float, action="append", default=[], metavar="SECONDS",
+                        help="Also show the share of submissions under this frame age (repeatable)")
+    parser.add_argument("--input", help="Read journalctl -o json output from a file ('-' for stdin)")
+    args = parser.parse_args()
+
+    # Imported here because journal_cursor itself folds the proofs into these histograms
+    from journal_cursor import DEFAULT_RETENTION_MINUTES, update_aggregate
+    from journal_reader import JournalError
+    try:
+        state = update_aggregate(args.service, DEFAULT_RETENTION_MINUTES, source=args.input)
+    except JournalError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(format_hours(state.get("histograms", {}), max(1, args.hours), args.under))
+
+if __name__ == "__main__":
+    main()
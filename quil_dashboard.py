@@ -0,0 +1,367 @@
+#!/usr/bin/python3
+"""
+Live view of the last node check, the last coin report and the journal, in the
+display_menu boxes of open_quileye.py. Instead of reloading the logs it follows
+quileye2.jsonl and coinreport.jsonl by byte offset (one stat per poll, new bytes
+only) and the journal through the journal_cursor aggregate (entries after the
+cursor only). Only the screen lines whose text changed are rewritten.
+It only reads: the saved journal aggregate is loaded once and new entries are
+folded into it in memory (blink and the cron jobs save it), the check store is
+opened read-only and the pointer file is never written, so LastUserCheck stays
+where open_quileye.py left it.
+"""
+import argparse
+import os
+import shutil
+import signal
+import sqlite3
+import sys
+import time
+from wcwidth import wcswidth, wcwidth
+
+from check_store import DB_FILE, LOG_FILE, POINTER_FILE, connect, read_pointers
+from journal_cursor import fold_journal, load_state, proof_window, shard_entries, state_path
+from journal_reader import JournalError
+from open_quileye import BLUE, YELLOW, calculate_changes, color_text, display_menu, format_changes, load_checks
+from proof_analyzer import colorize
+from quil_report import read_service
+from report_records import ANSI_ESCAPE, decode_record, iter_records_reverse, records_path_for
+from thresholds import THRESHOLDS_FILE, bounds, landing_rate_color, load_thresholds
+
+REPORT_LOG = "/root/coinreport.log"
+
+RESET = "\033[0m"
+HIDE_CURSOR = "\033[?25l"
+SHOW_CURSOR = "\033[?25h"
+CLEAR_SCREEN = "\033[2J"
+CLEAR_LINE = "\033[K"
+
+# (label in the coin record, decimals shown)
+COIN_ROWS = [
+    ("Total QUIL earned", 6),
+    ("Total per Worker", 6),
+    ("Average QUIL per Coin", 6),
+    ("Median QUIL per Coin", 6),
+    ("Active Workers", 0),
+]
+
+class RecordTail:
+    """
+    Follows a JSON Lines file by byte offset. A file that shrank or was replaced
+    (rotation) is read again from its start; a half written last line waits for
+    the next poll.
+    """
+    def __init__(self, log_path):
+        self.log_path = log_path
+        self.path = records_path_for(log_path)
+        self.inode = None
+        self.offset = 0
+        self.rest = b""
+
+    def skip_to_end(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        self.inode = stat.st_ino
+        self.offset = stat.st_size
+
+    def poll(self):
+        """
+        Returns the records appended since the last poll.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.inode = stat.st_ino
+            self.offset = 0
+            self.rest = b""
+        if stat.st_size == self.offset:
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(stat.st_size - self.offset)
+        self.offset += len(data)
+        lines = (self.rest + data).split(b"\n")
+        self.rest = lines.pop()
+        records = [decode_record(line) for line in lines]
+        return [record for record in records if record is not None]
+
+def format_ago(seconds):
+    if seconds < 120:
+        return f"{seconds:.0f}s ago"
+    if seconds < 7200:
+        return f"{seconds // 60:.0f}m ago"
+    return f"{seconds // 3600:.0f}h ago"
+
+def format_number(value, decimals):
+    if value is None:
+        return "N/A"
+    return f"{value:.{decimals}f}"
+
+class Dashboard:
+    """
+    Holds the newest record of every source and renders them into lines.
+    """
+    def __init__(self, service, minutes=180, thresholds=None, check_log=LOG_FILE, coin_log=REPORT_LOG,
+                 pointer_path=POINTER_FILE, db_path=DB_FILE):
+        self.service = service
+        self.minutes = minutes
+        self.thresholds = load_thresholds() if thresholds is None else thresholds
+        self.check_log = check_log
+        self.pointer_path = pointer_path
+        self.db_path = db_path
+        self.check_tail = RecordTail(check_log)
+        self.coin_tail = RecordTail(coin_log)
+        self.check = None
+        self.user_check = None
+        self.coins = []
+        self.journal = None
+        self.journal_state = None
+        self.journal_error = None
+
+    def load(self):
+        """
+        The newest records are read backward from the end, then both files are followed.
+        """
+        self.check = next(iter_records_reverse(self.check_log), None)
+        records = iter_records_reverse(self.coin_tail.log_path)
+        self.coins = [record for record in (next(records, None), next(records, None)) if record is not None][::-1]
+        self.check_tail.skip_to_end()
+        self.coin_tail.skip_to_end()
+        self.load_user_check()
+
+    def load_user_check(self):
+        """
+        LastUserCheck from the pointer file, looked up like open_quileye.py does.
+        """
+        last_user_check, _ = read_pointers(self.pointer_path, self.check_log, seed=False)
+        if last_user_check is None or (self.user_check and self.user_check[0] == last_user_check):
+            return
+        try:
+            conn = connect(self.db_path, read_only=True)
+        except sqlite3.OperationalError:
+            # No check store yet: the check comes from the records or the log
+            conn = None
+        try:
+            checks = load_checks(conn, [last_user_check], self.check_log)
+        except (FileNotFoundError, sqlite3.Error):
+            checks = {}
+        finally:
+            if conn is not None:
+                conn.close()
+        if last_user_check in checks:
+            self.user_check = (last_user_check, checks[last_user_check][0])
+
+    def poll_files(self):
+        """
+        Returns True if a new check or coin report arrived.
+        """
+        checks = self.check_tail.poll()
+        coins = self.coin_tail.poll()
+        if checks:
+            self.check = checks[-1]
+            self.load_user_check()
+        if coins:
+            self.coins = (self.coins + coins)[-2:]
+        return bool(checks or coins)
+
+    def poll_journal(self):
+        """
+        The saved aggregate is loaded once; after that only the entries following
+        the in-memory cursor are folded, and nothing is written back.
+        """
+        if self.journal_state is None:
+            self.journal_state = load_state(state_path(self.service))
+        try:
+            state = fold_journal(self.journal_state, self.service, self.minutes)
+        except JournalError as e:
+            self.journal_error = str(e)
+            return
+        self.journal_state = state
+        self.journal_error = None
+        summary, unmatched = proof_window(state, self.minutes)
+        latest = shard_entries(state, 1)
+        self.journal = (summary, unmatched, latest[-1] if latest else None)
+
+    def check_box(self, now):
+        if self.check is None:
+            return display_menu("Last Node Check:", f"No records in {records_path_for(self.check_log)} yet")
+        fields = self.check.get("check", {})
+        title = (f"{color_text('Last Node Check:', YELLOW, bold=True)} - Check-Nr "
+                 f"{color_text(str(self.check.get('check_nr')), BLUE)} - {format_ago(now - self.check['time'])}")
+        lines = [
+            f"Max Frame: {fields.get('Max Frame', '-')} - Active Workers: {self.check.get('active_workers') or '-'}"
+            f" - Prover Ring: {fields.get('Prover Ring', '-')} - Seniority: {fields.get('Seniority', '-')}",
+            f"Coins: {fields.get('Coins', '-')} - Owned balance: {format_number(fields.get('Owned balance'), 3)}",
+        ]
+        if "Proofs" in fields:
+            lines.append(
+                f"{fields['Proofs']} Proofs - Creation: {colorize(fields['Creation'], bounds(self.thresholds, 'CREATION'))}s"
+                f" - Submission: {colorize(fields['Submission'], bounds(self.thresholds, 'SUBMISSION'))}s"
+                f" - CPU-Processing: {colorize(fields['CPU-Processing'], bounds(self.thresholds, 'CPU'))}s")
+        if self.user_check is not None and self.user_check[0] != self.check.get("check_nr"):
+            changes = calculate_changes(self.user_check[1], fields)
+            lines.append(f"Since Check-Nr {self.user_check[0]}: {format_changes(changes) if changes else 'no change'}")
+        return display_menu(title, "\n".join(lines))
+
+    def coin_box(self, now):
+        if not self.coins:
+            return display_menu("Coin Report:", f"No records in {self.coin_tail.path} yet")
+        record = self.coins[-1]
+        report = record.get("report", {})
+        previous = self.coins[0].get("report", {}) if len(self.coins) > 1 else {}
+        rate = report.get("Landing Rate") or 0.0
+        title = (f"{color_text('Coin Report:', YELLOW, bold=True)} {record.get('hours')}h - "
+                 f"{format_ago(now - record['time'])}")
+        lines = [f"Landing Rate: {landing_rate_color(rate, self.thresholds)}{rate:.2f}%{RESET}"]
+        for label, decimals in COIN_ROWS:
+            line = f"{label}: {format_number(report.get(label), decimals)}"
+            new, old = report.get(label), previous.get(label)
+            if new is not None and old:
+                line += f" ({(new - old) / abs(old) * 100:+.2f}%)"
+            lines.append(line)
+        return display_menu(title, "\n".join(lines))
+
+    def journal_box(self, now):
+        title = f"{color_text('Journal:', YELLOW, bold=True)} {self.service} - last {self.minutes} min"
+        if self.journal_error:
+            return display_menu(title, f"Error: {self.journal_error}")
+        if self.journal is None:
+            return display_menu(title, "Reading the journal...")
+        summary, unmatched, latest = self.journal
+        if summary is None:
+            lines = [f"No proofs found in the last {self.minutes} minutes"]
+        else:
+            proofs, creation, submission, cpu = summary
+            lines = [f"{proofs} Proofs - Creation: {colorize(creation, bounds(self.thresholds, 'CREATION'))}s"
+                     f" - Submission: {colorize(submission, bounds(self.thresholds, 'SUBMISSION'))}s"
+                     f" - CPU-Processing: {colorize(cpu, bounds(self.thresholds, 'CPU'))}s"]
+        lines.append(f"Unmatched creations: {unmatched}")
+        if latest is not None:
+            realtime, frame_number, frame_age, ring, active_workers, _ = latest
+            lines.append(f"Last shard: Frame {frame_number} - FrameAge {float(frame_age):.2f}s - Ring {ring}"
+                         f" - {format_ago(now - realtime)}")
+        return display_menu(title, "\n".join(lines))
+
+    def render(self, now=None):
+        now = time.time() if now is None else now
+        boxes = [self.check_box(now), self.coin_box(now), self.journal_box(now)]
+        return "\n\n".join(boxes).splitlines()
+
+def clip_line(line, columns):
+    """
+    Cuts a line to 'columns' terminal cells, so it never wraps into the next row.
+    Escape sequences take no cells and are kept; a cut line ends with RESET.
+    """
+    width = wcswidth(ANSI_ESCAPE.sub('', line))
+    if 0 <= width <= columns:
+        return line
+    parts = []
+    width = 0
+    position = 0
+    for match in list(ANSI_ESCAPE.finditer(line)) + [None]:
+        end = match.start() if match else len(line)
+        for char in line[position:end]:
+            char_width = max(0, wcwidth(char))
+            if width + char_width > columns:
+                return "".join(parts) + RESET
+            parts.append(char)
+            width += char_width
+        if match:
+            parts.append(match.group())
+            position = match.end()
+    return "".join(parts)
+
+class Screen:
+    """
+    Keeps the lines on the terminal and rewrites only the ones that changed.
+    Lines are clipped to the terminal size first: a wrapped or scrolled line
+    would shift every row below the one the diff writes to.
+    """
+    def __init__(self, out=sys.stdout):
+        self.out = out
+        self.lines = []
+        self.size = None
+
+    def invalidate(self):
+        self.size = None
+
+    def draw(self, lines):
+        size = shutil.get_terminal_size()
+        parts = []
+        if size != self.size:
+            # First draw or resized terminal: everything is drawn again
+            self.size = size
+            self.lines = []
+            parts.append(CLEAR_SCREEN)
+        # One column stays free: writing the last one leaves the cursor waiting to
+        # wrap, and CLEAR_LINE would then erase that character on some terminals
+        lines = [clip_line(line, size.columns - 1) for line in lines[:size.lines]]
+        for row, line in enumerate(lines):
+            if row >= len(self.lines) or self.lines[row] != line:
+                parts.append(f"\033[{row + 1};1H{line}{CLEAR_LINE}")
+        for row in range(len(lines), len(self.lines)):
+            parts.append(f"\033[{row + 1};1H{CLEAR_LINE}")
+        self.lines = list(lines)
+        if parts:
+            self.out.write("".join(parts))
+            self.out.flush()
+        return len(parts)
+
+def run(dashboard, screen, interval=2, journal_interval=30):
+    """
+    Polls the record files every 'interval' seconds and the journal every
+    'journal_interval' seconds until SIGINT or SIGTERM.
+    """
+    stop = []
+
+    def request_stop(signum, frame):
+        stop.append(signum)
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGWINCH, lambda signum, frame: screen.invalidate())
+    screen.out.write(HIDE_CURSOR)
+    next_journal = 0
+    try:
+        while not stop:
+            now = time.time()
+            dashboard.poll_files()
+            if now >= next_journal:
+                dashboard.poll_journal()
+                next_journal = now + journal_interval
+            screen.draw(dashboard.render(now))
+            time.sleep(interval)
+    finally:
+        screen.out.write(f"\033[{len(screen.lines) + 1};1H{SHOW_CURSOR}\n")
+        screen.out.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Live dashboard of the quileye2 checks, coin reports and journal.")
+    parser.add_argument("minutes", nargs="?", type=int, default=180, help="Proof window in minutes (default: 180)")
+    parser.add_argument("--service", help="Node service (default: from /root/quileye_settings.txt)")
+    parser.add_argument("--interval", type=float, default=2, help="Seconds between file polls (default: 2)")
+    parser.add_argument("--journal-interval", type=float, default=30,
+                        help="Seconds between journal updates (default: 30)")
+    parser.add_argument("--thresholds", default=THRESHOLDS_FILE, help=f"Threshold file (default: {THRESHOLDS_FILE})")
+    parser.add_argument("--once", action="store_true", help="Print the dashboard once and exit")
+    args = parser.parse_args()
+
+    try:
+        service = args.service or read_service()
+    except (ValueError, EOFError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    dashboard = Dashboard(service, args.minutes, load_thresholds(args.thresholds))
+    dashboard.load()
+    if args.once:
+        dashboard.poll_journal()
+        print("\n".join(dashboard.render()))
+        return
+    run(dashboard, Screen(), max(0.2, args.interval), args.journal_interval)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+"""
+Shared reporting core: renders the quileye2 check (node line and threshold
+colored proof summary) and runs the whole blink_quileye.bash cycle in one
+interpreter. The thresholds come from thresholds.py.
+"""
+import argparse
+import os
+import sys
+import time
+
+from check_store import DB_FILE, LOG_FILE, POINTER_FILE, connect, read_pointers, store_check, write_pointers
+from journal_cursor import proof_window, update_aggregate
+from journal_reader import JournalError
+from proof_analyzer import format_summary
+from report_records import append_record
+from snapshot_cache import SnapshotError, get_snapshot
+from thresholds import THRESHOLDS_FILE, bounds, load_thresholds
+
+SETTINGS_FILE = "/root/quileye_settings.txt"
+
+# node-info label -> index of the value when the line is split on whitespace (as quileye2.bash's awk)
+NODE_INFO_FIELDS = [
+    ("Peer ID", 2),
+    ("Max Frame", 2),
+    ("Active Workers", 2),
+    ("Prover Ring", 2),
+    ("Seniority", 1),
+    ("Owned balance", 2),
+]
+
+def node_values(node_info):
+    values = {label: "" for label, _ in NODE_INFO_FIELDS}
+    for line in node_info.splitlines():
+        for label, index in NODE_INFO_FIELDS:
+            if label in line:
+                parts = line.split()
+                values[label] = parts[index] if len(parts) > index else ""
+    return values
+
+def read_node():
+    """
+    node-info values and the coin count (-1 if the coins are not available).
+    """
+    try:
+        coin_count = len(get_snapshot("coins").splitlines())
+    except SnapshotError:
+        coin_count = -1
+    try:
+        node_info = get_snapshot("node-info")
+    except SnapshotError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        node_info = ""
+    return node_values(node_info), coin_count
+
+def node_lines(values, coin_count, now):
+    """
+    The 'Peer ID ... - Date' and 'Max Frame ... QUIL' lines of a check.
+    """
+    date_text = time.strftime("%a %b %e %H:%M:%S %Z %Y", time.localtime(now))
+    return [
+        f"Peer ID: {values['Peer ID']} - Date: {date_text}",
+        f"Max Frame: {values['Max Frame']} - Active Workers: {values['Active Workers']} - "
+        f"Prover Ring: {values['Prover Ring']} - Seniority: {values['Seniority']} - Coins: {coin_count} - "
+        f"Owned balance: {values['Owned balance']} QUIL",
+    ]
+
+def proof_summary(service, minutes):
+    """
+    (summary, error): the proof_window summary, or the error text if the journal could not be read.
+    """
+    try:
+        summary, _ = proof_window(update_aggregate(service, minutes), minutes)
+    except JournalError as e:
+        return None, f"Error: {e}"
+    return summary, None
+
+def proof_line(summary, minutes, thresholds, color=True):
+    return format_summary(summary, minutes, color=color, creation_bounds=bounds(thresholds, "CREATION"),
+                          submission_bounds=bounds(thresholds, "SUBMISSION"), cpu_bounds=bounds(thresholds, "CPU"))
+
+def check_fields(values, coin_count, summary):
+    """
+    The values open_quileye.parse_check would read from the check text, taken directly.
+    """
+    fields = {}
+    for key, convert in (("Max Frame", int), ("Prover Ring", int), ("Seniority", int),
+                         ("Owned balance", lambda value: round(float(value), 3))):
+        try:
+            fields[key] = convert(values[key])
+        except ValueError:
+            pass
+    if coin_count >= 0:
+        fields["Coins"] = coin_count
+    if summary is not None:
+        proofs, creation, submission, cpu = summary
+        # Rounded like the printed line, so both sources give the same differences
+        fields["Proofs"] = proofs
+        fields["Creation"] = round(creation, 2)
+        fields["Submission"] = round(submission, 2)
+        fields["CPU-Processing"] = round(cpu, 2)
+    return fields
+
+def render_check(service, minutes=180, thresholds=None, now=None):
+    """
+    Returns (colored output, plain text, record) of one check. The record carries
+    the parsed fields, so readers need no text parsing.
+    """
+    thresholds = load_thresholds() if thresholds is None else thresholds
+    now = time.time() if now is None else now
+    values, coin_count = read_node()
+    summary, error = proof_summary(service, minutes)
+    lines = node_lines(values, coin_count, now)
+    output = "\n".join(lines + [error or proof_line(summary, minutes, thresholds)])
+    text = "\n".join(lines + [error or proof_line(summary, minutes, thresholds, color=False)])
+    try:
+        active_workers = int(values["Active Workers"])
+    except ValueError:
+        active_workers = None
+    record = {
+        "time": now,
+        "service": service,
+        "minutes": minutes,
+        "active_workers": active_workers,
+        "check": check_fields(values, coin_count, summary),
+    }
+    return output, text, record
+
+def check_output(service, minutes=180, thresholds=None):
+    """
+    The text quileye2.bash printed: the two node lines and the proof summary.
+    """
+    return render_check(service, minutes, thresholds)[0]
+
+def read_service(settings_path=SETTINGS_FILE):
+    """
+    The node service saved by quileye2; asks for it once when run interactively.
+    """
+    try:
+        with open(settings_path, 'r') as f:
+            service = f.read().strip()
+        if service:
+            return service
+    except FileNotFoundError:
+        pass
+    if not sys.stdin.isatty():
+        raise ValueError(f"No service name in {settings_path}")
+    service = input("Chose Your Service name! For example: ceremonyclient or para: ").strip()
+    with open(settings_path, 'w') as f:
+        f.write(f"{service}\n")
+    print(f"Service name saved to {settings_path}: {service}")
+    return service
+
+def blink(service, minutes=180, thresholds=None, log_path=LOG_FILE, pointer_path=POINTER_FILE, db_path=DB_FILE):
+    """
+    One automatic check: renders it, appends it to quileye2.log under the next
+    Check-Nr and its record to quileye2.jsonl, stores it for open_quileye.py and
+    advances LastAutoCheck.
+    """
+    last_user_check, last_auto_check = read_pointers(pointer_path, log_path)
+    check_nr = (last_auto_check or 0) + 1
+    output, text, record = render_check(service, minutes, thresholds)
+    with open(log_path, 'a') as f:
+        f.write(f"\nCheck-Nr {check_nr}:\n{output}\n")
+    record = dict(record, check_nr=check_nr, text=f"Check-Nr {check_nr}:\n{text}\n")
+    append_record(log_path, record)
+    conn = connect(db_path)
+    try:
+        store_check(conn, check_nr, record["check"], record["text"])
+    finally:
+        conn.close()
+    write_pointers(last_user_check if last_user_check is not None else 1, check_nr, pointer_path)
+    return check_nr
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the quileye2 check and run the blink cycle.")
+    parser.add_argument("command", choices=["check", "blink"],
+                        help="check: print the check (quileye2.bash); blink: append and store a new check")
+    parser.add_argument("minutes", nargs="?", type=int, default=180, help="Proof window in minutes (default: 180)")
+    parser.add_argument("--service", help=f"Node service (default: from {SETTINGS_FILE})")
+    parser.add_argument("--thresholds", default=THRESHOLDS_FILE, help=f"Threshold file (default: {THRESHOLDS_FILE})")
+    args = parser.parse_args()
+
+    try:
+        service = args.service or read_service()
+    except (ValueError, EOFError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    thresholds = load_thresholds(args.thresholds)
+    if args.command == "check":
+        print(check_output(service, args.minutes, thresholds))
+        return
+
+    if not os.path.exists(LOG_FILE):
+        print(f"Log file not found. Creating {LOG_FILE}...")
+    check_nr = blink(service, args.minutes, thresholds=thresholds)
+    print(f"Log updated: Check-Nr {check_nr} added to {LOG_FILE}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/python3
+"""
+Downloads the node and qclient release files concurrently. Partial downloads
+are resumed with Range requests, binaries are checked against their .dgst
+(SHA3-256) while streaming and only renamed into place when complete.
+
+One node can keep a mirror of the release and serve it to the cluster:
+  release_fetcher.py fetch --mirror /root/release_mirror
+  release_fetcher.py serve --mirror /root/release_mirror --port 8337
+The other nodes then fetch with --base-url http://MASTER:8337 --base-url https://releases.quilibrium.com
+"""
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import sys
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+BASE_URL = "https://releases.quilibrium.com"
+DEST_DIR = "/root/ceremonyclient/node"
+MIRROR_DIR = "/root/release_mirror"
+LISTS = ("release", "qclient-release")
+CHUNK_SIZE = 256 * 1024
+DIGEST_PATTERN = re.compile(r"\b([0-9a-fA-F]{64})\b")
+
+class FetchError(Exception):
+    """
+    Raised when a file cannot be downloaded or does not match its digest.
+    """
+
+def release_pattern(os_arch):
+    return re.compile(rf"(?:node|qclient)-\d+\.\d+\.\d+(?:\.\d+)?-{re.escape(os_arch)}(?:\.dgst)?(?:\.sig\.\d+)?")
+
+def is_binary(name):
+    return not re.search(r"\.(dgst|sig\.\d+)$", name)
+
+def fetch_list(base_urls, list_name, os_arch, timeout=30):
+    """
+    Returns (base_url, file names) of a release list from the first base URL that answers.
+    """
+    errors = []
+    for base_url in base_urls:
+        try:
+            with urllib.request.urlopen(f"{base_url}/{list_name}", timeout=timeout) as response:
+                text = response.read().decode(errors='replace')
+        except (OSError, urllib.error.URLError) as e:
+            errors.append(f"{base_url}: {e}")
+            continue
+        names = []
+        for name in release_pattern(os_arch).findall(text):
+            if name not in names:
+                names.append(name)
+        return base_url, names
+    raise FetchError(f"Cannot read the {list_name} list ({'; '.join(errors)})")
+
+def expected_digest(dest_dir, name):
+    """
+    SHA3-256 from the binary's .dgst file, or None if there is none.
+    """
+    try:
+        with open(os.path.join(dest_dir, f"{name}.dgst"), 'r') as f:
+            match = DIGEST_PATTERN.search(f.read())
+    except OSError:
+        return None
+    return match.group(1).lower() if match else None
+
+def download(base_urls, name, dest_dir, digest=None, timeout=30):
+    """
+    Downloads one file into dest_dir. Data goes to '.name.part' first; an existing
+    part is resumed with a Range request and hashed before the new data is appended.
+    """
+    path = os.path.join(dest_dir, name)
+    part_path = os.path.join(dest_dir, f".{name}.part")
+    errors = []
+    for base_url in base_urls:
+        hasher = hashlib.sha3_256()
+        offset = 0
+        if os.path.exists(part_path):
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+                    offset += len(chunk)
+        request = urllib.request.Request(f"{base_url}/{name}")
+        if offset:
+            request.add_header("Range", f"bytes={offset}-")
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                if offset and response.status != 206:
+                    # The server ignored the Range header: start over
+                    hasher = hashlib.sha3_256()
+                    offset = 0
+                with open(part_path, 'ab' if offset else 'wb') as f:
+                    for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                        hasher.update(chunk)
+                        f.write(chunk)
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset:
+                # Requested range not satisfiable: the part is already complete
+                pass
+            else:
+                errors.append(f"{base_url}: {e}")
+                continue
+        except (OSError, urllib.error.URLError) as e:
+            errors.append(f"{base_url}: {e}")
+            continue
+
+        if digest and hasher.hexdigest() != digest:
+            os.remove(part_path)
+            raise FetchError(f"{name}: SHA3-256 mismatch (expected {digest}, got {hasher.hexdigest()})")
+        if is_binary(name):
+            os.chmod(part_path, 0o755)
+        os.replace(part_path, path)
+        return path
+    raise FetchError(f"{name}: download failed ({'; '.join(errors)})")
+
+def mirror_file(path, mirror_dir):
+    """
+    Puts a downloaded file into the mirror (hard link, copy across file systems).
+    """
+    target = os.path.join(mirror_dir, os.path.basename(path))
+    if os.path.exists(target):
+        return
+    tmp_path = f"{target}.tmp"
+    try:
+        os.link(path, tmp_path)
+    except OSError:
+        shutil.copy2(path, tmp_path)
+    os.replace(tmp_path, target)
+
+def write_mirror_list(mirror_dir, list_name, names):
+    tmp_path = os.path.join(mirror_dir, f"{list_name}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write("\n".join(names) + "\n")
+    os.replace(tmp_path, os.path.join(mirror_dir, list_name))
+
+def fetch_release(base_urls, dest_dir=DEST_DIR, lists=LISTS, os_arch="linux-amd64",
+                  concurrency=4, mirror_dir=None, timeout=30):
+    """
+    Downloads every missing file of the release lists. Digest and signature files
+    come first so the binaries can be verified while they stream in; a binary
+    without a digest is refused (counted as failed and left out of the mirror).
+    Returns (downloaded, up_to_date, failed) name lists.
+    """
+    downloaded, up_to_date, failed = [], [], []
+    if mirror_dir:
+        os.makedirs(mirror_dir, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for list_name in lists:
+            list_url, names = fetch_list(base_urls, list_name, os_arch, timeout)
+            # Files are fetched from the URL that answered the list first, then the others
+            urls = [list_url] + [url for url in base_urls if url != list_url]
+            missing = [name for name in names if not os.path.exists(os.path.join(dest_dir, name))]
+            up_to_date += [name for name in names if name not in missing]
+
+            for group in ([n for n in missing if not is_binary(n)], [n for n in missing if is_binary(n)]):
+                futures = {}
+                for name in group:
+                    digest = expected_digest(dest_dir, name) if is_binary(name) else None
+                    if is_binary(name) and digest is None:
+                        # Without its .dgst the binary cannot be verified, so it is not fetched or mirrored
+                        print(f"Error: {name}: no SHA3-256 digest (.dgst missing or unreadable)", file=sys.stderr)
+                        failed.append(name)
+                        continue
+                    futures[executor.submit(download, urls, name, dest_dir, digest, timeout)] = name
+                for future, name in futures.items():
+                    try:
+                        future.result()
+                        downloaded.append(name)
+                    except FetchError as e:
+                        print(f"Error: {e}", file=sys.stderr)
+                        failed.append(name)
+
+            if mirror_dir:
+                for name in names:
+                    if name not in failed:
+                        mirror_file(os.path.join(dest_dir, name), mirror_dir)
+                write_mirror_list(mirror_dir, list_name, [name for name in names if name not in failed])
+    return downloaded, up_to_date, failed
+
+class MirrorHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the mirror directory with support for 'Range: bytes=N-' requests.
+    """
+    def do_GET(self):
+        name = os.path.basename(self.path.split("?", 1)[0])
+        path = os.path.join(self.directory, name)
+        if not name or name.startswith(".") or not os.path.isfile(path):
+            self.send_error(404)
+            return
+        size = os.path.getsize(path)
+        start = 0
+        match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            if start >= size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size - start))
+        self.end_headers()
+        with open(path, 'rb') as f:
+            f.seek(start)
+            shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(mirror_dir=MIRROR_DIR, host="0.0.0.0", port=8337):
+    handler = lambda *args, **kwargs: MirrorHandler(*args, directory=mirror_dir, **kwargs)
+    with ThreadingHTTPServer((host, port), handler) as server:
+        print(f"Serving {mirror_dir} on {host}:{port}")
+        server.serve_forever()
+
+def default_os_arch():
+    machine = os.uname().machine
+    arch = "arm64" if machine in ("aarch64", "arm64") else "amd64"
+    return f"{os.uname().sysname.lower()}-{arch}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent, resumable and verified release downloads.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    fetch_parser = subparsers.add_parser("fetch", help="Download the missing release files")
+    fetch_parser.add_argument("--base-url", action="append",
+                              help=f"Release server, repeat for fallbacks (default: {BASE_URL})")
+    fetch_parser.add_argument("--dest", default=DEST_DIR, help=f"Target directory (default: {DEST_DIR})")
+    fetch_parser.add_argument("--list", action="append", choices=LISTS, help="Release list(s) (default: both)")
+    fetch_parser.add_argument("--os-arch", default=default_os_arch(), help="For example linux-amd64")
+    fetch_parser.add_argument("--concurrency", type=int, default=4, help="Parallel downloads (default: 4)")
+    fetch_parser.add_argument("--timeout", type=float, default=30, help="Seconds without data before giving up (default: 30)")
+    fetch_parser.add_argument("--mirror", help="Also keep the files in this mirror directory")
+    serve_parser = subparsers.add_parser("serve", help="Serve a mirror directory to the cluster")
+    serve_parser.add_argument("--mirror", default=MIRROR_DIR, help=f"Mirror directory (default: {MIRROR_DIR})")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=8337)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.mirror, args.host, args.port)
+        return
+
+    base_urls = [url.rstrip("/") for url in args.base_url or [BASE_URL]]
+    try:
+        downloaded, up_to_date, failed = fetch_release(base_urls, args.dest, args.list or LISTS, args.os_arch,
+                                                       args.concurrency, args.mirror, args.timeout)
+    except FetchError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    for name in up_to_date:
+        print(f"{name} is already up-to-date.")
+    for name in downloaded:
+        print(f"Downloaded and updated {name}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""
+JSON Lines records written next to the human readable logs: coin_aggregator.py
+appends one per coin report (coinreport.log -> coinreport.jsonl), quil_report.py
+one per check (quileye2.log -> quileye2.jsonl). Readers take the values from
+the records instead of parsing the colored log text.
+"""
+import json
+import os
+import re
+
+CHUNK_SIZE = 64 * 1024
+
+# Color and style codes the reports and checks are written with
+ANSI_ESCAPE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
+
+def records_path_for(log_path):
+    return os.path.splitext(log_path)[0] + ".jsonl"
+
+def append_record(log_path, record):
+    """
+    Appends one record as a single line (one write, so readers never see half a record).
+    """
+    with open(records_path_for(log_path), 'a') as f:
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+def iter_lines_reverse(f, end=None):
+    """
+    Yields (offset, line) for the lines of a binary file, newest first, reading
+    CHUNK_SIZE blocks backward from 'end' (default: EOF). Lines are bytes without
+    their newline.
+    """
+    position = f.seek(0, os.SEEK_END) if end is None else end
+    rest = b""
+    while position > 0:
+        size = min(CHUNK_SIZE, position)
+        position -= size
+        f.seek(position)
+        data = f.read(size) + rest
+        parts = data.split(b"\n")
+        rest = parts[0]
+        line_end = position + len(data)
+        for part in reversed(parts[1:]):
+            line_end -= len(part)
+            yield line_end, part
+            line_end -= 1
+    if rest:
+        yield 0, rest
+
+def iter_records_reverse(log_path, markers=None):
+    """
+    Yields the records newest first, reading the file backward from EOF. When
+    'markers' (bytes) is given, lines that contain none of them are not decoded.
+    Lines that are not valid JSON (e.g. cut by a full disk) are skipped.
+    """
+    try:
+        f = open(records_path_for(log_path), 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        for _, line in iter_lines_reverse(f):
+            if markers and not any(marker in line for marker in markers):
+                continue
+            record = decode_record(line)
+            if record is not None:
+                yield record
+
+def first_record(log_path):
+    """
+    The oldest record, or None.
+    """
+    try:
+        with open(records_path_for(log_path), 'rb') as f:
+            for line in f:
+                record = decode_record(line)
+                if record is not None:
+                    return record
+    except FileNotFoundError:
+        pass
+    return None
+
+def decode_record(line):
+    if not line.strip():
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
@@ -0,0 +1,283 @@
+#!/usr/bin/python3
+"""
+Updates the cluster in waves instead of letting every node's autoupdate cron
+job restart at the same time. The MASTER (start core 0) goes first, then the
+SLAVE nodes in batches. Every node runs 'rolling_update.py agent VERSION',
+which downloads the release, switches the service to the new version, waits
+until every core reports "data worker listening" and switches back on failure.
+The rollout stops at the first wave with a failed node. The agent first removes
+the node's autoupdate_*.bash crontab lines, which would otherwise still update
+and restart every node at the same time.
+"""
+import argparse
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import time
+
+from core_planner import core_range
+from fleet_collector import HOSTS_FILE, NODE_NR_FILE, collect_fleet, read_hosts, read_nodes
+from journal_reader import JournalError, extract_fields, iter_journal_records, message_text
+from release_fetcher import BASE_URL, default_os_arch
+from snapshot_cache import NODE_DIR, SERVICE_DIR, VERSION_PATTERN
+
+MIRROR_URL_FILE = "/root/release_mirror_url.txt"
+LISTENING_MARKER = "data worker listening"
+PANIC_MARKER = "panic:"
+AUTOUPDATE_CRON_PATTERN = re.compile(r"/root/autoupdate_\S*\.bash")
+
+# {host} is filled in per node, {version} with the target version
+AGENT_COMMAND = "ssh -o BatchMode=yes -o ConnectTimeout=5 {host} python3 /root/rolling_update.py agent {version}"
+
+def service_file(service):
+    return os.path.join(SERVICE_DIR, f"{service}.service")
+
+def read_exec_start(service):
+    with open(service_file(service), 'r') as f:
+        for line in f:
+            if line.startswith("ExecStart="):
+                return line.rstrip("\n")[len("ExecStart="):]
+    raise ValueError(f"No ExecStart line in {service_file(service)}")
+
+def current_version(exec_start):
+    versions = VERSION_PATTERN.findall(exec_start)
+    return versions[-1] if versions else None
+
+def set_version(service, version):
+    """
+    Replaces the last version in the ExecStart line (para.sh's last argument or
+    the node binary path) and reloads systemd. Returns the previous version.
+    """
+    path = service_file(service)
+    with open(path, 'r') as f:
+        lines = f.readlines()
+    previous = None
+    for i, line in enumerate(lines):
+        if line.startswith("ExecStart="):
+            matches = list(VERSION_PATTERN.finditer(line))
+            if not matches:
+                raise ValueError(f"No version in the ExecStart line of {path}")
+            last = matches[-1]
+            previous = last.group(0)
+            lines[i] = line[:last.start()] + version + line[last.end():]
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.writelines(lines)
+    os.replace(tmp_path, path)
+    subprocess.run(["systemctl", "daemon-reload"], check=True)
+    return previous
+
+def expected_workers(exec_start):
+    """
+    Number of data workers para.sh starts ('... OS ARCH START MAX VERSION').
+    Returns 1 for a plain node service, where only some worker is required.
+    """
+    args = exec_start.split()
+    if len(args) >= 5 and args[-3].isdigit() and args[-2].isdigit():
+        first, last = core_range(int(args[-3]), int(args[-2]))
+        return last - first + 1
+    return 1
+
+def wait_healthy(service, started, workers, timeout, poll_interval=5):
+    """
+    Polls the journal until 'workers' distinct cores logged "data worker listening"
+    after 'started'. Returns (healthy, cores seen, reason).
+    """
+    deadline = time.time() + timeout
+    cores = set()
+    while True:
+        since_minutes = math.ceil((time.time() - started) / 60) + 1
+        listening = 0
+        try:
+            records = list(iter_journal_records(service, markers=[LISTENING_MARKER, PANIC_MARKER],
+                                                since_minutes=since_minutes))
+        except JournalError as e:
+            return False, len(cores), str(e)
+        for record in records:
+            if int(record.get("__REALTIME_TIMESTAMP", 0)) / 1000000 < started:
+                continue
+            message = message_text(record)
+            if PANIC_MARKER in message.lower():
+                return False, len(cores), message.strip()[:200]
+            if LISTENING_MARKER in message.lower():
+                listening += 1
+                core = extract_fields(message).get("core")
+                if core is not None:
+                    cores.add(core)
+        seen = len(cores) if cores else listening
+        if seen >= workers:
+            return True, seen, ""
+        if time.time() >= deadline:
+            return False, seen, f"only {seen}/{workers} cores listening after {timeout}s"
+        time.sleep(poll_interval)
+
+def fetch_command():
+    """
+    release_fetcher.py call, through the cluster's mirror first if one is configured.
+    """
+    command = [sys.executable, "/root/release_fetcher.py", "fetch", "--list", "release"]
+    try:
+        with open(MIRROR_URL_FILE, 'r') as f:
+            mirror_url = f.read().strip()
+    except OSError:
+        mirror_url = ""
+    if mirror_url:
+        command += ["--base-url", mirror_url, "--base-url", BASE_URL]
+    return command
+
+def remove_autoupdate_cron():
+    """
+    Removes the autoupdate_*.bash lines from root's crontab. Returns the removed lines.
+    """
+    try:
+        listed = subprocess.run(["crontab", "-l"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                universal_newlines=True)
+    except OSError:
+        return []
+    if listed.returncode != 0:
+        # No crontab at all
+        return []
+    lines = listed.stdout.splitlines()
+    removed = [line for line in lines if AUTOUPDATE_CRON_PATTERN.search(line)]
+    if removed:
+        kept = "".join(f"{line}\n" for line in lines if not AUTOUPDATE_CRON_PATTERN.search(line))
+        subprocess.run(["crontab", "-"], input=kept, universal_newlines=True, check=True)
+    return removed
+
+def restart(service):
+    subprocess.run(["service", service, "restart"], check=True)
+
+def run_agent(version, service="para", timeout=600, fetch=True):
+    """
+    One node's update step. The result goes to the orchestrator as JSON; its
+    'update' field is ok, current, rolled back, rollback unhealthy or download failed.
+    """
+    result = {"version": version, "service": service}
+    removed = remove_autoupdate_cron()
+    if removed:
+        result["cron_removed"] = len(removed)
+    exec_start = read_exec_start(service)
+    result["previous"] = current_version(exec_start)
+    workers = expected_workers(exec_start)
+    result["expected"] = workers
+    if result["previous"] == version:
+        result["update"] = "current"
+        return result
+
+    if fetch:
+        fetcher = subprocess.run(fetch_command(), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                 universal_newlines=True)
+        if fetcher.returncode != 0:
+            result["update"] = "download failed"
+            result["reason"] = fetcher.stdout.strip()[-300:]
+            return result
+
+    # The release list may hold another version than the target (older or mistyped):
+    # never switch the service to a binary that is not there
+    binary = os.path.join(NODE_DIR, f"node-{version}-{default_os_arch()}")
+    if not os.access(binary, os.X_OK):
+        result["update"] = "download failed"
+        result["reason"] = f"{binary} not found after the download"
+        return result
+
+    set_version(service, version)
+    started = time.time()
+    restart(service)
+    healthy, seen, reason = wait_healthy(service, started, workers, timeout)
+    result["cores"] = seen
+    if healthy:
+        result["update"] = "ok"
+        return result
+
+    result["reason"] = reason
+    set_version(service, result["previous"])
+    started = time.time()
+    restart(service)
+    back, seen, _ = wait_healthy(service, started, workers, timeout)
+    result["update"] = "rolled back" if back else "rollback unhealthy"
+    return result
+
+def plan_waves(nodes, wave_size):
+    """
+    MASTER nodes (start core 0) form the first wave, the others follow in batches.
+    """
+    masters = [node for node in nodes if node["start_core"] == 0]
+    slaves = [node for node in nodes if node["start_core"] != 0]
+    waves = [masters] if masters else []
+    waves += [slaves[i:i + wave_size] for i in range(0, len(slaves), wave_size)]
+    return waves
+
+def run_rollout(nodes, hosts, version, wave_size=4, command=AGENT_COMMAND, timeout=900, dry_run=False):
+    """
+    Runs the agent wave by wave and stops after a wave in which a node failed.
+    Returns True if every node ended on the new version.
+    """
+    command = command.replace("{version}", version)
+    waves = plan_waves(nodes, wave_size)
+    for number, wave in enumerate(waves, 1):
+        names = ", ".join(str(node["node"]) for node in wave)
+        print(f"Wave {number}/{len(waves)}: nodes {names}", flush=True)
+        if dry_run:
+            continue
+        entries = collect_fleet(wave, hosts, command, concurrency=len(wave), timeout=timeout)
+        failed = []
+        for entry in entries:
+            # 'status' is the fleet collector's (ok, timeout, exit N ...), 'update' the agent's
+            status = entry.get("update", "no result") if entry["status"] == "ok" else entry["status"]
+            reason = entry.get("reason") or entry.get("error")
+            detail = f" ({reason})" if reason else ""
+            cores = f", {entry['cores']}/{entry['expected']} cores" if "cores" in entry else ""
+            print(f"  Node {entry['node']}: {status}{cores}{detail}", flush=True)
+            if status not in ("ok", "current"):
+                failed.append(entry["node"])
+        if failed:
+            print(f"Stopping the rollout: node(s) {', '.join(map(str, failed))} failed in wave {number}. "
+                  f"Remaining waves were not touched.")
+            return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Staged cluster update with health checks and rollback.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Update the cluster in waves")
+    run_parser.add_argument("version", help="Target version, for example 2.0.3.4")
+    run_parser.add_argument("--wave-size", type=int, default=4, help="SLAVE nodes per wave (default: 4)")
+    run_parser.add_argument("--nodes", default=NODE_NR_FILE, help=f"Cluster table (default: {NODE_NR_FILE})")
+    run_parser.add_argument("--hosts", default=HOSTS_FILE, help=f"'NODE_NR HOST' lines (default: {HOSTS_FILE})")
+    run_parser.add_argument("--cluster", help="Only update this cluster letter")
+    run_parser.add_argument("--command", default=AGENT_COMMAND,
+                            help="Agent command, {host} and {version} are replaced (default: ssh ... agent)")
+    run_parser.add_argument("--timeout", type=float, default=1500, help="Seconds per node and wave (default: 1500)")
+    run_parser.add_argument("--dry-run", action="store_true", help="Only print the waves")
+    agent_parser = subparsers.add_parser("agent", help="Update this node (run by the orchestrator)")
+    agent_parser.add_argument("version")
+    agent_parser.add_argument("--service", default="para", help="Service to switch (default: para)")
+    agent_parser.add_argument("--health-timeout", type=float, default=600,
+                              help="Seconds to wait for every core to listen (default: 600)")
+    agent_parser.add_argument("--no-fetch", action="store_true", help="Binaries are already in place")
+    args = parser.parse_args()
+
+    if args.command == "agent":
+        try:
+            result = run_agent(args.version, args.service, args.health_timeout, not args.no_fetch)
+        except (OSError, ValueError, subprocess.CalledProcessError) as e:
+            result = {"version": args.version, "update": "error", "reason": str(e)}
+        print(json.dumps(result))
+        return
+
+    try:
+        nodes = read_nodes(args.nodes)
+        hosts = read_hosts(args.hosts)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if args.cluster:
+        nodes = [node for node in nodes if node["cluster"] == args.cluster]
+    if not run_rollout(nodes, hosts, args.version, args.wave_size, args.command, args.timeout, args.dry_run):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,14 @@
+# With --supervisor the service runs para_supervisor.py, which restarts only the core
+# that exited, instead of para.sh (same arguments; status: para_supervisor.py status)
+EXEC_START="/bin/bash /root/ceremonyclient/node/para.sh linux amd64 0 1 1.4.21.1"
+if [ "$1" == "--supervisor" ]; then
+    if [ ! -f /root/para_supervisor.py ]; then
+        sudo curl -sf -o /root/para_supervisor.py https://raw.githubusercontent.com/qrux-opterator/sqripts/refs/heads/main/para_supervisor.py \
+            || { echo "Failed to download para_supervisor.py"; exit 1; }
+    fi
+    EXEC_START="/usr/bin/python3 /root/para_supervisor.py run linux amd64 0 1 1.4.21.1"
+fi
+
 sudo mkdir -p /root/ceremonyclient/node && sudo bash -c 'cat > /root/ceremonyclient/node/para.sh <<EOF
 #!/bin/bash
 DIR_PATH=\$( cd "\$(dirname "\${BASH_SOURCE[0]}")" ; pwd -P )
@@ -56,7 +67,7 @@ After=network.target
 
 [Service]
 # Set Your beginning core (0) and Workers You run (1)
-ExecStart=/bin/bash /root/ceremonyclient/node/para.sh linux amd64 0 1 1.4.21.1
+ExecStart=$EXEC_START
 Restart=always
 User=root
 Group=root
@@ -66,5 +77,5 @@ StandardError=syslog
 SyslogIdentifier=para
 
 [Install]
-WantedBy=multi-user.target" | sudo tee /etc/systemd/system/para.service && sudo systemctl daemon-reload && sudo systemctl enable para.service && echo -e "\e[32mDefault para.sh with Service file is ready!\e[0m"
+WantedBy=multi-user.target" | sudo tee /etc/systemd/system/para.service && sudo systemctl daemon-reload && sudo systemctl enable para.service && echo -e "\e[32mpara.service ($EXEC_START) is ready!\e[0m"
 
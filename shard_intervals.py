@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+import argparse
+import sys
+import time
+
+from journal_cursor import DEFAULT_RETENTION_MINUTES, shard_entries, update_aggregate
+from journal_reader import JournalError
+
+OUTPUT_LOG = "/root/quileye.log"
+
+GREEN = "\033[0;32m"
+YELLOW = "\033[1;33m"
+BLUE = "\033[0;34m"
+RED = "\033[0;31m"
+NC = "\033[0m"
+
+def format_time(seconds):
+    """
+    Formats seconds like quileye.bash did: '42s' or '3m 5s'.
+    """
+    seconds = int(f"{seconds:.0f}")
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds}s"
+
+def shard_line(entry):
+    """
+    Formats one shard entry without its gap.
+    """
+    realtime, frame_number, frame_age, ring, active_workers, ts = entry
+    date_part = time.strftime("%b %d %H:%M:%S", time.localtime(realtime))
+    return (f"{date_part} - {GREEN}FrameNr:{NC} {YELLOW}{frame_number}{NC} - "
+            f"{GREEN}FrameAge:{NC} {YELLOW}{float(frame_age):.2f}{NC} - "
+            f"{GREEN}Ring:{NC} {YELLOW}{ring}{NC} - {GREEN}Active_workers:{NC} {YELLOW}{active_workers}{NC}")
+
+def gap_statistics(gaps):
+    """
+    Returns (low, high, average, median) of the gaps from a single sort.
+    """
+    ordered = sorted(gaps)
+    count = len(ordered)
+    if count % 2:
+        median = ordered[count // 2]
+    else:
+        median = (ordered[count // 2 - 1] + ordered[count // 2]) / 2
+    return ordered[0], ordered[-1], sum(ordered) / count, median
+
+def interval_lines(entries, now=None):
+    """
+    Builds the quileye.log lines for the shard entries (chronological order).
+    The first entry is only used as the reference for the first gap.
+    """
+    now = time.time() if now is None else now
+    lines = ["Processing Shard Logs...", "", ""]
+
+    if len(entries) < 2:
+        return lines + [
+            "Not enough log entries to calculate time gaps.",
+            "",
+            "##   Shard Interval   ##",
+            f"{GREEN}Last Interval:{NC} N/A",
+            f"{GREEN}Low:{NC} N/A",
+            f"{GREEN}High:{NC} N/A",
+            f"{GREEN}Avg:{NC} N/A",
+            f"{GREEN}Median:{NC} N/A",
+        ]
+
+    gaps = []
+    for previous, entry in zip(entries, entries[1:]):
+        # The gaps are rounded to two decimals like the gaps file of the bash version
+        gap = round(abs(float(entry[5]) - float(previous[5])), 2)
+        gaps.append(gap)
+        lines.append(f"{shard_line(entry)} - {RED}Gap:{NC} {BLUE}{format_time(gap)}{NC}")
+
+    interval = int(now) - int(f"{float(entries[-1][5]):.0f}")
+    interval_display = f"{format_time(interval)} ago"
+    low, high, avg, median = gap_statistics(gaps)
+    lines += [
+        "",
+        "##   Shard Interval   ##",
+        f"{GREEN}Last Interval:{NC} {BLUE}{interval_display}{NC}",
+        f"{GREEN}Low:{NC} {YELLOW}{format_time(low)}{NC}",
+        f"{GREEN}High:{NC} {YELLOW}{format_time(high)}{NC}",
+        f"{GREEN}Avg:{NC} {YELLOW}{format_time(round(avg, 2))}{NC}",
+        f"{GREEN}Median:{NC} {YELLOW}{format_time(round(median, 2))}{NC}",
+    ]
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Shard interval statistics from the node journal.")
+    parser.add_argument("service", help="Service name, for example ceremonyclient or para")
+    parser.add_argument("count", nargs="?", type=int, default=50, help="Number of shard entries to display (default: 50)")
+    parser.add_argument("--output", default=OUTPUT_LOG, help=f"Output file, '-' for stdout (default: {OUTPUT_LOG})")
+    parser.add_argument("--input", help="Read journalctl -o json output from a file ('-' for stdin)")
+    args = parser.parse_args()
+
+    try:
+        state = update_aggregate(args.service, DEFAULT_RETENTION_MINUTES, source=args.input)
+    except JournalError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    # One extra entry serves as the reference for the first gap
+    text = "\n".join(interval_lines(shard_entries(state, args.count + 1))) + "\n"
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+if __name__ == "__main__":
+    main()
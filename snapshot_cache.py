@@ -0,0 +1,186 @@
+#!/usr/bin/python3
+import argparse
+import fcntl
+import glob
+import hashlib
+import os
+import re
+import subprocess
+import sys
+import time
+
+NODE_DIR = "/root/ceremonyclient/node"
+CLIENT_DIR = "/root/ceremonyclient/client"
+CONFIG_PATH = "/root/ceremonyclient/node/.config"
+CACHE_DIR = "/root/.quileye_cache"
+SETTINGS_FILE = "/root/quileye_settings.txt"
+SERVICE_DIR = "/etc/systemd/system"
+SERVICES = ("para", "ceremonyclient")
+VERSION_PATTERN = re.compile(r"\d+\.\d+\.\d+(?:\.\d+)?")
+
+# Seconds a snapshot stays valid per data type
+DEFAULT_TTLS = {
+    "node-info": 120,
+    "coins": 600,
+    "coin-metadata": 600,
+}
+
+class SnapshotError(Exception):
+    """
+    Raised when a snapshot cannot be produced (missing binary, failed command).
+    """
+
+def _version_key(path):
+    return tuple(int(part) for part in re.findall(r"\d+", os.path.basename(path).split("-")[1]))
+
+def service_version(settings_path=SETTINGS_FILE, service_dir=SERVICE_DIR):
+    """
+    Node version in the ExecStart line of the node service (para.sh's last argument
+    or the binary path), trying the service saved in quileye_settings.txt first,
+    then para and ceremonyclient. None if no service file names a version.
+    """
+    services = list(SERVICES)
+    try:
+        with open(settings_path, 'r') as f:
+            saved = f.read().strip()
+        if saved:
+            services.insert(0, saved)
+    except OSError:
+        pass
+    for service in services:
+        try:
+            with open(os.path.join(service_dir, f"{service}.service"), 'r') as f:
+                for line in f:
+                    if line.startswith("ExecStart="):
+                        versions = VERSION_PATTERN.findall(line)
+                        if versions:
+                            return versions[-1]
+        except OSError:
+            continue
+    return None
+
+def find_binary(prefix, directories, os_arch="linux-amd64", version=None):
+    """
+    Returns the '<prefix>-<version>-<os>-<arch>' binary of the given version (the
+    one the service runs), so a release that was downloaded but not switched to is
+    not queried. Without a version, or if that binary is missing, the newest one
+    in the directories is taken.
+    """
+    if version:
+        for directory in directories:
+            path = os.path.join(directory, f"{prefix}-{version}-{os_arch}")
+            if os.access(path, os.X_OK):
+                return path
+    candidates = []
+    for directory in directories:
+        for path in glob.glob(os.path.join(directory, f"{prefix}-*-{os_arch}")):
+            if re.fullmatch(rf"{prefix}-\d+(\.\d+)*-{os_arch}", os.path.basename(path)) and os.access(path, os.X_OK):
+                candidates.append(path)
+    if not candidates:
+        raise SnapshotError(f"No {prefix} binary found in {', '.join(directories)}")
+    return max(candidates, key=_version_key)
+
+def snapshot_command(kind, config_path=CONFIG_PATH):
+    """
+    Returns (command, working directory) for a data type.
+    """
+    if kind == "node-info":
+        return [find_binary("node", [NODE_DIR], version=service_version()), "--node-info"], NODE_DIR
+    # The qclient is not run by the service, so the newest one is used
+    qclient = find_binary("qclient", [CLIENT_DIR, NODE_DIR])
+    if kind == "coins":
+        return [qclient, "token", "coins", "--public-rpc", "--config", config_path], NODE_DIR
+    if kind == "coin-metadata":
+        return [qclient, "token", "coins", "metadata", "--public-rpc", "--config", config_path], NODE_DIR
+    raise SnapshotError(f"Unknown snapshot type: {kind}")
+
+def cache_path(kind, command, config_path, cache_dir=CACHE_DIR):
+    """
+    Cache file for a data type, keyed by config path and binary (path, size, mtime).
+    """
+    binary_stat = os.stat(command[0])
+    key = f"{kind}|{config_path}|{command[0]}|{binary_stat.st_size}|{binary_stat.st_mtime_ns}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{kind}-{os.path.basename(command[0])}-{digest}.txt")
+
+def _is_fresh(path, ttl):
+    try:
+        return time.time() - os.path.getmtime(path) < ttl
+    except FileNotFoundError:
+        return False
+
+def get_snapshot(kind, ttl=None, config_path=CONFIG_PATH, cache_dir=CACHE_DIR):
+    """
+    Returns the output of the data type's command, running it at most once per TTL.
+    Concurrent callers wait for the running fetch instead of starting their own.
+    If the command fails, an older snapshot is returned when there is one.
+    """
+    ttl = DEFAULT_TTLS.get(kind, 300) if ttl is None else ttl
+    command, cwd = snapshot_command(kind, config_path)
+    path = cache_path(kind, command, config_path, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    with open(f"{path}.lock", 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        if not _is_fresh(path, ttl):
+            try:
+                result = subprocess.run(command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                        universal_newlines=True, check=True)
+            except (OSError, subprocess.CalledProcessError) as e:
+                if not os.path.exists(path):
+                    raise SnapshotError(f"{os.path.basename(command[0])} failed: {e}")
+                print(f"Warning: {kind} refresh failed, using the older snapshot ({e})", file=sys.stderr)
+            else:
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w') as f:
+                    f.write(result.stdout)
+                os.replace(tmp_path, path)
+        with open(path, 'r') as f:
+            return f.read()
+
+def invalidate(kind=None, cache_dir=CACHE_DIR):
+    """
+    Removes the snapshots of one data type, or all of them (e.g. after a node update).
+    """
+    removed = 0
+    pattern = f"{kind}-*.txt" if kind else "*.txt"
+    for path in glob.glob(os.path.join(cache_dir, pattern)):
+        os.remove(path)
+        removed += 1
+    return removed
+
+def node_info_value(node_info, label):
+    """
+    Returns the value after 'label:' in the node-info output, or None.
+    """
+    match = re.search(rf"^{re.escape(label)}:\s*(.+)$", node_info, re.MULTILINE)
+    return match.group(1).strip() if match else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared TTL cache for node-info and qclient output.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    get_parser = subparsers.add_parser("get", help="Print a snapshot, refreshing it when expired")
+    get_parser.add_argument("kind", choices=sorted(DEFAULT_TTLS))
+    get_parser.add_argument("--ttl", type=int, help="Maximum age in seconds")
+    get_parser.add_argument("--config", default=CONFIG_PATH, help=f"Node config path (default: {CONFIG_PATH})")
+    get_parser.add_argument("--count", action="store_true", help="Print the number of lines instead of the output")
+    invalidate_parser = subparsers.add_parser("invalidate", help="Drop cached snapshots, e.g. after a node update")
+    invalidate_parser.add_argument("kind", nargs="?", choices=sorted(DEFAULT_TTLS))
+    args = parser.parse_args()
+
+    if args.command == "invalidate":
+        print(f"Removed {invalidate(args.kind)} snapshot(s).")
+        return
+
+    try:
+        output = get_snapshot(args.kind, ttl=args.ttl, config_path=args.config)
+    except SnapshotError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if args.count:
+        print(len(output.splitlines()))
+    else:
+        sys.stdout.write(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""
+Shared thresholds: one shell-sourceable KEY=VALUE file read by the reports,
+the dashboard and the coin aggregator, and sourced by ramcheck.bash.
+"""
+import sys
+
+THRESHOLDS_FILE = "/root/quileye_thresholds.conf"
+
+DEFAULT_THRESHOLDS = {
+    "CREATION_OPTIMAL_MAX": 17,
+    "CREATION_WARNING_MAX": 50,
+    "SUBMISSION_OPTIMAL_MAX": 28,
+    "SUBMISSION_WARNING_MAX": 70,
+    "CPU_OPTIMAL_MAX": 20,
+    "CPU_WARNING_MAX": 30,
+    "LANDING_RATE_LOW": 5,
+    "LANDING_RATE_HIGH": 10,
+    "RAM_LIMIT": 95,
+    "SWAP_LIMIT": 2,
+    "PSI_LIMIT": 10,
+}
+
+RED = "\033[31m"
+GREEN = "\033[32m"
+
+def load_thresholds(path=THRESHOLDS_FILE):
+    """
+    Reads KEY=VALUE lines (comments, 'export' and quotes allowed) over the defaults.
+    """
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line.startswith("export "):
+                    line = line[len("export "):].strip()
+                key, separator, value = line.partition("=")
+                if not separator or key not in thresholds:
+                    continue
+                try:
+                    thresholds[key] = float(value.strip().strip("'\""))
+                except ValueError:
+                    print(f"Warning: ignoring {key}={value.strip()} in {path}", file=sys.stderr)
+    except FileNotFoundError:
+        pass
+    return thresholds
+
+def bounds(thresholds, name):
+    """
+    (optimal max, warning max) of CREATION, SUBMISSION or CPU.
+    """
+    return thresholds[f"{name}_OPTIMAL_MAX"], thresholds[f"{name}_WARNING_MAX"]
+
+def landing_rate_color(rate, thresholds=None):
+    """
+    Red below LANDING_RATE_LOW, green above LANDING_RATE_HIGH, no color in between.
+    """
+    thresholds = load_thresholds() if thresholds is None else thresholds
+    if rate < thresholds["LANDING_RATE_LOW"]:
+        return RED
+    if rate > thresholds["LANDING_RATE_HIGH"]:
+        return GREEN
+    return ""
@@ -50,6 +50,8 @@ function update_service_start {
     # Reload systemd and restart the service
     systemctl daemon-reload
     service para restart
+    # Drop cached node-info/qclient snapshots taken with the old binaries
+    [ -f /root/snapshot_cache.py ] && python3 /root/snapshot_cache.py invalidate
 
     # Monitor the service logs
     journalctl -u para.service --no-hostname -f
@@ -69,40 +69,52 @@ get_os_arch() {
 # Get the current OS and architecture
 OS_ARCH=$(get_os_arch)
 
+# Optional cluster mirror (release_fetcher.py serve), tried before the official server
+RELEASE_MIRROR_URL=$(cat /root/release_mirror_url.txt 2>/dev/null)
+
 # Base URL for the Quilibrium releases
 RELEASE_FILES_URL="https://releases.quilibrium.com/release"
 
-# Fetch the list of files from the release page
-# Updated regex to allow for an optional fourth version number
-RELEASE_FILES=$(curl -s $RELEASE_FILES_URL | grep -oE "node-[0-9]+\.[0-9]+\.[0-9]+(\.[0-9]+)?-${OS_ARCH}(\.dgst)?(\.sig\.[0-9]+)?")
-
 # Change to the download directory
 cd ~/ceremonyclient/node
 
-# Download each file
-for file in $RELEASE_FILES; do
-    echo "Downloading $file..."
-    curl -L -o "$file" "https://releases.quilibrium.com/$file"
+if [ -f /root/release_fetcher.py ]; then
+    # Concurrent, resumable downloads, verified against the .dgst files and renamed into place when complete
+    python3 /root/release_fetcher.py fetch --dest ~/ceremonyclient/node --list release --os-arch "$OS_ARCH" \
+        ${RELEASE_MIRROR_URL:+--base-url "$RELEASE_MIRROR_URL"} --base-url https://releases.quilibrium.com
+else
+    # Fetch the list of files from the release page
+    # Updated regex to allow for an optional fourth version number
+    RELEASE_FILES=$(curl -s $RELEASE_FILES_URL | grep -oE "node-[0-9]+\.[0-9]+\.[0-9]+(\.[0-9]+)?-${OS_ARCH}(\.dgst)?(\.sig\.[0-9]+)?")
+
+    # Change to the download directory
+    cd ~/ceremonyclient/node
+
+    # Download each file
+    for file in $RELEASE_FILES; do
+        echo "Downloading $file..."
+        curl -L -o "$file" "https://releases.quilibrium.com/$file"
     
-    # Check if the download was successful
-    if [ $? -eq 0 ]; then
-        echo "Successfully downloaded $file"
-        # Check if the file is the base binary (without .dgst or .sig suffix)
-        if [[ $file =~ ^node-[0-9]+\.[0-9]+\.[0-9]+(\.[0-9]+)?-${OS_ARCH}$ ]]; then
-            echo "Making $file executable..."
-            chmod +x "$file"
-            if [ $? -eq 0 ]; then
-                echo "Successfully made $file executable"
-            else
-                echo "Failed to make $file executable"
+        # Check if the download was successful
+        if [ $? -eq 0 ]; then
+            echo "Successfully downloaded $file"
+            # Check if the file is the base binary (without .dgst or .sig suffix)
+            if [[ $file =~ ^node-[0-9]+\.[0-9]+\.[0-9]+(\.[0-9]+)?-${OS_ARCH}$ ]]; then
+                echo "Making $file executable..."
+                chmod +x "$file"
+                if [ $? -eq 0 ]; then
+                    echo "Successfully made $file executable"
+                else
+                    echo "Failed to make $file executable"
+                fi
             fi
+        else
+            echo "Failed to download $file"
         fi
-    else
-        echo "Failed to download $file"
-    fi
     
-    echo "------------------------"
-done
+        echo "------------------------"
+    done
+fi
 
 echo "✅  Node binary download completed."
 
@@ -160,29 +172,39 @@ OS_ARCH=$(get_os_arch)
 # Base URL for the Quilibrium releases
 BASE_URL="https://releases.quilibrium.com/qclient-release"
 
-# Fetch the list of files from the release page
-FILES=$(curl -s $BASE_URL | grep -oE "qclient-[0-9]+\.[0-9]+\.[0-9]+(\.[0-9]+)?-${OS_ARCH}(\.dgst)?(\.sig\.[0-9]+)?")
+if [ -f /root/release_fetcher.py ]; then
+    # Concurrent, resumable downloads, verified against the .dgst files and renamed into place when complete
+    python3 /root/release_fetcher.py fetch --dest ~/ceremonyclient/node --list qclient-release --os-arch "$OS_ARCH" \
+        ${RELEASE_MIRROR_URL:+--base-url "$RELEASE_MIRROR_URL"} --base-url https://releases.quilibrium.com || \
+        echo "Your node will still work, but you'll need to install the qclient manually later if needed."
+else
+    # Fetch the list of files from the release page
+    FILES=$(curl -s $BASE_URL | grep -oE "qclient-[0-9]+\.[0-9]+\.[0-9]+(\.[0-9]+)?-${OS_ARCH}(\.dgst)?(\.sig\.[0-9]+)?")
 
-# Change to the download directory
-cd ~/ceremonyclient/node
+    # Change to the download directory
+    cd ~/ceremonyclient/node
 
-# Download each file
-for file in $FILES; do
-    echo "Downloading $file..."
-    wget "https://releases.quilibrium.com/$file"
+    # Download each file
+    for file in $FILES; do
+        echo "Downloading $file..."
+        wget "https://releases.quilibrium.com/$file"
     
-    # Check if the download was successful
-    if [ $? -eq 0 ]; then
-        echo "Successfully downloaded $file"
-    else
-        echo "❌ Error: Failed to download $file"
-        echo "Your node will still work, but you'll need to install the qclient manually later if needed."
-    fi
+        # Check if the download was successful
+        if [ $? -eq 0 ]; then
+            echo "Successfully downloaded $file"
+        else
+            echo "❌ Error: Failed to download $file"
+            echo "Your node will still work, but you'll need to install the qclient manually later if needed."
+        fi
     
-    echo "------------------------"
-done
+        echo "------------------------"
+    done
+fi
 
         chmod +x qclient*
         echo "✅ qClient binary downloaded and configured successfully."
 
+# Drop cached node-info/qclient snapshots taken with the old binaries
+[ -f /root/snapshot_cache.py ] && python3 /root/snapshot_cache.py invalidate
+
 echo